@@ -1,28 +1,276 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
+from backend.core.bridge import validate_priority
 from backend.core.topology import Topology
 from backend.core.node import Node
 from backend.core.link import Link
 from backend.core.stp import STPCalculator
+from backend.core.bpdu import BPDUManager
+from backend.core.lacp import LACPDetector
+from backend.core.scheduler import RecomputeScheduler
+from backend.core.snapshot import TopologySnapshot
+from backend.core.query import QueryError, project
+from backend.core.batch import OperationBatch, OperationError, capture_tree_state, diff_tree_state
+from backend.core import persistence
+from backend.core.journal import Journal
+from backend.core.scenario import Scenario, ScenarioError, ScenarioRunner
+from backend.core.chaos import ChaosCampaign
+from backend.core.contingency import ContingencyAnalysis
+from backend.core.convergence import ConvergenceTracker
+from backend.core.dataplane import DataPlane
+from backend.core.treeindex import TreeIndex
+from backend.core.reachability import MAX_ROWS, ReachabilityLabels
+from backend.core.verification import ForwardingVerification
+from backend.core.utilization import TrafficMatrix, UtilizationAnalysis, link_view
+from backend.api.sessions import SessionManager, Simulation
+from backend.api.scenarios import ScenarioService
+from backend.api.serialization import json_response, requested_format, compact_topology, compact_nodes, compact_links
 from backend.utils.logger import get_logger
+from backend.utils.metrics import MetricsRegistry
+from backend.utils.events import EventBuffer
+from backend.utils.logtail import LogFilter, follow, parse_since, tail
+from backend.utils.profiling import Profiler, profile_call, span
+from collections import OrderedDict
+import contextvars
+import functools
+import itertools
+import json
+import os
+import re
+import threading
 import time
 
 
+SNAPSHOT_NAME = re.compile(r'^[A-Za-z0-9_.-]+$')
+SESSION_PREFIX = '/api/sessions/'
+# Bytes read backwards per log file when a filter matches too few entries.
+LOG_SCAN_BYTES = 4 * 1024 * 1024
+
+_current_session: contextvars.ContextVar = contextvars.ContextVar('simulation', default=None)
+
+
+def _writer(method):
+    """
+    Run a mutating handler as the single writer and publish a fresh snapshot
+    once it returns, so readers switch to the new state in one reference swap.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            result = method(self, *args, **kwargs)
+            self._publish_snapshot()
+        return result
+    return wrapper
+
+
+def _session_attribute(name: str) -> property:
+    """Per-simulation state, resolved to the session of the current request
+    (or recompute callback) and to the default session otherwise."""
+    def get(self):
+        return getattr(self._session(), name)
+
+    def set(self, value):
+        setattr(self._session(), name, value)
+
+    return property(get, set)
+
+
+class _SessionPathMiddleware:
+    """Serve `/api/sessions/<id>/<path>` as `/api/<path>` within session `<id>`."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path.startswith(SESSION_PREFIX):
+            session_id, _, rest = path[len(SESSION_PREFIX):].partition('/')
+            if rest:
+                environ['tinyrstp.session_id'] = session_id
+                environ['PATH_INFO'] = '/api/' + rest
+        return self.wsgi_app(environ, start_response)
+
+
 class NetworkAPI:
-    def __init__(self):
+    topology: Topology = _session_attribute('topology')
+    stp_calculator: STPCalculator = _session_attribute('stp_calculator')
+    bpdu_manager: BPDUManager = _session_attribute('bpdu_manager')
+    lacp_detector: LACPDetector = _session_attribute('lacp_detector')
+    recompute_scheduler: RecomputeScheduler = _session_attribute('recompute_scheduler')
+    events: EventBuffer = _session_attribute('events')
+    profiler: Profiler = _session_attribute('profiler')
+    convergence: ConvergenceTracker = _session_attribute('convergence')
+    dataplane: DataPlane = _session_attribute('dataplane')
+    dataplane_status = _session_attribute('dataplane_status')
+    journal: Journal = _session_attribute('journal')
+    snapshot: TopologySnapshot = _session_attribute('snapshot')
+    forwarding_check = _session_attribute('forwarding_check')
+    last_topology_change = _session_attribute('last_topology_change')
+    _snapshot_version = _session_attribute('_snapshot_version')
+    _write_lock = _session_attribute('_write_lock')
+
+    def __init__(
+        self,
+        recompute_quiet_period: float = 0.05,
+        recompute_max_delay: float = 0.5,
+        event_capacity: int = 10000,
+        snapshot_dir: str = 'snapshots',
+        initial_snapshot: str = None,
+        journal_path: str = None,
+        session_dir: str = 'sessions',
+        max_sessions: int = 16,
+        session_memory_limit: int = None,
+        session_idle_timeout: float = 1800.0,
+        profiling: bool = True,
+        convergence_settle: float = 1.0,
+        keep_chaos_campaigns: int = 20
+    ):
         self.logger = get_logger(log_dir='logs')
         self.logger.startup('NetworkAPI')
+        self.snapshot_dir = snapshot_dir
+        self.recompute_quiet_period = recompute_quiet_period
+        self.recompute_max_delay = recompute_max_delay
+        self.event_capacity = event_capacity
+        self.profiling = profiling
+        # `profile=1` on GET requests; off with --no-profiling and in production.
+        self.request_profiling = False
+        self.convergence_settle = convergence_settle
 
         self.app = Flask(__name__)
         CORS(self.app)
-        self.topology = Topology()
-        self.stp_calculator = STPCalculator(self.topology)
-        self.last_topology_change = 0
-        self.topology_change_cooldown = 1.0
+        self.app.wsgi_app = _SessionPathMiddleware(self.app.wsgi_app)
+        self.sessions = SessionManager(
+            self._create_session,
+            self._restore_session,
+            session_dir=session_dir,
+            max_sessions=max_sessions,
+            memory_limit=session_memory_limit,
+            idle_timeout=session_idle_timeout
+        )
+        self.sessions.set_default(self._new_simulation(SessionManager.DEFAULT))
+        self.scenarios = ScenarioService()
+        # Finished campaigns beyond `keep_chaos_campaigns` are dropped oldest first.
+        self.keep_chaos_campaigns = keep_chaos_campaigns
+        self.chaos_campaigns = OrderedDict()
+        self._chaos_lock = threading.Lock()
+        self._chaos_ids = itertools.count(1)
 
-        self._setup_4_node_full_mesh()
-        self.stp_calculator.update_and_apply()
+        self._setup_metrics()
+        if initial_snapshot:
+            # The saved spanning tree is restored as-is; nothing is recomputed.
+            self._install_topology(persistence.load(initial_snapshot))
+            self.logger.info(f"Loaded topology snapshot {initial_snapshot}")
+        else:
+            self._setup_4_node_full_mesh()
+            self.stp_calculator.update_and_apply()
+        self._publish_snapshot()
+        self.journal = Journal(journal_path) if journal_path else None
+        self._journal_base('startup')
         self._setup_routes()
+        if self.profiling:
+            self._bind_request_profiling()
+        self._bind_request_metrics()
+        self._bind_sessions()
+
+    def _session(self) -> Simulation:
+        return _current_session.get() or self.sessions.default
+
+    def _in_session(self, simulation: Simulation, func, *args):
+        token = _current_session.set(simulation)
+        try:
+            return func(*args)
+        finally:
+            _current_session.reset(token)
+
+    def _new_simulation(self, session_id: str) -> Simulation:
+        simulation = Simulation(session_id)
+        simulation.events = EventBuffer(self.event_capacity)
+        simulation.profiler = Profiler(enabled=self.profiling)
+        simulation.recompute_scheduler = RecomputeScheduler(
+            lambda: self._in_session(simulation, self._apply_stp),
+            quiet_period=self.recompute_quiet_period,
+            max_delay=self.recompute_max_delay
+        )
+        simulation.convergence = ConvergenceTracker(
+            last_change=lambda: simulation.topology.last_port_change,
+            busy=simulation.recompute_scheduler.is_pending,
+            reachable=lambda: simulation.snapshot.topology['connectivity_summary']['reachable_nodes'],
+            settle=self.convergence_settle,
+            on_converged=lambda r: self.convergence_duration.labels(r['type']).observe(r['convergence_seconds'])
+        )
+        return simulation
+
+    def _create_session(self, session_id: str) -> Simulation:
+        simulation = self._new_simulation(session_id)
+        self._in_session(simulation, self._setup_4_node_full_mesh)
+        self._in_session(simulation, simulation.stp_calculator.update_and_apply)
+        self._in_session(simulation, self._publish_snapshot)
+        return simulation
+
+    def _restore_session(self, session_id: str, path: str) -> Simulation:
+        simulation = self._new_simulation(session_id)
+        self._in_session(simulation, self._install_topology, persistence.load(path))
+        self._in_session(simulation, self._publish_snapshot)
+        return simulation
+
+    def _bind_sessions(self):
+        @self.app.before_request
+        def enter_session():
+            session_id = request.environ.get('tinyrstp.session_id') or request.headers.get('X-Session-Id')
+            if not session_id:
+                return None
+            simulation = self.sessions.acquire(session_id)
+            if simulation is None:
+                return jsonify({'status': 'error', 'message': f'Session not found: {session_id}'}), 404
+            g.simulation = simulation
+            g.session_token = _current_session.set(simulation)
+            return None
+
+        @self.app.teardown_request
+        def leave_session(_exc):
+            simulation = g.pop('simulation', None)
+            if simulation is not None:
+                _current_session.reset(g.pop('session_token'))
+                self.sessions.release(simulation)
+
+    def list_sessions(self):
+        self._log_request('/api/sessions', 'GET')
+        result = jsonify({
+            'sessions': self.sessions.list(),
+            'max_sessions': self.sessions.max_sessions,
+            'memory_limit': self.sessions.memory_limit,
+            'evictions': self.sessions.evictions
+        })
+        self._log_response('/api/sessions', 200, 'GET')
+        return result
+
+    def create_session(self):
+        self._log_request('/api/sessions', 'POST')
+        payload = request.get_json(silent=True) or {}
+        try:
+            simulation = self.sessions.create(payload.get('session_id') if isinstance(payload, dict) else None)
+        except ValueError as e:
+            self._log_response('/api/sessions', 400, 'POST')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        self._log_response('/api/sessions', 201, 'POST')
+        return jsonify({'status': 'success', 'session': simulation.get_status()}), 201
+
+    def get_session(self, session_id):
+        self._log_request(f'/api/sessions/{session_id}', 'GET')
+        status = self.sessions.get_status(session_id)
+        if status is None:
+            self._log_response(f'/api/sessions/{session_id}', 404, 'GET')
+            return jsonify({'status': 'error', 'message': 'Session not found'}), 404
+        self._log_response(f'/api/sessions/{session_id}', 200, 'GET')
+        return jsonify(status)
+
+    def delete_session(self, session_id):
+        self._log_request(f'/api/sessions/{session_id}', 'DELETE')
+        if not self.sessions.delete(session_id):
+            self._log_response(f'/api/sessions/{session_id}', 404, 'DELETE')
+            return jsonify({'status': 'error', 'message': 'Session not found'}), 404
+        self._log_response(f'/api/sessions/{session_id}', 200, 'DELETE')
+        return jsonify({'status': 'success', 'message': f'Session {session_id} deleted'})
 
     def _setup_routes(self):
         self.app.add_url_rule('/api/topology', view_func=self.get_topology, methods=['GET'])
@@ -30,17 +278,229 @@ class NetworkAPI:
         self.app.add_url_rule('/api/topology/nodes', view_func=self.get_nodes, methods=['GET'])
         self.app.add_url_rule('/api/topology/links', view_func=self.get_links, methods=['GET'])
         self.app.add_url_rule('/api/topology/spanning-tree', view_func=self.get_spanning_tree, methods=['GET'])
+        self.app.add_url_rule('/api/topology/save', view_func=self.save_topology, methods=['POST'])
+        self.app.add_url_rule('/api/topology/load', view_func=self.load_topology, methods=['POST'])
         self.app.add_url_rule('/api/nodes/<node_id>/fail', view_func=self.fail_node, methods=['POST'])
         self.app.add_url_rule('/api/nodes/<node_id>/recover', view_func=self.recover_node, methods=['POST'])
+        self.app.add_url_rule('/api/nodes/<node_id>/priority', view_func=self.set_node_priority, methods=['POST'])
         self.app.add_url_rule('/api/links/<link_id>/toggle', view_func=self.toggle_link, methods=['POST'])
         self.app.add_url_rule('/api/links/<link_id>/up', view_func=self.link_up, methods=['POST'])
         self.app.add_url_rule('/api/links/<link_id>/down', view_func=self.link_down, methods=['POST'])
+        self.app.add_url_rule('/api/batch', view_func=self.batch, methods=['POST'])
         self.app.add_url_rule('/api/test/scenario/<scenario_name>', view_func=self.run_scenario, methods=['POST'])
+        self.app.add_url_rule('/api/scenarios', view_func=self.list_scenarios, methods=['GET'])
+        self.app.add_url_rule('/api/scenarios', view_func=self.upload_scenario, methods=['POST'])
+        self.app.add_url_rule('/api/scenarios/runs', view_func=self.list_scenario_runs, methods=['GET'])
+        self.app.add_url_rule('/api/scenarios/runs/<run_id>', view_func=self.get_scenario_run, methods=['GET'])
+        self.app.add_url_rule('/api/scenarios/<name>', view_func=self.get_scenario, methods=['GET'])
+        self.app.add_url_rule('/api/scenarios/<name>/run', view_func=self.start_scenario, methods=['POST'])
+        self.app.add_url_rule('/api/chaos', view_func=self.start_chaos, methods=['POST'])
+        self.app.add_url_rule('/api/chaos/<campaign_id>', view_func=self.get_chaos, methods=['GET'])
+        self.app.add_url_rule('/api/chaos/<campaign_id>', view_func=self.cancel_chaos, methods=['DELETE'])
+        self.app.add_url_rule('/api/analysis/contingency', view_func=self.get_contingency, methods=['GET'])
+        self.app.add_url_rule('/api/path', view_func=self.get_path, methods=['GET'])
+        self.app.add_url_rule('/api/reachability', view_func=self.get_reachability, methods=['GET'])
+        self.app.add_url_rule('/api/analysis/utilization', view_func=self.get_utilization, methods=['GET'])
+        self.app.add_url_rule('/api/analysis/utilization', view_func=self.set_traffic_matrix, methods=['POST'])
+        self.app.add_url_rule('/api/analysis/utilization', view_func=self.clear_traffic_matrix, methods=['DELETE'])
+        self.app.add_url_rule('/api/dataplane', view_func=self.get_dataplane, methods=['GET'])
+        self.app.add_url_rule('/api/dataplane/hosts', view_func=self.attach_hosts, methods=['POST'])
+        self.app.add_url_rule('/api/dataplane/traffic', view_func=self.send_traffic, methods=['POST'])
         self.app.add_url_rule('/api/test/status', view_func=self.get_test_status, methods=['GET'])
         self.app.add_url_rule('/api/debug/status', view_func=self.debug_status, methods=['GET'])
         self.app.add_url_rule('/api/debug/nodes/<node_id>', view_func=self.debug_node, methods=['GET'])
         self.app.add_url_rule('/api/debug/links/<link_id>', view_func=self.debug_link, methods=['GET'])
         self.app.add_url_rule('/api/debug/logs', view_func=self.debug_logs, methods=['GET'])
+        self.app.add_url_rule('/api/debug/profile', view_func=self.debug_profile, methods=['GET'])
+        self.app.add_url_rule('/api/events', view_func=self.get_events, methods=['GET'])
+        self.app.add_url_rule('/api/convergence', view_func=self.get_convergence, methods=['GET'])
+        self.app.add_url_rule('/metrics', view_func=self.metrics_endpoint, methods=['GET'])
+        self.app.add_url_rule('/api/sessions', view_func=self.list_sessions, methods=['GET'])
+        self.app.add_url_rule('/api/sessions', view_func=self.create_session, methods=['POST'])
+        self.app.add_url_rule('/api/sessions/<session_id>', view_func=self.get_session, methods=['GET'])
+        self.app.add_url_rule('/api/sessions/<session_id>', view_func=self.delete_session, methods=['DELETE'])
+
+    def _setup_metrics(self):
+        self.metrics = MetricsRegistry()
+        self.request_latency = self.metrics.histogram(
+            'http_request_duration_seconds', 'HTTP request latency by route', ('endpoint', 'method')
+        )
+        self.stp_recompute_duration = self.metrics.histogram(
+            'stp_recompute_duration_seconds', 'Spanning tree recompute duration'
+        )
+        self.stp_recomputes = self.metrics.counter('stp_recomputes_total', 'Spanning tree recomputes')
+        self.forwarding_violations = self.metrics.counter(
+            'forwarding_violations_total', 'Recomputes whose forwarding ports had a loop or left nodes orphaned'
+        )
+        self.convergence_duration = self.metrics.histogram(
+            'stp_convergence_seconds', 'Time from an injected fault to a stable spanning tree', ('event_type',),
+            buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+        )
+        self.connectivity_duration = self.metrics.histogram(
+            'connectivity_duration_seconds', 'Connectivity computation duration per published snapshot'
+        )
+        bpdus_sent = self.metrics.counter('bpdu_sent_total', 'BPDUs sent')
+        bpdus_received = self.metrics.counter('bpdu_received_total', 'BPDUs received')
+        lacp_probes = self.metrics.counter('lacp_probes_total', 'LACP probes sent')
+        lacp_misses = self.metrics.counter('lacp_probe_misses_total', 'LACP probes that found the link down')
+        topology_gauges = self.metrics.gauge('topology_objects', 'Current topology object counts', ('kind',))
+        gauge_children = {
+            key: topology_gauges.labels(key)
+            for key in ('total_nodes', 'active_nodes', 'failed_nodes', 'total_links', 'up_links',
+                        'down_links', 'spanning_tree_links')
+        }
+        snapshot_version = self.metrics.gauge('snapshot_version', 'Version of the published topology snapshot')
+        max_utilization = self.metrics.gauge('link_utilization_max', 'Highest tree link utilization for the traffic matrix')
+        oversubscribed = self.metrics.gauge('oversubscribed_links', 'Tree links loaded beyond the utilization threshold')
+        cycle_links = self.metrics.gauge('forwarding_cycle_links', 'Forwarding links closing a loop after the last recompute')
+        orphaned_nodes = self.metrics.gauge('orphaned_nodes', 'Reachable nodes outside the root forwarding tree after the last recompute')
+        frames = self.metrics.counter('dataplane_frames_total', 'Simulated data-plane frames by outcome', ('outcome',))
+        frame_children = {key: frames.labels(key) for key in ('delivered', 'dropped', 'flooded')}
+
+        def collect():
+            bpdus_sent.set_total(self.bpdu_manager.bpdus_sent)
+            bpdus_received.set_total(self.bpdu_manager.bpdus_received)
+            lacp_probes.set_total(self.lacp_detector.probes_sent)
+            lacp_misses.set_total(self.lacp_detector.probe_misses)
+            snapshot = self.snapshot
+            for key, child in gauge_children.items():
+                child.set(snapshot.summary[key])
+            snapshot_version.set(snapshot.version)
+            utilization = snapshot.utilization
+            if utilization:
+                peak = utilization['max_utilization']
+                max_utilization.set(float('inf') if peak is None else peak)
+            else:
+                max_utilization.set(0.0)
+            oversubscribed.set(len(utilization['oversubscribed']) if utilization else 0)
+            check = self.forwarding_check
+            cycle_links.set(check['cycle_count'] if check else 0)
+            orphaned_nodes.set(check['orphaned_count'] if check else 0)
+            dataplane = self.dataplane
+            frame_children['delivered'].set_total(dataplane.delivered)
+            frame_children['dropped'].set_total(dataplane.frames - dataplane.delivered)
+            frame_children['flooded'].set_total(dataplane.flooded)
+
+        self.metrics.register_collector(collect)
+
+    def _bind_request_profiling(self):
+        """
+        A GET request with `profile=1` answers with its cProfile statistics as
+        text instead of its body. Streaming responses are passed through.
+        """
+        self.request_profiling = True
+
+        def profiled(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if (not self.request_profiling or request.method != 'GET'
+                        or request.args.get('profile') not in ('1', 'true')):
+                    return view(*args, **kwargs)
+                try:
+                    response, stats = profile_call(lambda: self.app.make_response(view(*args, **kwargs)))
+                except ValueError as e:
+                    # Only one cProfile can be active at a time.
+                    return jsonify({'status': 'error', 'message': str(e)}), 409
+                if response.is_streamed:
+                    return response
+                return Response(
+                    f'# {request.method} {request.path} -> {response.status}\n{stats}',
+                    mimetype='text/plain',
+                    headers={'X-Profiled-Status': str(response.status_code)}
+                )
+            return wrapper
+
+        for endpoint, view in list(self.app.view_functions.items()):
+            self.app.view_functions[endpoint] = profiled(view)
+
+    def _bind_request_metrics(self):
+        latency_children = {}
+        for rule in self.app.url_map.iter_rules():
+            for method in rule.methods - {'HEAD', 'OPTIONS'}:
+                latency_children[(rule.rule, method)] = self.request_latency.labels(rule.rule, method)
+        unmatched = self.request_latency.labels('unmatched', 'ANY')
+        perf_counter = time.perf_counter
+
+        @self.app.before_request
+        def start_timer():
+            g.request_started = perf_counter()
+
+        @self.app.after_request
+        def observe_latency(response):
+            started = g.get('request_started')
+            if started is not None:
+                rule = request.url_rule
+                child = latency_children.get((rule.rule, request.method), unmatched) if rule else unmatched
+                child.observe(perf_counter() - started)
+            return response
+
+    def metrics_endpoint(self):
+        return Response(self.metrics.render(), mimetype=None, content_type=MetricsRegistry.CONTENT_TYPE)
+
+    def _node_event(self, node_id: str, event: str, context: dict = None):
+        self.logger.node_event(node_id, event, context)
+        self.events.record('node', event, {'node_id': node_id}, context)
+
+    def _link_event(self, link_id: str, event: str, context: dict = None):
+        self.logger.link_event(link_id, event, context)
+        self.events.record('link', event, {'link_id': link_id}, context)
+
+    def _topology_change(self, change_type: str, details: dict = None):
+        self.logger.topology_change(change_type, details)
+        self.events.record('topology', change_type, None, details)
+
+    def _stp_recalculation(self, root_name: str, link_count: int):
+        self.logger.stp_recalculation(root_name, link_count)
+        root_id = self.topology.root_node.id if self.topology.root_node else None
+        self.events.record('stp', 'recalculated', {'root_node': root_id}, {
+            'root_name': root_name,
+            'link_count': link_count,
+            'generation': self.topology.generation
+        })
+
+    def get_events(self):
+        self._log_request('/api/events', 'GET')
+        try:
+            types = [t for t in request.args.get('type', '').split(',') if t]
+            since = float(request.args['since']) if 'since' in request.args else None
+            until = float(request.args['until']) if 'until' in request.args else None
+            after = int(request.args['after']) if 'after' in request.args else None
+            limit = min(int(request.args.get('limit', 100)), self.events.capacity)
+        except ValueError as e:
+            self._log_response('/api/events', 400, 'GET')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        events = self.events.query(types, since, until, after, limit)
+        self._log_response('/api/events', 200, 'GET')
+        return jsonify({
+            'events': [e.to_dict() for e in events],
+            'buffer': self.events.get_status()
+        })
+
+    def get_convergence(self):
+        """Per-fault-type convergence percentiles, the last `limit` settled faults and those still settling."""
+        self._log_request('/api/convergence', 'GET')
+        try:
+            limit = int(request.args.get('limit', 20))
+            if limit < 0:
+                raise ValueError('limit must be non-negative')
+        except ValueError as e:
+            self._log_response('/api/convergence', 400, 'GET')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        result = jsonify(self.convergence.get_status(limit))
+        self._log_response('/api/convergence', 200, 'GET')
+        return result
+
+    def _journal_base(self, reason: str):
+        if self.journal:
+            self.journal.append_base(self.topology, reason)
+
+    def _record_mutation(self, operations: list):
+        if self.journal:
+            self.journal.append('mutation', self.topology.generation, operations=operations)
+        for operation in operations:
+            ids = {key: operation[key] for key in ('node_id', 'link_id') if key in operation}
+            self.convergence.record_fault(operation['op'], ids)
 
     def _log_request(self, endpoint: str, method: str = 'GET'):
         self.logger.api_request(method, endpoint)
@@ -50,60 +510,212 @@ class NetworkAPI:
 
     def get_topology(self):
         self._log_request('/api/topology', 'GET')
-        result = jsonify(self.topology.to_dict())
+        snapshot = self.snapshot
+        fmt = requested_format()
+        state = self._stp_state()
+
+        def build():
+            data = compact_topology(snapshot.topology) if fmt == 'compact' else snapshot.topology
+            return dict(data, spanning_tree_state=state, link_utilization=link_view(snapshot.utilization))
+
+        result = json_response(cache=snapshot.encoded, cache_key=('topology', fmt, state), builder=build)
         self._log_response('/api/topology', 200, 'GET')
         return result
 
+    @_writer
     def reset_topology(self):
         self._log_request('/api/topology/reset', 'POST')
         self._setup_4_node_full_mesh()
         self.stp_calculator.update_and_apply()
-        self.logger.topology_change('reset', {'node_count': 4, 'link_count': 6})
+        self._journal_base('reset')
+        self._topology_change('reset', {'node_count': 4, 'link_count': 6})
         self._log_response('/api/topology/reset', 200, 'POST')
-        return jsonify({'status': 'success', 'message': 'Topology reset'})
+        return jsonify({
+            'status': 'success',
+            'message': 'Topology reset',
+            'spanning_tree_state': self._stp_state()
+        })
+
+    def _snapshot_path(self):
+        payload = request.get_json(silent=True) or {}
+        name = payload.get('name', 'topology') if isinstance(payload, dict) else None
+        if not isinstance(name, str) or not SNAPSHOT_NAME.match(name) or name.startswith('.'):
+            raise ValueError('name must contain only letters, digits, "_", "-" and "."')
+        return os.path.join(self.snapshot_dir, f'{name}.trsp')
+
+    def save_topology(self):
+        self._log_request('/api/topology/save', 'POST')
+        try:
+            path = self._snapshot_path()
+        except ValueError as e:
+            self._log_response('/api/topology/save', 400, 'POST')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        started = time.perf_counter()
+        with self._write_lock:
+            persistence.save(self.topology, path)
+            summary = self.snapshot.summary
+        elapsed = time.perf_counter() - started
+
+        self._topology_change('save', {'path': path, 'node_count': summary['total_nodes']})
+        self._log_response('/api/topology/save', 200, 'POST')
+        return jsonify({
+            'status': 'success',
+            'path': path,
+            'bytes': os.path.getsize(path),
+            'nodes': summary['total_nodes'],
+            'links': summary['total_links'],
+            'duration_ms': round(elapsed * 1000, 3)
+        })
+
+    @_writer
+    def load_topology(self):
+        self._log_request('/api/topology/load', 'POST')
+        try:
+            path = self._snapshot_path()
+        except ValueError as e:
+            self._log_response('/api/topology/load', 400, 'POST')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        if not os.path.exists(path):
+            self._log_response('/api/topology/load', 404, 'POST')
+            return jsonify({'status': 'error', 'message': 'Snapshot not found'}), 404
+
+        started = time.perf_counter()
+        try:
+            topology = persistence.load(path)
+        except persistence.SnapshotFormatError as e:
+            self._log_response('/api/topology/load', 400, 'POST')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        self._install_topology(topology)
+        elapsed = time.perf_counter() - started
+        self._journal_base('load')
+
+        self._topology_change('load', {'path': path, 'node_count': len(topology.nodes)})
+        self._log_response('/api/topology/load', 200, 'POST')
+        return jsonify({
+            'status': 'success',
+            'path': path,
+            'nodes': len(topology.nodes),
+            'links': len(topology.links),
+            'duration_ms': round(elapsed * 1000, 3),
+            'spanning_tree_state': self._stp_state()
+        })
 
     def get_nodes(self):
-        self._log_request('/api/topology/nodes', 'GET')
-        nodes = [n.to_dict() for n in self.topology.get_all_nodes()]
-        self._log_response('/api/topology/nodes', 200, 'GET')
-        return jsonify({'nodes': nodes})
+        return self._list_objects('nodes', 'node_collection', compact_nodes)
 
     def get_links(self):
-        self._log_request('/api/topology/links', 'GET')
-        links = [l.to_dict() for l in self.topology.get_all_links()]
-        self._log_response('/api/topology/links', 200, 'GET')
-        return jsonify({'links': links})
+        return self._list_objects('links', 'link_collection', compact_links)
+
+    def _list_objects(self, kind: str, collection_name: str, compact):
+        endpoint = f'/api/topology/{kind}'
+        self._log_request(endpoint, 'GET')
+        snapshot = self.snapshot
+        collection = getattr(snapshot, collection_name)
+        fmt = requested_format()
+
+        filters = {k: v for k, v in request.args.items() if k not in ('limit', 'cursor', 'fields', 'format')}
+        fields = [f for f in request.args.get('fields', '').split(',') if f]
+        if not filters and not fields and 'limit' not in request.args and 'cursor' not in request.args:
+            def build():
+                return compact(collection.items) if fmt == 'compact' else {kind: collection.items}
+
+            self._log_response(endpoint, 200, 'GET')
+            return json_response(cache=snapshot.encoded, cache_key=(kind, fmt), builder=build)
+
+        try:
+            limit = int(request.args['limit']) if 'limit' in request.args else None
+            items, next_cursor, total = collection.select(filters, request.args.get('cursor'), limit)
+        except (QueryError, ValueError) as e:
+            self._log_response(endpoint, 400, 'GET')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        known_fields = collection.items[0].keys() if collection.items else fields
+        unknown = [f for f in fields if f not in known_fields]
+        if unknown:
+            self._log_response(endpoint, 400, 'GET')
+            return jsonify({'status': 'error', 'message': f"Unknown fields: {','.join(unknown)}"}), 400
+
+        if fmt == 'compact' and fields:
+            payload = {'format': 'compact', 'columns': {kind: fields}, kind: [[i[f] for f in fields] for i in items]}
+        elif fmt == 'compact':
+            payload = compact(items)
+        else:
+            payload = {kind: project(items, fields)}
+        payload['next_cursor'] = next_cursor
+        payload['total'] = total
+
+        self._log_response(endpoint, 200, 'GET')
+        return json_response(payload)
 
     def get_spanning_tree(self):
         self._log_request('/api/topology/spanning-tree', 'GET')
-        result = jsonify(self.stp_calculator.get_spanning_tree_info())
+        result = json_response(dict(self.snapshot.spanning_tree, state=self._stp_state()))
         self._log_response('/api/topology/spanning-tree', 200, 'GET')
         return result
 
+    @_writer
     def fail_node(self, node_id):
         self._log_request(f'/api/nodes/{node_id}/fail', 'POST')
         node = self.topology.get_node(node_id)
         if node:
             node.set_failed()
+            self._record_mutation([{'op': 'fail_node', 'node_id': node_id}])
             self._recalculate_stp()
-            self.logger.node_event(node_id, 'failed', {'node_name': node.node_name})
+            self._node_event(node_id, 'failed', {'node_name': node.node_name})
             self._log_response(f'/api/nodes/{node_id}/fail', 200, 'POST')
-            return jsonify({'status': 'success', 'message': f'Node {node.node_name} failed'})
+            return jsonify({
+                'status': 'success',
+                'message': f'Node {node.node_name} failed',
+                'spanning_tree_state': self._stp_state()
+            })
         self._log_response(f'/api/nodes/{node_id}/fail', 404, 'POST')
         return jsonify({'status': 'error', 'message': 'Node not found'}), 404
 
+    @_writer
     def recover_node(self, node_id):
         self._log_request(f'/api/nodes/{node_id}/recover', 'POST')
         node = self.topology.get_node(node_id)
         if node:
             node.set_active()
+            self._record_mutation([{'op': 'recover_node', 'node_id': node_id}])
             self._recalculate_stp()
-            self.logger.node_event(node_id, 'recovered', {'node_name': node.node_name})
+            self._node_event(node_id, 'recovered', {'node_name': node.node_name})
             self._log_response(f'/api/nodes/{node_id}/recover', 200, 'POST')
-            return jsonify({'status': 'success', 'message': f'Node {node.node_name} recovered'})
+            return jsonify({
+                'status': 'success',
+                'message': f'Node {node.node_name} recovered',
+                'spanning_tree_state': self._stp_state()
+            })
         self._log_response(f'/api/nodes/{node_id}/recover', 404, 'POST')
         return jsonify({'status': 'error', 'message': 'Node not found'}), 404
 
+    @_writer
+    def set_node_priority(self, node_id):
+        self._log_request(f'/api/nodes/{node_id}/priority', 'POST')
+        node = self.topology.get_node(node_id)
+        if not node:
+            self._log_response(f'/api/nodes/{node_id}/priority', 404, 'POST')
+            return jsonify({'status': 'error', 'message': 'Node not found'}), 404
+        payload = request.get_json(silent=True)
+        try:
+            priority = validate_priority(payload.get('priority') if isinstance(payload, dict) else None)
+        except ValueError as e:
+            self._log_response(f'/api/nodes/{node_id}/priority', 400, 'POST')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        self.topology.set_bridge_priority(node, priority)
+        self._record_mutation([{'op': 'set_priority', 'node_id': node_id, 'priority': priority}])
+        self._recalculate_stp()
+        self._node_event(node_id, 'priority_changed', {'bridge_id': str(node.bridge_id)})
+        self._log_response(f'/api/nodes/{node_id}/priority', 200, 'POST')
+        return jsonify({
+            'status': 'success',
+            'message': f'Node {node.node_name} priority set to {priority}',
+            'bridge_id': str(node.bridge_id),
+            'spanning_tree_state': self._stp_state()
+        })
+
+    @_writer
     def toggle_link(self, link_id):
         self._log_request(f'/api/links/{link_id}/toggle', 'POST')
         link = self.topology.get_link(link_id)
@@ -114,60 +726,107 @@ class NetworkAPI:
             else:
                 link.set_state(link.state.__class__.UP)
                 state = 'UP'
+            self._record_mutation([{'op': 'toggle_link', 'link_id': link_id}])
             self._recalculate_stp()
-            self.logger.link_event(link_id, f'toggled_to_{state}')
+            self._link_event(link_id, f'toggled_to_{state}')
             self._log_response(f'/api/links/{link_id}/toggle', 200, 'POST')
-            return jsonify({'status': 'success', 'message': f'Link {link_id} toggled'})
+            return jsonify({
+                'status': 'success',
+                'message': f'Link {link_id} toggled',
+                'spanning_tree_state': self._stp_state()
+            })
         self._log_response(f'/api/links/{link_id}/toggle', 404, 'POST')
         return jsonify({'status': 'error', 'message': 'Link not found'}), 404
 
+    @_writer
     def link_up(self, link_id):
         self._log_request(f'/api/links/{link_id}/up', 'POST')
         link = self.topology.get_link(link_id)
         if link:
             link.set_state(link.state.__class__.UP)
+            self._record_mutation([{'op': 'link_up', 'link_id': link_id}])
             self._recalculate_stp()
-            self.logger.link_event(link_id, 'up')
+            self._link_event(link_id, 'up')
             self._log_response(f'/api/links/{link_id}/up', 200, 'POST')
-            return jsonify({'status': 'success', 'message': f'Link {link_id} up'})
+            return jsonify({
+                'status': 'success',
+                'message': f'Link {link_id} up',
+                'spanning_tree_state': self._stp_state()
+            })
         self._log_response(f'/api/links/{link_id}/up', 404, 'POST')
         return jsonify({'status': 'error', 'message': 'Link not found'}), 404
 
+    @_writer
     def link_down(self, link_id):
         self._log_request(f'/api/links/{link_id}/down', 'POST')
         link = self.topology.get_link(link_id)
         if link:
             link.set_state(link.state.__class__.DOWN)
+            self._record_mutation([{'op': 'link_down', 'link_id': link_id}])
             self._recalculate_stp()
-            self.logger.link_event(link_id, 'down')
+            self._link_event(link_id, 'down')
             self._log_response(f'/api/links/{link_id}/down', 200, 'POST')
-            return jsonify({'status': 'success', 'message': f'Link {link_id} down'})
+            return jsonify({
+                'status': 'success',
+                'message': f'Link {link_id} down',
+                'spanning_tree_state': self._stp_state()
+            })
         self._log_response(f'/api/links/{link_id}/down', 404, 'POST')
         return jsonify({'status': 'error', 'message': 'Link not found'}), 404
 
+    @_writer
+    def batch(self):
+        self._log_request('/api/batch', 'POST')
+        payload = request.get_json(silent=True)
+        operations = payload.get('operations') if isinstance(payload, dict) else payload
+        try:
+            batch = OperationBatch.from_payload(self.topology, operations)
+        except OperationError as e:
+            self._log_response('/api/batch', 400, 'POST')
+            return jsonify({'status': 'error', 'message': str(e), 'index': e.index}), 400
+
+        before = capture_tree_state(self.topology)
+        applied = batch.apply()
+        self._record_mutation(applied)
+        # Recompute inline: the batch already holds the writer lock, and the
+        # deltas must reflect the new tree.
+        self._apply_stp()
+        deltas = diff_tree_state(before, capture_tree_state(self.topology))
+
+        for operation in applied:
+            if 'node_id' in operation:
+                self._node_event(operation['node_id'], operation['op'], {'batch': True})
+            else:
+                self._link_event(operation['link_id'], operation['op'], {'batch': True})
+        self._topology_change('batch', {'operation_count': len(applied)})
+        self._log_response('/api/batch', 200, 'POST')
+        return jsonify({
+            'status': 'success',
+            'applied': len(applied),
+            'deltas': deltas,
+            'spanning_tree_state': self._stp_state()
+        })
+
+    @_writer
     def run_scenario(self, scenario_name):
+        """Apply a scenario's operations to the current topology immediately, ignoring its timing."""
         self._log_request(f'/api/test/scenario/{scenario_name}', 'POST')
-        if scenario_name == 'link_failure':
-            result = self.topology.inject_link_failure('Node1', 'Node2')
-            if result:
-                self._recalculate_stp()
-                self.logger.scenario_execution('link_failure', 'success')
-                self._log_response(f'/api/test/scenario/{scenario_name}', 200, 'POST')
-                return jsonify({'status': 'success', 'message': 'Link failure scenario executed'})
-        elif scenario_name == 'link_recovery':
-            result = self.topology.inject_link_recovery('Node1', 'Node2')
-            if result:
-                self._recalculate_stp()
-                self.logger.scenario_execution('link_recovery', 'success')
-                self._log_response(f'/api/test/scenario/{scenario_name}', 200, 'POST')
-                return jsonify({'status': 'success', 'message': 'Link recovery scenario executed'})
-        elif scenario_name == 'node_failure':
-            result = self.topology.inject_node_failure('Node3')
-            if result:
-                self._recalculate_stp()
-                self.logger.scenario_execution('node_failure', 'success')
-                self._log_response(f'/api/test/scenario/{scenario_name}', 200, 'POST')
-                return jsonify({'status': 'success', 'message': 'Node failure scenario executed'})
+        scenario = self.scenarios.get(scenario_name)
+        try:
+            operations = scenario.operations(self.topology) if scenario else None
+        except ScenarioError:
+            operations = None
+        if operations:
+            OperationBatch.from_payload(self.topology, operations).apply()
+            self._record_mutation(operations)
+            self._recalculate_stp()
+            self.logger.scenario_execution(scenario_name, 'success')
+            self._log_response(f'/api/test/scenario/{scenario_name}', 200, 'POST')
+            return jsonify({
+                'status': 'success',
+                'message': f"{scenario_name.replace('_', ' ').capitalize()} scenario executed",
+                'spanning_tree_state': self._stp_state()
+            })
         self.logger.scenario_execution(scenario_name, 'failed')
         self._log_response(f'/api/test/scenario/{scenario_name}', 400, 'POST')
         return jsonify({'status': 'error', 'message': 'Unknown scenario'}), 400
@@ -176,138 +835,590 @@ class NetworkAPI:
         self._log_request('/api/test/status', 'GET')
         result = jsonify({
             'status': 'ready',
-            'scenarios': ['link_failure', 'link_recovery', 'node_failure']
+            'scenarios': list(self.scenarios.scenarios)
         })
         self._log_response('/api/test/status', 200, 'GET')
         return result
 
+    def list_scenarios(self):
+        self._log_request('/api/scenarios', 'GET')
+        result = jsonify({'scenarios': self.scenarios.list()})
+        self._log_response('/api/scenarios', 200, 'GET')
+        return result
+
+    def upload_scenario(self):
+        self._log_request('/api/scenarios', 'POST')
+        try:
+            scenario = Scenario.parse(request.get_data(as_text=True), request.content_type or '')
+            self.scenarios.add(scenario)
+        except ScenarioError as e:
+            self._log_response('/api/scenarios', 400, 'POST')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        self._log_response('/api/scenarios', 201, 'POST')
+        return jsonify({'status': 'success', 'scenario': scenario.to_dict()}), 201
+
+    def get_scenario(self, name):
+        self._log_request(f'/api/scenarios/{name}', 'GET')
+        scenario = self.scenarios.get(name)
+        if not scenario:
+            self._log_response(f'/api/scenarios/{name}', 404, 'GET')
+            return jsonify({'status': 'error', 'message': 'Scenario not found'}), 404
+        self._log_response(f'/api/scenarios/{name}', 200, 'GET')
+        return jsonify(scenario.to_dict())
+
+    def start_scenario(self, name):
+        """
+        Run a scenario in the background. By default it runs against a clone of
+        the session's topology; with `live` it mutates the session itself and
+        publishes every step. `wait` blocks until the run finishes.
+        """
+        endpoint = f'/api/scenarios/{name}/run'
+        self._log_request(endpoint, 'POST')
+        scenario = self.scenarios.get(name)
+        if not scenario:
+            self._log_response(endpoint, 404, 'POST')
+            return jsonify({'status': 'error', 'message': 'Scenario not found'}), 404
+        options = request.get_json(silent=True) or {}
+        live = bool(options.get('live'))
+        simulation = self._session()
+
+        try:
+            if live:
+                runner = ScenarioRunner(
+                    scenario, self.topology, options.get('clock'),
+                    self.recompute_quiet_period, self.recompute_max_delay,
+                    lock=self._write_lock,
+                    apply=lambda op: self._in_session(simulation, self._apply_scenario_operation, op),
+                    recompute=lambda: self._in_session(simulation, self._apply_stp)
+                )
+            else:
+                with self._write_lock:
+                    clone = persistence.loads(persistence.dumps(self.topology))
+                runner = ScenarioRunner(
+                    scenario, clone, options.get('clock'),
+                    self.recompute_quiet_period, self.recompute_max_delay
+                )
+            scenario.operations(runner.topology)
+        except ScenarioError as e:
+            self._log_response(endpoint, 400, 'POST')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        # Keep the session resident while the run uses it.
+        self.sessions.acquire(simulation.session_id)
+        run = self.scenarios.submit(runner, simulation.session_id, live,
+                                    on_done=lambda: self.sessions.release(simulation))
+        self.logger.scenario_execution(name, 'started')
+        if options.get('wait'):
+            run = self.scenarios.wait(run['run_id'])
+            self._log_response(endpoint, 200, 'POST')
+            return jsonify(run)
+        self._log_response(endpoint, 202, 'POST')
+        return jsonify(run), 202
+
+    @_writer
+    def _apply_scenario_operation(self, operation: dict):
+        OperationBatch.from_payload(self.topology, [operation]).apply()
+        self._record_mutation([operation])
+        if 'node_id' in operation:
+            self._node_event(operation['node_id'], operation['op'], {'scenario': True})
+        else:
+            self._link_event(operation['link_id'], operation['op'], {'scenario': True})
+
+    def start_chaos(self):
+        self._log_request('/api/chaos', 'POST')
+        options = request.get_json(silent=True) or {}
+        try:
+            trials = int(options.get('trials', 1000))
+            if trials > 1000000:
+                raise ValueError('trials must be at most 1000000')
+            workers = options.get('workers')
+            with self._write_lock:
+                snapshot = persistence.dumps(self.topology)
+            campaign = ChaosCampaign(
+                snapshot,
+                trials,
+                k_links=int(options.get('k_links', 1)),
+                k_nodes=int(options.get('k_nodes', 0)),
+                seed=int(options.get('seed', 0)),
+                workers=min(int(workers), os.cpu_count() or 1) if workers else None,
+                chunk_size=int(options['chunk_size']) if 'chunk_size' in options else None
+            )
+        except (TypeError, ValueError) as e:
+            self._log_response('/api/chaos', 400, 'POST')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        with self._chaos_lock:
+            campaign_id = f'chaos-{next(self._chaos_ids)}'
+            self.chaos_campaigns[campaign_id] = campaign
+            finished = [
+                key for key, kept in self.chaos_campaigns.items() if kept.status not in ('pending', 'running')
+            ]
+            for key in finished[:max(0, len(self.chaos_campaigns) - self.keep_chaos_campaigns)]:
+                del self.chaos_campaigns[key]
+        threading.Thread(target=campaign.run, name=campaign_id, daemon=True).start()
+        self._topology_change('chaos_campaign', {'campaign_id': campaign_id, 'trials': trials})
+        self._log_response('/api/chaos', 202, 'POST')
+        return jsonify(dict(campaign.summary(), campaign_id=campaign_id)), 202
+
+    def get_chaos(self, campaign_id):
+        """Aggregated results so far; with `follow=1`, an SSE stream of them until the campaign ends."""
+        self._log_request(f'/api/chaos/{campaign_id}', 'GET')
+        campaign = self.chaos_campaigns.get(campaign_id)
+        if not campaign:
+            self._log_response(f'/api/chaos/{campaign_id}', 404, 'GET')
+            return jsonify({'status': 'error', 'message': 'Campaign not found'}), 404
+
+        if request.args.get('follow') in ('1', 'true'):
+            def stream():
+                last = None
+                while True:
+                    summary = dict(campaign.summary(), campaign_id=campaign_id)
+                    if summary['completed'] != last or summary['status'] not in ('pending', 'running'):
+                        last = summary['completed']
+                        yield f"data: {json.dumps(summary)}\n\n"
+                    if summary['status'] not in ('pending', 'running'):
+                        return
+                    time.sleep(0.5)
+
+            self._log_response(f'/api/chaos/{campaign_id}', 200, 'GET')
+            return Response(stream(), mimetype='text/event-stream')
+
+        self._log_response(f'/api/chaos/{campaign_id}', 200, 'GET')
+        return jsonify(dict(campaign.summary(), campaign_id=campaign_id))
+
+    def cancel_chaos(self, campaign_id):
+        self._log_request(f'/api/chaos/{campaign_id}', 'DELETE')
+        campaign = self.chaos_campaigns.get(campaign_id)
+        if not campaign:
+            self._log_response(f'/api/chaos/{campaign_id}', 404, 'DELETE')
+            return jsonify({'status': 'error', 'message': 'Campaign not found'}), 404
+        campaign.cancel()
+        self._log_response(f'/api/chaos/{campaign_id}', 200, 'DELETE')
+        return jsonify({'status': 'success', 'message': f'Campaign {campaign_id} cancelling'})
+
+    def get_contingency(self):
+        """
+        Impact of every single node and link failure (and, with `double=1`,
+        every partitioning pair of link failures) on the converged tree of the
+        published snapshot. Results are cached per session until the topology
+        generation changes; `limit` caps each listed section.
+        """
+        self._log_request('/api/analysis/contingency', 'GET')
+        double = request.args.get('double') in ('1', 'true')
+        try:
+            limit = int(request.args.get('limit', 100))
+            if limit < 0:
+                raise ValueError('limit must be non-negative')
+        except ValueError as e:
+            self._log_response('/api/analysis/contingency', 400, 'GET')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        simulation = self._session()
+        snapshot = self.snapshot
+        key = (snapshot.generation, double)
+        cached = simulation.contingency
+        hit = cached is not None and cached[0] == key
+        if hit:
+            result = cached[1]
+        else:
+            result = ContingencyAnalysis(snapshot, double).run()
+            # Generations restart with a replaced topology, whose install clears the cache.
+            if self.snapshot.source() is snapshot.source():
+                simulation.contingency = (key, result)
+
+        sections = ('bridges', 'articulation_points', 'links', 'nodes')
+        body = dict(result, cached=hit, **{name: result[name][:limit] for name in sections})
+        if double:
+            cuts = result['double']['cuts'][:limit]
+            body['double'] = dict(result['double'], listed=len(cuts), cuts=cuts)
+        self._log_response('/api/analysis/contingency', 200, 'GET')
+        return jsonify(body)
+
+    def get_path(self):
+        """
+        Forwarding path between two nodes (ids or names) from the tree index
+        of the published snapshot: hop count, STP path cost, latency and the
+        nodes and links in order.
+        """
+        self._log_request('/api/path', 'GET')
+        src, dst = request.args.get('src'), request.args.get('dst')
+        if not src or not dst:
+            self._log_response('/api/path', 400, 'GET')
+            return jsonify({'status': 'error', 'message': 'src and dst are required'}), 400
+
+        snapshot = self.snapshot
+        nodes = [self._snapshot_node_id(snapshot, n) for n in (src, dst)]
+        if None in nodes:
+            self._log_response('/api/path', 404, 'GET')
+            return jsonify({'status': 'error', 'message': 'Node not found'}), 404
+        index = snapshot.tree_index
+        a, b = index.index[nodes[0]], index.index[nodes[1]]
+        path = index.path(a, b)
+
+        result = {'src': nodes[0], 'dst': nodes[1], 'generation': index.generation, 'reachable': path is not None}
+        if path is None:
+            if not index.active[a]:
+                result['reason'] = 'src_failed'
+            elif not index.active[b]:
+                result['reason'] = 'dst_failed'
+            else:
+                result['reason'] = 'partitioned'
+        else:
+            result.update(path)
+        self._log_response('/api/path', 200, 'GET')
+        return jsonify(result)
+
+    @staticmethod
+    def _snapshot_node_id(snapshot: TopologySnapshot, key: str):
+        """`key` as a node id of `snapshot`, resolving node names too."""
+        if key in snapshot.topology['nodes']:
+            return key
+        return next((n['node_id'] for n in snapshot.nodes if n['node_name'] == key), None)
+
+    def get_reachability(self):
+        """
+        All-pairs reachability of the published snapshot. `format=rle` (the
+        default) lists the active nodes grouped by forwarding component with one
+        run per component; `format=bitset` returns `limit` packed matrix rows
+        from `offset`, and `format=ids` the node order of the bitset columns in
+        windows of the same size. All include the change since the previous
+        generation.
+        """
+        self._log_request('/api/reachability', 'GET')
+        fmt = request.args.get('format', 'rle')
+        try:
+            if fmt not in ('rle', 'bitset', 'ids'):
+                raise ValueError('format must be rle, bitset or ids')
+            offset = int(request.args.get('offset', 0))
+            limit = int(request.args.get('limit', 64))
+            if offset < 0 or not 0 < limit <= MAX_ROWS:
+                raise ValueError(f'offset must be non-negative and limit between 1 and {MAX_ROWS}')
+        except ValueError as e:
+            self._log_response('/api/reachability', 400, 'GET')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        labels = self.snapshot.reachability
+        body = dict(labels.summary(), format=fmt, diff=labels.diff())
+        if fmt == 'rle':
+            body.update(labels.runs())
+        elif fmt == 'bitset':
+            body.update(labels.rows(offset, limit))
+        else:
+            body.update(labels.node_ids(offset, limit))
+        self._log_response('/api/reachability', 200, 'GET')
+        return jsonify(body)
+
+    def get_utilization(self):
+        """Per-link load of the session's traffic matrix on the published tree, busiest first."""
+        self._log_request('/api/analysis/utilization', 'GET')
+        try:
+            limit = int(request.args.get('limit', 100))
+        except ValueError:
+            self._log_response('/api/analysis/utilization', 400, 'GET')
+            return jsonify({'status': 'error', 'message': 'limit must be an integer'}), 400
+        result = self.snapshot.utilization
+        if result is None:
+            self._log_response('/api/analysis/utilization', 404, 'GET')
+            return jsonify({'status': 'error', 'message': 'No traffic matrix set'}), 404
+        self._log_response('/api/analysis/utilization', 200, 'GET')
+        return jsonify(dict(result, links=result['links'][:limit]))
+
+    def set_traffic_matrix(self):
+        self._log_request('/api/analysis/utilization', 'POST')
+        payload = request.get_json(silent=True)
+        try:
+            matrix = TrafficMatrix.from_payload(payload)
+            unknown = matrix.unknown_nodes(self.topology)
+            if unknown:
+                raise ValueError(f"Node not found: {', '.join(unknown[:10])}")
+            threshold = payload.get('threshold', 1.0)
+            if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not threshold > 0:
+                raise ValueError('threshold must be a positive number')
+        except ValueError as e:
+            self._log_response('/api/analysis/utilization', 400, 'POST')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        simulation = self._session()
+        with self._write_lock:
+            simulation.traffic_matrix = matrix
+            simulation.utilization_threshold = float(threshold)
+            self._publish_snapshot(full=True)
+            result = self.snapshot.utilization
+        self._log_response('/api/analysis/utilization', 200, 'POST')
+        return jsonify(dict(result, links=result['links'][:100]))
+
+    @_writer
+    def clear_traffic_matrix(self):
+        self._log_request('/api/analysis/utilization', 'DELETE')
+        self._session().traffic_matrix = None
+        self._log_response('/api/analysis/utilization', 200, 'DELETE')
+        return jsonify({'status': 'success'})
+
+    def get_dataplane(self):
+        """Counters published by the last data-plane write."""
+        self._log_request('/api/dataplane', 'GET')
+        result = jsonify(self.dataplane_status)
+        self._log_response('/api/dataplane', 200, 'GET')
+        return result
+
+    def attach_hosts(self):
+        """Attach `count` hosts to `node_id`, or `per_node` hosts to every node."""
+        self._log_request('/api/dataplane/hosts', 'POST')
+        payload = request.get_json(silent=True) or {}
+        try:
+            if not isinstance(payload, dict):
+                raise ValueError('body must be an object')
+            node_id = payload.get('node_id')
+            count = payload.get('per_node' if node_id is None else 'count', 1)
+            if isinstance(count, bool) or not isinstance(count, int) or not 0 < count <= 1000:
+                raise ValueError('count must be an integer between 1 and 1000')
+            with self._write_lock:
+                node_ids = [node_id] if node_id is not None else list(self.topology.nodes)
+                hosts = [h.to_dict() for h in self.dataplane.attach_hosts(node_ids, count)]
+                self.dataplane_status = self.dataplane.get_status()
+        except ValueError as e:
+            self._log_response('/api/dataplane/hosts', 400, 'POST')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        self._log_response('/api/dataplane/hosts', 201, 'POST')
+        return jsonify({'status': 'success', 'attached': len(hosts), 'hosts': hosts[:100]}), 201
+
+    def send_traffic(self):
+        """
+        Send frames between attached hosts: `src`/`dst` MACs for a single frame
+        walked hop by hop, otherwise `frames` uniform random pairs through the
+        bulk path.
+        """
+        self._log_request('/api/dataplane/traffic', 'POST')
+        payload = request.get_json(silent=True) or {}
+        try:
+            if not isinstance(payload, dict):
+                raise ValueError('body must be an object')
+            with self._write_lock:
+                if 'src' in payload or 'dst' in payload:
+                    if payload.get('src') not in self.dataplane.hosts:
+                        raise ValueError(f"Unknown source host: {payload.get('src')}")
+                    result = self.dataplane.send(payload['src'], str(payload.get('dst')))
+                else:
+                    frames = payload.get('frames', 1000)
+                    if isinstance(frames, bool) or not isinstance(frames, int) or not 0 < frames <= 10_000_000:
+                        raise ValueError('frames must be an integer between 1 and 10000000')
+                    seed = payload.get('seed')
+                    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int) or seed < 0):
+                        raise ValueError('seed must be a non-negative integer')
+                    src, dst = self.dataplane.random_traffic(frames, seed)
+                    result = self.dataplane.send_bulk(src, dst)
+                self.dataplane_status = self.dataplane.get_status()
+        except ValueError as e:
+            self._log_response('/api/dataplane/traffic', 400, 'POST')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+        self._log_response('/api/dataplane/traffic', 200, 'POST')
+        return jsonify(result)
+
+    def list_scenario_runs(self):
+        self._log_request('/api/scenarios/runs', 'GET')
+        result = jsonify({'runs': self.scenarios.list_runs()})
+        self._log_response('/api/scenarios/runs', 200, 'GET')
+        return result
+
+    def get_scenario_run(self, run_id):
+        self._log_request(f'/api/scenarios/runs/{run_id}', 'GET')
+        run = self.scenarios.get_run(run_id)
+        if not run:
+            self._log_response(f'/api/scenarios/runs/{run_id}', 404, 'GET')
+            return jsonify({'status': 'error', 'message': 'Run not found'}), 404
+        self._log_response(f'/api/scenarios/runs/{run_id}', 200, 'GET')
+        return jsonify(run)
+
     def debug_status(self):
         self._log_request('/api/debug/status', 'GET')
-        nodes = self.topology.get_all_nodes()
-        links = self.topology.get_all_links()
-        
-        active_nodes = sum(1 for n in nodes if n.state.value == 'ACTIVE')
-        failed_nodes = len(nodes) - active_nodes
-        up_links = sum(1 for l in links if l.state.value == 'UP')
-        down_links = sum(1 for l in links if l.state.value == 'DOWN')
-        
+        snapshot = self.snapshot
+        summary = snapshot.summary
+
         result = jsonify({
             'topology': {
-                'total_nodes': len(nodes),
-                'active_nodes': active_nodes,
-                'failed_nodes': failed_nodes,
-                'total_links': len(links),
-                'up_links': up_links,
-                'down_links': down_links,
-                'spanning_tree_links': len(self.topology.spanning_tree_links)
+                'total_nodes': summary['total_nodes'],
+                'active_nodes': summary['active_nodes'],
+                'failed_nodes': summary['failed_nodes'],
+                'total_links': summary['total_links'],
+                'up_links': summary['up_links'],
+                'down_links': summary['down_links'],
+                'spanning_tree_links': summary['spanning_tree_links']
             },
             'root_node': {
-                'node_id': self.topology.root_node.id if self.topology.root_node else None,
-                'node_name': self.topology.root_node.node_name if self.topology.root_node else None
+                'node_id': summary['root_node_id'],
+                'node_name': summary['root_node_name']
             },
-            'stp': self.stp_calculator.get_spanning_tree_info(),
+            'stp': snapshot.spanning_tree,
+            'snapshot_version': snapshot.version,
+            'recompute': self.recompute_scheduler.get_status(),
+            'journal': self.journal.get_status() if self.journal else None,
+            'session': self._session().get_status(),
             'timestamp': time.time()
         })
         self._log_response('/api/debug/status', 200, 'GET')
         return result
 
     def debug_node(self, node_id):
+        """
+        The node as published in the current snapshot. The root path cost and
+        parent port come from the snapshot's tree index.
+        """
         self._log_request(f'/api/debug/nodes/{node_id}', 'GET')
-        node = self.topology.get_node(node_id)
-        if not node:
+        snapshot = self.snapshot
+        collection = snapshot.node_collection
+        if node_id not in collection.position:
             self._log_response(f'/api/debug/nodes/{node_id}', 404, 'GET')
             return jsonify({'status': 'error', 'message': 'Node not found'}), 404
-        
+        node = collection.items[collection.position[node_id]]
+        nodes, links = snapshot.topology['nodes'], snapshot.link_collection
+        in_tree = links.indexes['in_tree']
+
         connected_links = []
-        for link in self.topology.get_all_links():
-            nodes = link.get_connected_nodes()
-            if node_id in nodes:
-                other_node_id = nodes[0] if nodes[1] == node_id else nodes[1]
-                other_node = self.topology.get_node(other_node_id)
-                connected_links.append({
-                    'link_id': link.link_id,
-                    'state': link.state.value,
-                    'connected_to': other_node.node_name if other_node else other_node_id,
-                    'bandwidth': link.bandwidth,
-                    'latency': link.latency,
-                    'is_in_spanning_tree': link.link_id in self.topology.spanning_tree_links
-                })
-        
+        for link_id in sorted(links.indexes['node'].get(node_id, ()), key=links.position.__getitem__):
+            link = links.items[links.position[link_id]]
+            node1, node2 = link['nodes']
+            other_node_id = node1 if node2 == node_id else node2
+            other_node = nodes.get(other_node_id)
+            connected_links.append({
+                'link_id': link_id,
+                'state': link['state'],
+                'connected_to': other_node['node_name'] if other_node else other_node_id,
+                'bandwidth': link['bandwidth'],
+                'latency': link['latency'],
+                'is_in_spanning_tree': link_id in in_tree
+            })
+
+        index = snapshot.tree_index
+        i = index.index.get(node_id)
+        parent_link = index.parent_link[i] if i is not None else None
+        parent_port = None
+        if parent_link is not None:
+            parent_port = (parent_link.port1 if parent_link.port1.node_id == node_id else parent_link.port2).port_id
         result = jsonify({
-            'node': node.to_dict(),
-            'ports': {str(p.port_id): {
-                'port_id': p.port_id,
-                'state': p.state.value,
-                'node_id': p.node_id
-            } for p in node.ports.values()},
+            'node': node,
+            'ports': {str(p['port_id']): {
+                'port_id': p['port_id'],
+                'state': p['state'],
+                'node_id': p['node_id']
+            } for p in node['ports'].values()},
             'connected_links': connected_links,
-            'is_root': node.is_root,
-            'root_path_cost': node.root_path_cost,
-            'parent_port': node.parent_port.port_id if node.parent_port else None
+            'is_root': node['is_root'],
+            'root_path_cost': round(float(index.cost[i]), 6) if i is not None else None,
+            'parent_port': parent_port
         })
         self._log_response(f'/api/debug/nodes/{node_id}', 200, 'GET')
         return result
 
     def debug_link(self, link_id):
+        """
+        The link as published in the current snapshot. Port ids, LACP success
+        counts and the creation time are not in the snapshot and are read
+        from the link object without the writer lock.
+        """
         self._log_request(f'/api/debug/links/{link_id}', 'GET')
-        link = self.topology.get_link(link_id)
-        if not link:
+        snapshot = self.snapshot
+        collection = snapshot.link_collection
+        source = snapshot.source()
+        live = source.links.get(link_id) if source is not None else None
+        if link_id not in collection.position or live is None:
             self._log_response(f'/api/debug/links/{link_id}', 404, 'GET')
             return jsonify({'status': 'error', 'message': 'Link not found'}), 404
-        
-        nodes = link.get_connected_nodes()
-        node1 = self.topology.get_node(nodes[0]) if len(nodes) > 0 else None
-        node2 = self.topology.get_node(nodes[1]) if len(nodes) > 1 else None
-        
+        link = collection.items[collection.position[link_id]]
+        nodes = snapshot.topology['nodes']
+
+        def endpoint(node_id, port):
+            node = nodes.get(node_id)
+            return {'node_id': node_id, 'node_name': node['node_name'] if node else None, 'port_id': port.port_id}
+
         result = jsonify({
-            'link': link.to_dict(),
+            'link': link,
             'endpoints': {
-                'node1': {
-                    'node_id': nodes[0] if len(nodes) > 0 else None,
-                    'node_name': node1.node_name if node1 else None,
-                    'port_id': link.port1.port_id if link.port1 else None
-                },
-                'node2': {
-                    'node_id': nodes[1] if len(nodes) > 1 else None,
-                    'node_name': node2.node_name if node2 else None,
-                    'port_id': link.port2.port_id if link.port2 else None
-                }
+                'node1': endpoint(link['nodes'][0], live.port1),
+                'node2': endpoint(link['nodes'][1], live.port2)
             },
             'lacp': {
-                'success_count': link.lacp_success_count,
-                'fail_count': link.lacp_fail_count,
-                'last_lacp_time': link.last_lacp_time
+                'success_count': live.lacp_success_count,
+                'fail_count': link['lacp_fail_count'],
+                'last_lacp_time': live.last_lacp_time
             },
-            'is_in_spanning_tree': link_id in self.topology.spanning_tree_links,
-            'created_at': link.created_at
+            'is_in_spanning_tree': link_id in collection.indexes['in_tree'],
+            'created_at': live.created_at
         })
         self._log_response(f'/api/debug/links/{link_id}', 200, 'GET')
         return result
 
+    def debug_profile(self):
+        """Phase breakdown of the last `limit` recomputes and rolling percentiles per phase, in ms."""
+        self._log_request('/api/debug/profile', 'GET')
+        try:
+            limit = int(request.args.get('limit', 20))
+        except ValueError:
+            self._log_response('/api/debug/profile', 400, 'GET')
+            return jsonify({'status': 'error', 'message': 'limit must be an integer'}), 400
+        profiler = self.profiler
+        result = jsonify({
+            'enabled': profiler.enabled,
+            'recent': profiler.recent(limit),
+            'percentiles': profiler.percentiles()
+        })
+        self._log_response('/api/debug/profile', 200, 'GET')
+        return result
+
     def debug_logs(self):
         self._log_request('/api/debug/logs', 'GET')
         import os
         log_dir = 'logs'
         logs = []
-        
-        if os.path.exists(log_dir):
-            for filename in os.listdir(log_dir):
-                if filename.endswith('.log'):
-                    filepath = os.path.join(log_dir, filename)
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            lines = f.readlines()[-100:]
-                            logs.append({
-                                'filename': filename,
-                                'size': os.path.getsize(filepath),
-                                'last_100_lines': [line.strip() for line in lines]
-                            })
-                    except Exception as e:
-                        logs.append({
-                            'filename': filename,
-                            'error': str(e)
-                        })
-        
+
+        try:
+            line_count = min(int(request.args.get('lines', 100)), 5000)
+            if line_count < 1:
+                raise ValueError('lines must be at least 1')
+            timeout = min(float(request.args.get('timeout', 30)), 300.0)
+            if not timeout >= 0:
+                raise ValueError('timeout must be non-negative')
+            log_filter = LogFilter(
+                level=request.args.get('level'),
+                since=parse_since(request.args.get('since')),
+                contains=request.args.get('q')
+            )
+        except ValueError as e:
+            self._log_response('/api/debug/logs', 400, 'GET')
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
+        filenames = sorted(f for f in os.listdir(log_dir) if f.endswith('.log')) if os.path.exists(log_dir) else []
+        requested = request.args.get('file')
+        if requested:
+            filenames = [f for f in filenames if f == os.path.basename(requested)]
+
+        if request.args.get('follow') in ('1', 'true'):
+            if not filenames:
+                self._log_response('/api/debug/logs', 404, 'GET')
+                return jsonify({'status': 'error', 'message': 'Log file not found'}), 404
+            filepath = os.path.join(log_dir, filenames[-1])
+
+            def stream():
+                for line in tail(filepath, line_count, log_filter, LOG_SCAN_BYTES):
+                    yield f"data: {line}\n\n"
+                for line in follow(filepath, log_filter, timeout=timeout):
+                    yield f"data: {line}\n\n"
+
+            self._log_response('/api/debug/logs', 200, 'GET')
+            return Response(stream(), mimetype='text/event-stream')
+
+        for filename in filenames:
+            filepath = os.path.join(log_dir, filename)
+            try:
+                logs.append({
+                    'filename': filename,
+                    'size': os.path.getsize(filepath),
+                    'lines': tail(filepath, line_count, log_filter, LOG_SCAN_BYTES)
+                })
+            except Exception as e:
+                logs.append({
+                    'filename': filename,
+                    'error': str(e)
+                })
+
         result = jsonify({
             'log_directory': os.path.abspath(log_dir),
             'logs': logs
@@ -316,7 +1427,7 @@ class NetworkAPI:
         return result
 
     def _setup_4_node_full_mesh(self):
-        self.topology = Topology()
+        topology = Topology()
 
         node1 = Node("Node1")
         node2 = Node("Node2")
@@ -336,14 +1447,14 @@ class NetworkAPI:
         node4.add_port(2)
         node4.add_port(3)
 
-        self.topology.add_node(node1)
-        self.topology.add_node(node2)
-        self.topology.add_node(node3)
-        self.topology.add_node(node4)
+        topology.add_node(node1)
+        topology.add_node(node2)
+        topology.add_node(node3)
+        topology.add_node(node4)
 
         def connect(n1, n2, p1, p2):
             link = Link(n1.get_port(p1), n2.get_port(p2), 1000, 1)
-            self.topology.add_link(link)
+            topology.add_link(link)
 
         connect(node1, node2, 1, 1)
         connect(node1, node3, 2, 1)
@@ -352,19 +1463,125 @@ class NetworkAPI:
         connect(node2, node4, 3, 2)
         connect(node3, node4, 3, 3)
 
-        self.stp_calculator = STPCalculator(self.topology)
+        self._install_topology(topology)
+
+    def _install_topology(self, topology: Topology):
+        self.topology = topology
+        self.stp_calculator = STPCalculator(topology)
+        convergence = self.convergence
+        topology.fault_listeners.append(convergence.record_fault)
+        self.dataplane = DataPlane(topology)
+        self.dataplane_status = self.dataplane.get_status()
+        # Demands and cached analyses refer to the replaced topology.
+        self._session().traffic_matrix = None
+        self._session().contingency = None
+        self._attach_engines()
+
+    def _attach_engines(self):
+        # Protocol engines share the topology objects; they are only started by
+        # callers that drive an event loop, but their counters feed /metrics.
+        self.bpdu_manager = BPDUManager()
+        self.lacp_detector = LACPDetector()
+        for node in self.topology.get_all_nodes():
+            self.bpdu_manager.add_node(node)
+        for link in self.topology.get_all_links():
+            self.lacp_detector.add_link(link)
 
     def _recalculate_stp(self):
-        current_time = time.time()
-        if current_time - self.last_topology_change < self.topology_change_cooldown:
+        self.recompute_scheduler.mark_dirty()
+
+    def _stp_state(self) -> str:
+        return 'pending' if self.recompute_scheduler.is_pending() else 'current'
+
+    def _apply_stp(self):
+        # Written out instead of @_writer so the profile trace also covers the
+        # snapshot published for the new tree.
+        with self._write_lock, self.profiler.trace('recompute', session_id=self._session().session_id):
+            self.last_topology_change = time.time()
+            started = time.perf_counter()
+            self.stp_calculator.update_and_apply()
+            elapsed = time.perf_counter() - started
+            self.stp_recompute_duration.observe(elapsed)
+            self.stp_recomputes.inc()
+            if self.journal:
+                self.journal.append('recompute', self.topology.generation, duration_ms=round(elapsed * 1000, 3))
+
+            root_name = self.topology.root_node.node_name if self.topology.root_node else 'None'
+            link_count = len(self.topology.spanning_tree_links)
+            self._stp_recalculation(root_name, link_count)
+            self._publish_snapshot(full=True)
+            with span('verify_forwarding'):
+                self._verify_forwarding()
+            self.convergence.note_recompute()
+
+    def _verify_forwarding(self):
+        """Broadcast-storm guard: the published forwarding ports must form a loop-free tree over the root's partition."""
+        result = ForwardingVerification(self.snapshot).run()
+        self.forwarding_check = result
+        if result['ok']:
             return
-        self.last_topology_change = current_time
-        self.stp_calculator.update_and_apply()
+        self.forwarding_violations.inc()
+        details = {key: result[key] for key in ('generation', 'cycle_count', 'orphaned_count')}
+        self.logger.warning('Forwarding verification failed', params=details)
+        self.events.record('stp', 'forwarding_violation', {
+            'cycle_links': result['cycle_links'],
+            'orphaned_nodes': result['orphaned_nodes']
+        }, details)
 
-        root_name = self.topology.root_node.node_name if self.topology.root_node else 'None'
-        link_count = len(self.topology.spanning_tree_links)
-        self.logger.stp_recalculation(root_name, link_count)
+    def _publish_snapshot(self, full: bool = False):
+        """
+        While a recompute is pending, mutations only patch the changed nodes and
+        links into the current snapshot; the recompute (or `full`) captures
+        connectivity, indexes, reachability, the tree index and utilization again.
+        """
+        with self._write_lock:
+            self._snapshot_version += 1
+            previous = self.snapshot
+            if (not full and previous is not None and self.recompute_scheduler.is_pending()
+                    and previous.can_patch(self.topology)):
+                snapshot = TopologySnapshot.patch(previous, self._snapshot_version, self.topology)
+                if self._session().traffic_matrix is None:
+                    snapshot.utilization = None
+                self.snapshot = snapshot
+                return
+            snapshot = TopologySnapshot.capture(self._snapshot_version, self.topology, self.stp_calculator)
+            simulation = self._session()
+            with span('reachability'):
+                snapshot.reachability = ReachabilityLabels.publish(
+                    self.topology, self.snapshot.reachability if self.snapshot else None
+                )
+            with span('tree_index'):
+                snapshot.tree_index = TreeIndex.of(self.topology)
+            if simulation.traffic_matrix is not None:
+                with span('utilization'):
+                    snapshot.utilization = UtilizationAnalysis(
+                        self.topology, simulation.traffic_matrix, simulation.utilization_threshold
+                    ).run()
+            self.snapshot = snapshot
+            self.connectivity_duration.observe(self.snapshot.connectivity_seconds)
+
+    def run(self, host='0.0.0.0', port=5000, debug=False, production: bool = False, threads: int = 8):
+        if debug and not self.request_profiling:
+            self._bind_request_profiling()
+        elif production and not debug:
+            self.request_profiling = False
+
+        if not production:
+            self.logger.info(f"Starting server on {host}:{port}")
+            self.app.run(host=host, port=port, debug=debug, threaded=True)
+            return
+
+        # Worker processes would each own a separate topology, so concurrency
+        # comes from threads sharing one writer and the published snapshots.
+        try:
+            import waitress
+        except ImportError:
+            waitress = None
 
-    def run(self, host='0.0.0.0', port=5000, debug=False):
-        self.logger.info(f"Starting server on {host}:{port}")
-        self.app.run(host=host, port=port, debug=debug)
+        if waitress:
+            self.logger.info(f"Starting waitress server on {host}:{port}", params={'threads': threads})
+            waitress.serve(self.app, host=host, port=port, threads=threads)
+        else:
+            from werkzeug.serving import make_server
+            self.logger.info(f"Starting threaded WSGI server on {host}:{port}")
+            make_server(host, port, self.app, threaded=True).serve_forever()
@@ -0,0 +1,109 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from backend.core.scenario import BUILTIN_SCENARIOS, Scenario, ScenarioError, ScenarioRunner
+
+
+class ScenarioService:
+    """
+    Scenario definitions (built-in and uploaded) and their runs. Runs execute
+    on a small thread pool so several can progress at once; finished runs are
+    kept for `keep_runs` lookups, oldest dropped first.
+    """
+
+    def __init__(self, max_workers: int = 4, keep_runs: int = 100):
+        self.scenarios: Dict[str, Scenario] = {
+            name: Scenario.from_dict(data) for name, data in BUILTIN_SCENARIOS.items()
+        }
+        self.keep_runs = keep_runs
+        self._runs: 'OrderedDict[str, dict]' = OrderedDict()
+        self._run_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scenario')
+
+    def add(self, scenario: Scenario):
+        if scenario.name in BUILTIN_SCENARIOS:
+            raise ScenarioError(f'Cannot replace built-in scenario: {scenario.name}')
+        with self._lock:
+            self.scenarios[scenario.name] = scenario
+
+    def get(self, name: str) -> Optional[Scenario]:
+        return self.scenarios.get(name)
+
+    def list(self) -> List[dict]:
+        return [
+            {
+                'name': s.name,
+                'description': s.description,
+                'clock': s.clock,
+                'events': len(s.events),
+                'builtin': s.name in BUILTIN_SCENARIOS
+            }
+            for s in self.scenarios.values()
+        ]
+
+    def submit(self, runner: ScenarioRunner, session_id: str, live: bool,
+               on_done: Optional[Callable[[], None]] = None) -> dict:
+        with self._lock:
+            run_id = f'run-{next(self._run_ids)}'
+            run = {
+                'run_id': run_id,
+                'scenario': runner.scenario.name,
+                'session_id': session_id,
+                'clock': runner.clock,
+                'live': live,
+                'status': 'queued',
+                'submitted_at': time.time(),
+                'runner': runner,
+                'result': None,
+                'error': None
+            }
+            self._runs[run_id] = run
+            while len(self._runs) > self.keep_runs:
+                oldest = next(iter(self._runs.values()))
+                if oldest['status'] in ('queued', 'running'):
+                    break
+                self._runs.popitem(last=False)
+
+        def execute():
+            run['status'] = 'running'
+            try:
+                run['result'] = runner.run()
+                run['status'] = 'completed'
+            except Exception as e:
+                run['error'] = str(e)
+                run['status'] = 'failed'
+            finally:
+                if on_done:
+                    on_done()
+
+        run['future'] = self._executor.submit(execute)
+        return self.describe(run)
+
+    def wait(self, run_id: str, timeout: Optional[float] = None) -> Optional[dict]:
+        run = self._runs.get(run_id)
+        if run is None:
+            return None
+        run['future'].result(timeout)
+        return self.describe(run)
+
+    def get_run(self, run_id: str) -> Optional[dict]:
+        run = self._runs.get(run_id)
+        return self.describe(run) if run else None
+
+    def list_runs(self) -> List[dict]:
+        with self._lock:
+            runs = list(self._runs.values())
+        return [{k: v for k, v in self.describe(r).items() if k != 'result'} for r in runs]
+
+    @staticmethod
+    def describe(run: dict) -> dict:
+        runner = run['runner']
+        return dict(
+            {k: v for k, v in run.items() if k not in ('runner', 'future')},
+            progress=runner.progress,
+            total=runner.total
+        )
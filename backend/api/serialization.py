@@ -0,0 +1,152 @@
+import gzip
+import json
+from typing import Optional
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+NODE_COLUMNS = ['node_id', 'node_name', 'state', 'is_root', 'ports', 'bridge_id']
+PORT_COLUMNS = ['port_id', 'state', 'has_link']
+LINK_COLUMNS = ['link_id', 'state', 'bandwidth', 'latency', 'lacp_fail_count', 'node1', 'node2']
+CONNECTIVITY_COLUMNS = ['reachable', 'blocked_by', 'path']
+
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def encoder_name() -> str:
+    return 'orjson' if orjson is not None else 'json'
+
+
+def compact_node(node: dict) -> list:
+    return [
+        node['node_id'],
+        node['node_name'],
+        node['state'],
+        node['is_root'],
+        [[p['port_id'], p['state'], p['has_link']] for p in node['ports'].values()],
+        node['bridge_id']
+    ]
+
+
+def compact_link(link: dict) -> list:
+    node1, node2 = link['nodes']
+    return [link['link_id'], link['state'], link['bandwidth'], link['latency'], link['lacp_fail_count'], node1, node2]
+
+
+def compact_connectivity(connectivity: dict) -> list:
+    return [
+        connectivity['reachable'],
+        connectivity['blocked_by'],
+        [hop['link_id'] for hop in connectivity['path']]
+    ]
+
+
+def compact_nodes(nodes: list) -> dict:
+    return {
+        'format': 'compact',
+        'columns': {'nodes': NODE_COLUMNS, 'ports': PORT_COLUMNS},
+        'nodes': [compact_node(n) for n in nodes]
+    }
+
+
+def compact_links(links: list) -> dict:
+    return {
+        'format': 'compact',
+        'columns': {'links': LINK_COLUMNS},
+        'links': [compact_link(l) for l in links]
+    }
+
+
+def compact_topology(topology: dict) -> dict:
+    """
+    Column-oriented form of Topology.to_dict(): objects become arrays whose
+    field order is given once in `columns`, and connectivity paths are reduced
+    to link ids since the endpoints can be looked up in `links`.
+    """
+    return {
+        'format': 'compact',
+        'columns': {
+            'nodes': NODE_COLUMNS,
+            'ports': PORT_COLUMNS,
+            'links': LINK_COLUMNS,
+            'connectivity': CONNECTIVITY_COLUMNS
+        },
+        'nodes': [compact_node(n) for n in topology['nodes'].values()],
+        'links': [compact_link(l) for l in topology['links'].values()],
+        'connectivity': {
+            node_id: compact_connectivity(n['connectivity'])
+            for node_id, n in topology['nodes'].items()
+        },
+        'spanning_tree': topology['spanning_tree'],
+        'root_node': topology['root_node'],
+        'last_update': topology['last_update'],
+        'connectivity_summary': topology['connectivity_summary']
+    }
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def requested_format() -> str:
+    return 'compact' if request.args.get('format') == 'compact' else 'full'
+
+
+def json_response(payload=None, status: int = 200, cache: Optional[dict] = None, cache_key=None, builder=None) -> Response:
+    """
+    Encode `payload` (or the result of `builder()`) and compress it when the
+    client accepts it and the body is large enough to benefit.
+
+    When `cache` is given, encoded and compressed bodies are memoised under
+    `cache_key`; callers pass the cache of an immutable snapshot so repeated
+    polls of the same state skip both steps.
+    """
+    encoding = negotiate_encoding(request.headers.get('Accept-Encoding', ''))
+
+    body = cache.get((cache_key, None)) if cache is not None else None
+    if body is None:
+        body = dumps(builder() if builder else payload)
+        if cache is not None:
+            cache[(cache_key, None)] = body
+
+    if encoding and len(body) >= COMPRESS_MIN_BYTES:
+        compressed = cache.get((cache_key, encoding)) if cache is not None else None
+        if compressed is None:
+            compressed = compress(body, encoding)
+            if cache is not None:
+                cache[(cache_key, encoding)] = compressed
+        response = Response(compressed, status=status, mimetype='application/json')
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = Response(body, status=status, mimetype='application/json')
+
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
@@ -0,0 +1,314 @@
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+from backend.core import persistence
+
+
+SESSION_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+MEMORY_SAMPLE = 32
+
+
+class Simulation:
+    """
+    Everything one isolated network owns: the topology, its STP calculator and
+    protocol engines, the single-writer lock, the published snapshot, the
+    recompute scheduler and the event buffer. NetworkAPI attributes of the same
+    names resolve to the simulation of the current request.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.topology = None
+        self.stp_calculator = None
+        self.bpdu_manager = None
+        self.lacp_detector = None
+        self.recompute_scheduler = None
+        self.events = None
+        self.profiler = None
+        self.convergence = None
+        self.journal = None
+        self.snapshot = None
+        self.contingency = None
+        self.dataplane = None
+        self.dataplane_status = None
+        self.traffic_matrix = None
+        self.utilization_threshold = 1.0
+        self.forwarding_check = None
+        self.last_topology_change = 0
+        self._snapshot_version = 0
+        self._write_lock = threading.RLock()
+        self.created_at = time.time()
+        self.last_access = self.created_at
+        self.active_requests = 0
+        self.rehydrations = 0
+
+    def memory_bytes(self) -> int:
+        """
+        Approximate resident size: per-object sizes measured on a sample of
+        nodes, ports and links scaled to the full counts, plus the encoded
+        response bodies cached on the current snapshot.
+        """
+        topology = self.topology
+        total = 0
+        nodes = list(itertools.islice(topology.nodes.values(), MEMORY_SAMPLE))
+        if nodes:
+            ports = [p for n in nodes for p in n.ports.values()]
+            node_bytes = sum(_object_size(n) + sys.getsizeof(n.ports) for n in nodes) / len(nodes)
+            port_bytes = sum(_object_size(p) for p in ports) / len(ports) if ports else 0
+            port_count = sum(len(n.ports) for n in nodes) / len(nodes) * len(topology.nodes)
+            total += node_bytes * len(topology.nodes) + port_bytes * port_count
+        links = list(itertools.islice(topology.links.values(), MEMORY_SAMPLE))
+        if links:
+            total += sum(_object_size(l) for l in links) / len(links) * len(topology.links)
+
+        snapshot = self.snapshot
+        if snapshot is not None:
+            items = snapshot.nodes[:MEMORY_SAMPLE] + snapshot.links[:MEMORY_SAMPLE]
+            if items:
+                total += sum(sys.getsizeof(i) for i in items) / len(items) * (len(snapshot.nodes) + len(snapshot.links))
+            total += sum(len(body) for body in snapshot.encoded.values() if isinstance(body, bytes))
+        return int(total)
+
+    def get_status(self) -> dict:
+        return {
+            'session_id': self.session_id,
+            'state': 'active',
+            'nodes': len(self.topology.nodes),
+            'links': len(self.topology.links),
+            'memory_bytes': self.memory_bytes(),
+            'created_at': self.created_at,
+            'last_access': self.last_access,
+            'rehydrations': self.rehydrations
+        }
+
+
+def _object_size(obj) -> int:
+    return sys.getsizeof(obj) + sys.getsizeof(obj.__dict__)
+
+
+class SessionManager:
+    """
+    Hosts isolated simulations keyed by session id, most recently used last.
+
+    Idle sessions are evicted to a binary snapshot in `session_dir` when there
+    are more than `max_sessions` in memory, when their estimated memory exceeds
+    `memory_limit` bytes in total, or after `idle_timeout` seconds without a
+    request. An evicted session is rehydrated from its snapshot on next use.
+    The default session is never evicted; sessions serving a request are
+    skipped.
+    """
+
+    DEFAULT = 'default'
+
+    def __init__(
+        self,
+        create: Callable[[str], Simulation],
+        restore: Callable[[str, str], Simulation],
+        session_dir: str = 'sessions',
+        max_sessions: int = 16,
+        memory_limit: Optional[int] = None,
+        idle_timeout: Optional[float] = 1800.0
+    ):
+        self._create = create
+        self._restore = restore
+        self.session_dir = session_dir
+        self.max_sessions = max_sessions
+        self.memory_limit = memory_limit
+        self.idle_timeout = idle_timeout
+        self.default: Optional[Simulation] = None
+        self.evictions = 0
+        self._active: 'OrderedDict[str, Simulation]' = OrderedDict()
+        self._evicted: Dict[str, dict] = {}
+        # Sessions being flushed and saved; that I/O runs outside _lock.
+        self._evicting = set()
+        # Evicted sessions being restored from disk, also outside _lock; their
+        # record stays in _evicted until the restored session is published.
+        self._rehydrating = set()
+        self._lock = threading.RLock()
+        self._evicted_changed = threading.Condition(self._lock)
+
+    def set_default(self, simulation: Simulation):
+        self.default = simulation
+
+    def create(self, session_id: Optional[str] = None) -> Simulation:
+        session_id = session_id or uuid.uuid4().hex[:12]
+        if not SESSION_ID.match(session_id):
+            raise ValueError('session id must be 1-64 letters, digits, "_" or "-"')
+        with self._lock:
+            if session_id == self.DEFAULT or session_id in self._active or session_id in self._evicted:
+                raise ValueError(f'Session already exists: {session_id}')
+            simulation = self._create(session_id)
+            self._active[session_id] = simulation
+            victims = self._over_limits()
+        self._evict_all(victims)
+        return simulation
+
+    def acquire(self, session_id: str) -> Optional[Simulation]:
+        """Return the session for a request, rehydrating it if needed, and pin
+        it until release() so it cannot be evicted mid-request. Rehydration
+        runs without the manager lock; other requests for the same session
+        wait for it."""
+        with self._lock:
+            while session_id in self._evicting or session_id in self._rehydrating:
+                self._evicted_changed.wait()
+            if session_id == self.DEFAULT:
+                simulation = self.default
+            elif session_id in self._active:
+                simulation = self._active[session_id]
+                self._active.move_to_end(session_id)
+            elif session_id in self._evicted:
+                record = self._evicted[session_id]
+                self._rehydrating.add(session_id)
+                simulation = None
+            else:
+                return None
+            if simulation is not None:
+                simulation.active_requests += 1
+                simulation.last_access = time.time()
+                victims = self._over_limits()
+
+        if simulation is None:
+            simulation = self._rehydrate(session_id, record)
+            with self._lock:
+                simulation.active_requests += 1
+                simulation.last_access = time.time()
+                victims = self._over_limits()
+        self._evict_all(victims)
+        return simulation
+
+    def _rehydrate(self, session_id: str, record: dict) -> Simulation:
+        """Restore an evicted session outside the lock, then publish it."""
+        try:
+            simulation = self._restore(session_id, record['path'])
+            simulation.created_at = record['created_at']
+            simulation.rehydrations = record['rehydrations'] + 1
+            os.remove(record['path'])
+        except BaseException:
+            with self._lock:
+                self._rehydrating.discard(session_id)
+                self._evicted_changed.notify_all()
+            raise
+
+        with self._lock:
+            self._rehydrating.discard(session_id)
+            self._evicted_changed.notify_all()
+            del self._evicted[session_id]
+            self._active[session_id] = simulation
+        return simulation
+
+    def release(self, simulation: Simulation):
+        with self._lock:
+            simulation.active_requests -= 1
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            while session_id in self._evicting or session_id in self._rehydrating:
+                self._evicted_changed.wait()
+            simulation = self._active.pop(session_id, None)
+            if simulation is not None:
+                simulation.recompute_scheduler.stop()
+                simulation.convergence.stop()
+                return True
+            record = self._evicted.pop(session_id, None)
+            if record is not None:
+                os.remove(record['path'])
+                return True
+            return False
+
+    def evict(self, session_id: str) -> bool:
+        """
+        Save an idle session to disk. The recompute flush and the save run
+        without the manager lock, so other sessions are not held up;
+        requests for this session wait until it is evicted and then
+        rehydrate it.
+        """
+        with self._lock:
+            simulation = self._active.get(session_id)
+            if simulation is None or simulation.active_requests or session_id in self._evicting:
+                return False
+            self._evicting.add(session_id)
+
+        path = os.path.join(self.session_dir, f'{session_id}.trsp')
+        try:
+            # Settle any pending recompute before taking the writer lock; the
+            # scheduler's worker takes them in the opposite order.
+            simulation.recompute_scheduler.stop()
+            simulation.recompute_scheduler.flush()
+            simulation.convergence.stop()
+            with simulation._write_lock:
+                persistence.save(simulation.topology, path)
+        except BaseException:
+            with self._lock:
+                self._evicting.discard(session_id)
+                self._evicted_changed.notify_all()
+            raise
+
+        with self._lock:
+            self._evicting.discard(session_id)
+            self._evicted_changed.notify_all()
+            del self._active[session_id]
+            self._evicted[session_id] = {
+                'session_id': session_id,
+                'state': 'evicted',
+                'path': path,
+                'created_at': simulation.created_at,
+                'last_access': simulation.last_access,
+                'evicted_at': time.time(),
+                'rehydrations': simulation.rehydrations
+            }
+            self.evictions += 1
+            return True
+
+    def list(self) -> List[dict]:
+        with self._lock:
+            sessions = [self.default.get_status()] + [s.get_status() for s in self._active.values()]
+            return sessions + [dict(r) for r in self._evicted.values()]
+
+    def get_status(self, session_id: str) -> Optional[dict]:
+        with self._lock:
+            if session_id == self.DEFAULT:
+                return self.default.get_status()
+            if session_id in self._active:
+                return self._active[session_id].get_status()
+            record = self._evicted.get(session_id)
+            return dict(record) if record else None
+
+    def _over_limits(self) -> List[str]:
+        """Sessions to evict, chosen under the lock; evicted by the caller after releasing it."""
+        now = time.time()
+        # Least recently used first; pinned and already evicting sessions are skipped.
+        candidates = [
+            sid for sid, s in self._active.items()
+            if not s.active_requests and sid not in self._evicting
+        ]
+        victims = []
+        if self.idle_timeout is not None:
+            victims = [sid for sid in candidates if now - self._active[sid].last_access > self.idle_timeout]
+            candidates = [sid for sid in candidates if sid not in victims]
+
+        remaining = len(self._active) - len(self._evicting) - len(victims)
+        while candidates and remaining > self.max_sessions:
+            victims.append(candidates.pop(0))
+            remaining -= 1
+
+        if self.memory_limit is not None:
+            usage = {
+                sid: s.memory_bytes() for sid, s in self._active.items()
+                if sid not in victims and sid not in self._evicting
+            }
+            total = sum(usage.values()) + self.default.memory_bytes()
+            while candidates and total > self.memory_limit:
+                session_id = candidates.pop(0)
+                victims.append(session_id)
+                total -= usage[session_id]
+        return victims
+
+    def _evict_all(self, session_ids: List[str]):
+        for session_id in session_ids:
+            self.evict(session_id)
@@ -0,0 +1,5 @@
+import sys
+from backend.bench.suite import main
+
+
+sys.exit(main())
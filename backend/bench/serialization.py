@@ -0,0 +1,129 @@
+"""
+Bytes and milliseconds needed to encode one topology snapshot.
+
+    python -m backend.bench.serialization --nodes 10000
+
+Connectivity paths are derived from a single BFS tree so that the numbers
+isolate encoding and compression cost from the connectivity computation.
+"""
+import argparse
+import gzip
+import json
+import time
+from collections import deque
+from backend.bench.topologies import build_topology
+from backend.api import serialization
+
+
+def build_snapshot_payload(node_count: int, seed: int = 0) -> dict:
+    topology = build_topology(node_count, seed=seed)
+    nodes = topology.get_all_nodes()
+    root = nodes[0]
+
+    adjacency = {n.id: [] for n in nodes}
+    for link in topology.get_all_links():
+        n1, n2 = link.get_connected_nodes()
+        adjacency[n1].append((n2, link))
+        adjacency[n2].append((n1, link))
+
+    parent = {root.id: None}
+    queue = deque([root.id])
+    while queue:
+        current = queue.popleft()
+        for neighbor, link in adjacency[current]:
+            if neighbor not in parent:
+                parent[neighbor] = (current, link)
+                queue.append(neighbor)
+
+    def path_to_root(node_id):
+        path = []
+        while parent[node_id] is not None:
+            next_id, link = parent[node_id]
+            path.append({
+                'link_id': link.link_id,
+                'link_state': link.state.value,
+                'from_node': node_id,
+                'to_node': next_id
+            })
+            node_id = next_id
+        return path
+
+    nodes_dict = {}
+    for n in nodes:
+        data = n.to_dict()
+        data['connectivity'] = {'reachable': True, 'path': path_to_root(n.id), 'blocked_by': None}
+        nodes_dict[n.id] = data
+
+    return {
+        'nodes': nodes_dict,
+        'links': {l.link_id: l.to_dict() for l in topology.get_all_links()},
+        'spanning_tree': [p[1].link_id for p in parent.values() if p is not None],
+        'root_node': root.id,
+        'last_update': time.time(),
+        'connectivity_summary': {
+            'total_nodes': len(nodes),
+            'reachable_nodes': len(parent) - 1,
+            'unreachable_nodes': len(nodes) - len(parent)
+        }
+    }
+
+
+def _timed(fn, repeat: int):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def run(node_count: int, repeat: int = 3) -> list:
+    payload = build_snapshot_payload(node_count)
+    variants = {
+        'full': lambda: payload,
+        'compact': lambda: serialization.compact_topology(payload)
+    }
+    encoders = {'json': lambda p: json.dumps(p, separators=(',', ':')).encode('utf-8')}
+    if serialization.orjson is not None:
+        encoders['orjson'] = serialization.dumps
+
+    results = []
+    for variant, build in variants.items():
+        for encoder, encode in encoders.items():
+            body, encode_ms = _timed(lambda: encode(build()), repeat)
+            results.append({
+                'nodes': node_count, 'format': variant, 'encoder': encoder,
+                'compression': None, 'bytes': len(body), 'ms': round(encode_ms, 2)
+            })
+            compressors = {'gzip': lambda b: gzip.compress(b, compresslevel=serialization.GZIP_LEVEL)}
+            if serialization.brotli is not None:
+                compressors['br'] = lambda b: serialization.compress(b, 'br')
+            for name, compress in compressors.items():
+                compressed, compress_ms = _timed(lambda: compress(body), repeat)
+                results.append({
+                    'nodes': node_count, 'format': variant, 'encoder': encoder,
+                    'compression': name, 'bytes': len(compressed), 'ms': round(encode_ms + compress_ms, 2)
+                })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    results = run(args.nodes, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'format':<8} {'encoder':<8} {'compression':<12} {'bytes':>12} {'ms':>10}")
+    for r in results:
+        print(f"{r['format']:<8} {r['encoder']:<8} {str(r['compression']):<12} {r['bytes']:>12} {r['ms']:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+"""
+Scaling benchmarks for the core: spanning tree, connectivity, serialization
+and the BPDU engine on generated topologies of increasing size.
+
+    python -m backend.bench --sizes 10,100,1000 --output bench.json
+    python -m backend.bench --baseline bench.json      # exit 1 on regression
+
+Results are compared against the committed bench_baseline.json (10, 100
+and 1000 nodes) unless another --baseline or --no-baseline is given.
+
+Times are the best of `--repeat` runs. Peak memory is measured in a separate
+tracemalloc pass so that tracing does not inflate the timings.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+from backend.bench.topologies import build_topology
+from backend.core.bpdu import BPDU, BPDUManager
+from backend.core.dataplane import DataPlane
+from backend.core.stp import STPCalculator
+
+
+SIZES = (10, 100, 1000, 10000, 100000)
+BASELINE = os.path.join(os.path.dirname(__file__), 'bench_baseline.json')
+TOLERANCE = 0.25
+BULK_FRAMES = 1_000_000
+# Differences below this many milliseconds are timer noise, not regressions.
+NOISE_MS = 1.0
+
+
+def cases(topology) -> Dict[str, Callable[[], object]]:
+    calculator = STPCalculator(topology)
+    calculator.update_and_apply()
+    connectivity = topology.get_all_connectivity()
+    manager = BPDUManager()
+    for node in topology.get_all_nodes():
+        manager.add_node(node)
+    root = topology.root_node.bridge_id
+    bpdus = [BPDU(root=root, sender=n.bridge_id, port_id=1, cost=n.root_path_cost) for n in topology.get_all_nodes()]
+    packed = [b.pack() for b in bpdus]
+    dataplane = DataPlane(topology)
+    for node in topology.get_all_nodes():
+        dataplane.attach_host(node.id)
+    src, dst = dataplane.random_traffic(BULK_FRAMES, seed=0)
+
+    def root_failover():
+        root = topology.root_node
+        root.set_failed()
+        topology.elect_root()
+        root.set_active()
+        topology.elect_root()
+
+    return {
+        'stp_update': calculator.update_and_apply,
+        'connectivity': topology.get_all_connectivity,
+        'to_dict': lambda: topology.to_dict(connectivity),
+        'bpdu_tick': manager.tick,
+        'bpdu_pack': lambda: [b.pack() for b in bpdus],
+        'bpdu_unpack': lambda: [BPDU.unpack(data) for data in packed],
+        'dataplane_bulk': lambda: dataplane.send_bulk(src, dst),
+        # Last: failing the root disables its ports for the remaining runs.
+        'root_failover': root_failover
+    }
+
+
+def _best_ms(fn: Callable[[], object], repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return round(best * 1000, 3)
+
+
+def _peak_bytes(fn: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak - before
+
+
+def run(sizes=SIZES, repeat: int = 3, memory: bool = True, on_result: Optional[Callable[[dict], None]] = None) -> dict:
+    results = []
+    for size in sizes:
+        started = time.perf_counter()
+        topology = build_topology(size)
+        build_ms = round((time.perf_counter() - started) * 1000, 3)
+        record = {'nodes': size, 'links': len(topology.links), 'case': 'build', 'ms': build_ms,
+                  'peak_bytes': _peak_bytes(lambda: build_topology(size)) if memory else None}
+        results.append(record)
+        if on_result:
+            on_result(record)
+
+        for name, fn in cases(topology).items():
+            record = {
+                'nodes': size,
+                'links': len(topology.links),
+                'case': name,
+                'ms': _best_ms(fn, repeat),
+                'peak_bytes': _peak_bytes(fn) if memory else None
+            }
+            results.append(record)
+            if on_result:
+                on_result(record)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created_at': time.time(),
+        'repeat': repeat,
+        'results': results
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float = TOLERANCE) -> List[dict]:
+    """Cases that got more than `tolerance` slower than in `baseline`."""
+    previous = {(r['nodes'], r['case']): r for r in baseline.get('results', [])}
+    regressions = []
+    for r in report['results']:
+        old = previous.get((r['nodes'], r['case']))
+        if not old or not old['ms']:
+            continue
+        if r['ms'] > old['ms'] * (1 + tolerance) and r['ms'] - old['ms'] > NOISE_MS:
+            regressions.append({
+                'nodes': r['nodes'],
+                'case': r['case'],
+                'baseline_ms': old['ms'],
+                'ms': r['ms'],
+                'ratio': round(r['ms'] / old['ms'], 2)
+            })
+    return regressions
+
+
+def _print_result(r: dict):
+    peak = f"{r['peak_bytes'] / 1e6:.1f}" if r['peak_bytes'] is not None else '-'
+    print(f"{r['nodes']:>8} {r['links']:>8} {r['case']:<14} {r['ms']:>12.3f} {peak:>12}", flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(str(s) for s in SIZES), help='comma-separated node counts')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='compare against results previously written with --output (default: %(default)s)')
+    parser.add_argument('--no-baseline', action='store_true', help='skip the comparison')
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help='allowed slowdown (0.25 = 25%%)')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+    if args.no_baseline:
+        args.baseline = None
+
+    try:
+        sizes = [int(s) for s in args.sizes.split(',') if s]
+    except ValueError:
+        parser.error('--sizes must be comma-separated integers')
+
+    if not args.json:
+        print(f"{'nodes':>8} {'links':>8} {'case':<14} {'ms':>12} {'peak MB':>12}")
+    report = run(sizes, args.repeat, not args.no_memory, None if args.json else _print_result)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        report['regressions'] = regressions
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    elif args.baseline:
+        for r in regressions:
+            print(f"REGRESSION {r['case']} at {r['nodes']} nodes: {r['baseline_ms']} ms -> {r['ms']} ms ({r['ratio']}x)")
+        print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
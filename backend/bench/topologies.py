@@ -0,0 +1,42 @@
+import random
+from backend.core.topology import Topology
+from backend.core.node import Node
+from backend.core.link import Link
+
+
+def build_topology(node_count: int, degree: int = 4, seed: int = 0) -> Topology:
+    """
+    Ring of `node_count` bridges plus random chords until the average degree
+    reaches `degree`. The ring keeps the fabric connected; the chords give the
+    spanning tree redundant links to block.
+    """
+    rng = random.Random(seed)
+    topology = Topology()
+    nodes = [Node(f"Node{i + 1}") for i in range(node_count)]
+    for node in nodes:
+        topology.add_node(node)
+
+    def connect(n1: Node, n2: Node):
+        p1 = n1.add_port(len(n1.ports) + 1)
+        p2 = n2.add_port(len(n2.ports) + 1)
+        topology.add_link(Link(p1, p2, rng.choice((100.0, 1000.0, 10000.0)), 1.0))
+
+    if node_count < 2:
+        return topology
+
+    for i in range(node_count if node_count > 2 else 1):
+        connect(nodes[i], nodes[(i + 1) % node_count])
+
+    pairs = {(i, (i + 1) % node_count) for i in range(node_count)}
+    chords = max(0, node_count * degree // 2 - node_count)
+    attempts = 0
+    while chords and attempts < chords * 10:
+        attempts += 1
+        a, b = rng.randrange(node_count), rng.randrange(node_count)
+        if a == b or (a, b) in pairs or (b, a) in pairs:
+            continue
+        pairs.add((a, b))
+        connect(nodes[a], nodes[b])
+        chords -= 1
+
+    return topology
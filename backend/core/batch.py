@@ -0,0 +1,125 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from backend.core.bridge import validate_priority
+from backend.core.topology import Topology
+from backend.core.node import Node
+from backend.core.link import Link, LinkState
+
+
+class OperationError(ValueError):
+    def __init__(self, message: str, index: Optional[int] = None):
+        super().__init__(message)
+        self.index = index
+
+
+def _toggle(link: Link):
+    link.set_state(LinkState.DOWN if link.is_up() else LinkState.UP)
+
+
+NODE_OPERATIONS: Dict[str, Callable[[Node], None]] = {
+    'fail_node': Node.set_failed,
+    'recover_node': Node.set_active,
+}
+
+LINK_OPERATIONS: Dict[str, Callable[[Link], None]] = {
+    'link_down': lambda link: link.set_state(LinkState.DOWN),
+    'link_up': lambda link: link.set_state(LinkState.UP),
+    'toggle_link': _toggle,
+}
+
+
+class OperationBatch:
+    """
+    A list of topology mutations that is fully validated before any of them
+    is applied, so a bad entry leaves the topology untouched.
+    """
+
+    def __init__(self, topology: Topology):
+        self.topology = topology
+        self.steps: List[Tuple[dict, Callable[[], None]]] = []
+
+    @classmethod
+    def from_payload(cls, topology: Topology, operations) -> 'OperationBatch':
+        if not isinstance(operations, list) or not operations:
+            raise OperationError('operations must be a non-empty list')
+
+        batch = cls(topology)
+        for index, operation in enumerate(operations):
+            batch.add(operation, index)
+        return batch
+
+    def add(self, operation: dict, index: Optional[int] = None):
+        if not isinstance(operation, dict):
+            raise OperationError('operation must be an object', index)
+
+        op = operation.get('op')
+        if op in NODE_OPERATIONS:
+            node = self.topology.get_node(operation.get('node_id'))
+            if not node:
+                raise OperationError(f"Node not found: {operation.get('node_id')}", index)
+            action = NODE_OPERATIONS[op]
+            self.steps.append((operation, lambda: action(node)))
+        elif op in LINK_OPERATIONS:
+            link = self.topology.get_link(operation.get('link_id'))
+            if not link:
+                raise OperationError(f"Link not found: {operation.get('link_id')}", index)
+            action = LINK_OPERATIONS[op]
+            self.steps.append((operation, lambda: action(link)))
+        elif op == 'set_priority':
+            node = self.topology.get_node(operation.get('node_id'))
+            if not node:
+                raise OperationError(f"Node not found: {operation.get('node_id')}", index)
+            try:
+                priority = validate_priority(operation.get('priority'))
+            except ValueError as e:
+                raise OperationError(str(e), index)
+            self.steps.append((operation, lambda: self.topology.set_bridge_priority(node, priority)))
+        else:
+            raise OperationError(f'Unknown operation: {op}', index)
+
+    def apply(self) -> List[dict]:
+        for _, step in self.steps:
+            step()
+        return [operation for operation, _ in self.steps]
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+
+def capture_tree_state(topology: Topology) -> dict:
+    return {
+        'root_node': topology.root_node.id if topology.root_node else None,
+        'spanning_tree': set(topology.spanning_tree_links),
+        'nodes': {n.id: n.state.value for n in topology.nodes.values()},
+        'links': {l.link_id: l.state.value for l in topology.links.values()},
+        'ports': {
+            (n.id, p.port_id): p.state.value
+            for n in topology.nodes.values()
+            for p in n.ports.values()
+        }
+    }
+
+
+def diff_tree_state(before: dict, after: dict) -> dict:
+    def changed(key):
+        return [
+            {'id': item_id, 'old': before[key].get(item_id), 'new': state}
+            for item_id, state in after[key].items()
+            if before[key].get(item_id) != state
+        ]
+
+    ports = [
+        {'node_id': node_id, 'port_id': port_id, 'old': before['ports'].get((node_id, port_id)), 'new': state}
+        for (node_id, port_id), state in after['ports'].items()
+        if before['ports'].get((node_id, port_id)) != state
+    ]
+
+    return {
+        'root_node': {'old': before['root_node'], 'new': after['root_node']},
+        'spanning_tree': {
+            'added': sorted(after['spanning_tree'] - before['spanning_tree']),
+            'removed': sorted(before['spanning_tree'] - after['spanning_tree'])
+        },
+        'nodes': changed('nodes'),
+        'links': changed('links'),
+        'ports': ports
+    }
@@ -2,16 +2,19 @@ import asyncio
 import time
 import struct
 from typing import Dict, List, Optional, Callable
+from backend.core.bridge import BridgeId
 from backend.core.node import Node, Port, PortState, NodeState
 
 
 class BPDU:
     PROTOCOL_ID = 0xC001
+    # Bridge ids travel as big-endian 64-bit keys, so the raw bytes sort like the ids.
+    FORMAT = struct.Struct('!HQQHIfIIB')
 
     def __init__(
         self,
-        root_id: str,
-        sender_id: str,
+        root: BridgeId,
+        sender: BridgeId,
         port_id: int,
         cost: int,
         age: float = 0.0,
@@ -20,8 +23,8 @@ class BPDU:
         flags: int = 0
     ):
         self.protocol_id = self.PROTOCOL_ID
-        self.root_id = root_id
-        self.sender_id = sender_id
+        self.root = root
+        self.sender = sender
         self.port_id = port_id
         self.cost = cost
         self.age = age
@@ -31,13 +34,10 @@ class BPDU:
         self.timestamp = time.time()
 
     def pack(self) -> bytes:
-        root_bytes = self.root_id.encode('utf-8')[:8].ljust(8, b'\x00')
-        sender_bytes = self.sender_id.encode('utf-8')[:8].ljust(8, b'\x00')
-        return struct.pack(
-            '!H8s8sHIfIIB',
+        return self.FORMAT.pack(
             self.protocol_id,
-            root_bytes,
-            sender_bytes,
+            self.root.key,
+            self.sender.key,
             self.port_id,
             self.cost,
             self.age,
@@ -49,13 +49,13 @@ class BPDU:
     @classmethod
     def unpack(cls, data: bytes) -> Optional['BPDU']:
         try:
-            unpacked = struct.unpack('!H8s8sHIfIIB', data)
+            unpacked = cls.FORMAT.unpack(data)
             proto_id = unpacked[0]
             if proto_id != cls.PROTOCOL_ID:
                 return None
             return cls(
-                root_id=unpacked[1].rstrip(b'\x00').decode('utf-8'),
-                sender_id=unpacked[2].rstrip(b'\x00').decode('utf-8'),
+                root=BridgeId.from_key(unpacked[1]),
+                sender=BridgeId.from_key(unpacked[2]),
                 port_id=unpacked[3],
                 cost=unpacked[4],
                 age=unpacked[5],
@@ -75,14 +75,18 @@ class BPDUManager:
         self.hello_interval = hello_interval
         self.max_age = max_age
         self.nodes: Dict[str, Node] = {}
+        self._by_key: Dict[int, Node] = {}
         self.running = False
         self.on_topology_change: List[Callable[[], None]] = []
         self.on_node_failure: List[Callable[[Node], None]] = []
         self.task: Optional[asyncio.Task] = None
         self.last_bpdu_received: Dict[str, float] = {}
+        self.bpdus_sent = 0
+        self.bpdus_received = 0
 
     def add_node(self, node: Node):
         self.nodes[node.id] = node
+        self._by_key[node.bridge_id.key] = node
         self.last_bpdu_received[node.id] = time.time()
 
     def register_topology_change_callback(self, callback: Callable[[], None]):
@@ -97,22 +101,27 @@ class BPDUManager:
         if not port.link or not port.link.is_up():
             return
 
+        root = self.nodes.get(node.root_id) if node.root_id else None
         bpdu = BPDU(
-            root_id=node.root_id or node.id,
-            sender_id=node.id,
+            root=root.bridge_id if root else node.bridge_id,
+            sender=node.bridge_id,
             port_id=port.port_id,
             cost=node.root_path_cost,
             max_age=self.max_age,
             hello_time=self.hello_interval
         )
 
+        self.bpdus_sent += 1
         other_port = port.link.get_other_port(port)
         if other_port:
             self.receive_bpdu(other_port, bpdu)
 
     def receive_bpdu(self, port: Port, bpdu: BPDU):
+        self.bpdus_received += 1
         port.record_bpdu()
-        self.last_bpdu_received[bpdu.sender_id] = time.time()
+        sender = self._node_for(bpdu.sender)
+        if sender:
+            self.last_bpdu_received[sender.id] = time.time()
 
         node = self._find_node_by_port(port)
         if not node:
@@ -121,42 +130,46 @@ class BPDUManager:
         self._process_bpdu(node, port, bpdu)
 
     def _find_node_by_port(self, port: Port) -> Optional[Node]:
-        for node in self.nodes.values():
-            if port in node.ports.values():
-                return node
-        return None
+        node = self.nodes.get(port.node_id)
+        return node if node and node.ports.get(port.port_id) is port else None
+
+    def _node_for(self, bridge_id: BridgeId) -> Optional[Node]:
+        node = self._by_key.get(bridge_id.key)
+        if node is None or node.bridge_id.key != bridge_id.key:
+            # Priorities changed since the map was built.
+            self._by_key = {n.bridge_id.key: n for n in self.nodes.values()}
+            node = self._by_key.get(bridge_id.key)
+        return node
 
     def _process_bpdu(self, node: Node, port: Port, bpdu: BPDU):
+        root = self._node_for(bpdu.root)
+        if root is None:
+            return
         if node.root_id is None:
-            node.root_id = bpdu.root_id
+            node.root_id = root.id
             self._trigger_topology_change()
             return
 
-        current_root_priority = self._get_node_priority(node.root_id)
-        new_root_priority = self._get_node_priority(bpdu.root_id)
+        current_root = self.nodes.get(node.root_id)
+        current_key = current_root.bridge_id.key if current_root else node.bridge_id.key
+        new_key = bpdu.root.key
 
-        if new_root_priority < current_root_priority:
-            node.root_id = bpdu.root_id
+        if new_key < current_key:
+            node.root_id = root.id
             node.root_path_cost = bpdu.cost + 1
             node.parent_port = port
             self._trigger_topology_change()
-        elif bpdu.root_id == node.root_id:
+        elif new_key == current_key:
             new_cost = bpdu.cost + 1
             if new_cost < node.root_path_cost:
                 node.root_path_cost = new_cost
                 node.parent_port = port
                 self._trigger_topology_change()
             elif new_cost == node.root_path_cost:
-                if bpdu.sender_id < node.id:
+                if bpdu.sender.key < node.bridge_id.key:
                     node.parent_port = port
                     self._trigger_topology_change()
 
-    def _get_node_priority(self, node_id: str) -> int:
-        try:
-            return int(node_id.split('_')[1])
-        except (IndexError, ValueError):
-            return 0
-
     def _trigger_topology_change(self):
         for callback in self.on_topology_change:
             try:
@@ -177,16 +190,19 @@ class BPDUManager:
                     print(f"Node failure callback error: {e}")
             self._trigger_topology_change()
 
+    def tick(self):
+        """One hello round: every active node sends on its UP ports, then liveness is checked."""
+        for node in self.nodes.values():
+            if node.state == NodeState.ACTIVE:
+                for port in node.ports.values():
+                    if port.link and port.link.is_up():
+                        self.send_bpdu(node, port)
+            self._check_node_alive(node)
+
     async def run(self):
         self.running = True
         while self.running:
-            for node in self.nodes.values():
-                if node.state == NodeState.ACTIVE:
-                    for port in node.ports.values():
-                        if port.link and port.link.is_up():
-                            self.send_bpdu(node, port)
-                self._check_node_alive(node)
-
+            self.tick()
             await asyncio.sleep(self.hello_interval)
 
     def start(self):
@@ -203,6 +219,8 @@ class BPDUManager:
             'running': self.running,
             'node_count': len(self.nodes),
             'active_nodes': sum(1 for n in self.nodes.values() if n.state == NodeState.ACTIVE),
-            'failed_nodes': sum(1 for n in self.nodes.values() if n.state == NodeState.FAILED)
+            'failed_nodes': sum(1 for n in self.nodes.values() if n.state == NodeState.FAILED),
+            'bpdus_sent': self.bpdus_sent,
+            'bpdus_received': self.bpdus_received
         }
         return status
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+802.1D-style bridge identifiers: a 16-bit priority followed by a 48-bit MAC
+address. The pair is kept as one precomputed 64-bit integer key, so elections
+and BPDU comparisons are single integer compares, and its big-endian 8-byte
+encoding sorts the same way as the key.
+"""
+import heapq
+import struct
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+DEFAULT_PRIORITY = 32768
+PRIORITY_STEP = 4096
+MAX_PRIORITY = 61440
+# Locally administered, unicast: 02:00:00:xx:xx:xx.
+LOCAL_MAC_BASE = 0x02 << 40
+MAC_MASK = (1 << 48) - 1
+
+_ENCODING = struct.Struct('!Q')
+
+
+class BridgeId:
+    __slots__ = ('priority', 'mac', 'key')
+
+    def __init__(self, priority: int, mac: int):
+        if not 0 <= priority <= 0xFFFF:
+            raise ValueError('bridge priority must be between 0 and 65535')
+        if not 0 <= mac <= MAC_MASK:
+            raise ValueError('MAC address must fit in 48 bits')
+        self.priority = priority
+        self.mac = mac
+        self.key = (priority << 48) | mac
+
+    @classmethod
+    def for_node(cls, node_id: str, priority: int = DEFAULT_PRIORITY) -> 'BridgeId':
+        """
+        Default identifier for a node: a locally administered MAC that encodes
+        the node number of ids like `node_7`, so equal priorities fall back to
+        the lowest node number as before.
+        """
+        prefix, _, number = node_id.rpartition('_')
+        if prefix == 'node' and number.isdigit():
+            suffix = int(number) & 0xFFFFFF
+        else:
+            suffix = zlib.crc32(node_id.encode('utf-8')) & 0xFFFFFF
+        return cls(priority, LOCAL_MAC_BASE | suffix)
+
+    @classmethod
+    def from_key(cls, key: int) -> 'BridgeId':
+        return cls(key >> 48, key & MAC_MASK)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'BridgeId':
+        return cls.from_key(_ENCODING.unpack(data)[0])
+
+    @classmethod
+    def parse(cls, text: str) -> Optional['BridgeId']:
+        """Parse the `priority.aa:bb:cc:dd:ee:ff` form produced by str()."""
+        priority, _, mac = text.partition('.')
+        try:
+            return cls(int(priority), int(mac.replace(':', ''), 16))
+        except ValueError:
+            return None
+
+    def with_priority(self, priority: int) -> 'BridgeId':
+        return BridgeId(priority, self.mac)
+
+    def to_bytes(self) -> bytes:
+        return _ENCODING.pack(self.key)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, BridgeId) and self.key == other.key
+
+    def __lt__(self, other: 'BridgeId') -> bool:
+        return self.key < other.key
+
+    def __hash__(self) -> int:
+        return hash(self.key)
+
+    def __str__(self) -> str:
+        mac = self.mac.to_bytes(6, 'big')
+        return f"{self.priority}.{':'.join(f'{b:02x}' for b in mac)}"
+
+    def __repr__(self) -> str:
+        return f'BridgeId({self})'
+
+
+def validate_priority(priority) -> int:
+    """Priorities are configured in steps of 4096 like 802.1D-2004 bridges."""
+    if isinstance(priority, bool) or not isinstance(priority, int):
+        raise ValueError('priority must be an integer')
+    if not 0 <= priority <= MAX_PRIORITY or priority % PRIORITY_STEP:
+        raise ValueError(f'priority must be a multiple of {PRIORITY_STEP} between 0 and {MAX_PRIORITY}')
+    return priority
+
+
+class BridgeQueue:
+    """
+    Indexed binary min-heap of (bridge key, node id). The position of every
+    entry is tracked, so the lowest bridge is read in O(1) and a single bridge
+    is added, removed or re-keyed in O(log n).
+    """
+
+    def __init__(self, entries: Iterable[Tuple[int, str]] = ()):
+        self._heap: List[Tuple[int, str]] = list(entries)
+        heapq.heapify(self._heap)
+        self._pos: Dict[str, int] = {node_id: i for i, (_, node_id) in enumerate(self._heap)}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._pos
+
+    def peek(self) -> Optional[str]:
+        return self._heap[0][1] if self._heap else None
+
+    def smallest(self, exclude: Set[str] = frozenset()) -> Optional[str]:
+        """Lowest node id not in `exclude`, visiting O(len(exclude)) heap entries."""
+        heap = self._heap
+        if not exclude:
+            return heap[0][1] if heap else None
+        frontier = [(heap[0], 0)] if heap else []
+        while frontier:
+            (_, node_id), i = heapq.heappop(frontier)
+            if node_id not in exclude:
+                return node_id
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+        return None
+
+    def set(self, node_id: str, key: int):
+        """Insert `node_id`, or move it to `key` if it is already queued."""
+        i = self._pos.get(node_id)
+        if i is None:
+            self._heap.append((key, node_id))
+            self._pos[node_id] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+            return
+        old_key = self._heap[i][0]
+        self._heap[i] = (key, node_id)
+        if key < old_key:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def discard(self, node_id: str):
+        i = self._pos.pop(node_id, None)
+        if i is None:
+            return
+        last = self._heap.pop()
+        if i == len(self._heap):
+            return
+        self._heap[i] = last
+        self._pos[last[1]] = i
+        self._sift_up(i)
+        self._sift_down(self._pos[last[1]])
+
+    def _swap(self, i: int, j: int):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._pos[heap[i][1]] = i
+        self._pos[heap[j][1]] = j
+
+    def _sift_up(self, i: int):
+        heap = self._heap
+        while i:
+            parent = (i - 1) >> 1
+            if heap[i] >= heap[parent]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i: int):
+        heap = self._heap
+        size = len(heap)
+        while True:
+            smallest = i
+            for child in (2 * i + 1, 2 * i + 2):
+                if child < size and heap[child] < heap[smallest]:
+                    smallest = child
+            if smallest == i:
+                return
+            self._swap(i, smallest)
+            i = smallest
@@ -0,0 +1,166 @@
+"""
+Monte Carlo chaos campaigns: many random k-link / k-node failure trials
+against one topology snapshot, fanned out over a process pool.
+
+Every trial draws its failures from `random.Random(f"{seed}:{trial}")`, so a
+campaign's results do not depend on the worker count or chunking.
+"""
+import heapq
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional
+from backend.core import persistence
+from backend.core.link import LinkState
+from backend.core.node import NodeState
+from backend.core.scenario import reachable_nodes
+from backend.core.stp import STPCalculator
+from backend.utils.stats import percentiles
+
+
+_worker_topology = None
+
+
+def _init_worker(snapshot: bytes):
+    global _worker_topology
+    _worker_topology = persistence.loads(snapshot)
+
+
+def _run_chunk(seed: int, first: int, count: int, k_links: int, k_nodes: int) -> List[dict]:
+    return run_trials(_worker_topology, seed, range(first, first + count), k_links, k_nodes)
+
+
+def run_trials(topology, seed: int, trials, k_links: int, k_nodes: int) -> List[dict]:
+    """Run `trials` against `topology`, restoring every failed object afterwards."""
+    calculator = STPCalculator(topology)
+    link_ids = sorted(l.link_id for l in topology.links.values() if l.state == LinkState.UP)
+    node_ids = sorted(n.id for n in topology.nodes.values() if n.state == NodeState.ACTIVE)
+    results = []
+    for trial in trials:
+        rng = random.Random(f'{seed}:{trial}')
+        failed_links = rng.sample(link_ids, min(k_links, len(link_ids)))
+        failed_nodes = rng.sample(node_ids, min(k_nodes, len(node_ids)))
+        for link_id in failed_links:
+            topology.links[link_id].set_state(LinkState.DOWN)
+        for node_id in failed_nodes:
+            topology.nodes[node_id].set_failed()
+
+        started = time.perf_counter()
+        calculator.update_and_apply()
+        recompute_ms = (time.perf_counter() - started) * 1000
+        active = len(node_ids) - len(failed_nodes)
+        unreachable = active - len(reachable_nodes(topology))
+
+        results.append({
+            'trial': trial,
+            'failed_links': failed_links,
+            'failed_nodes': failed_nodes,
+            'unreachable': unreachable,
+            'recompute_ms': round(recompute_ms, 3)
+        })
+        for node_id in failed_nodes:
+            topology.nodes[node_id].set_active()
+        for link_id in failed_links:
+            topology.links[link_id].set_state(LinkState.UP)
+    return results
+
+
+class ChaosCampaign:
+    """
+    Runs `trials` random failure trials on a process pool and aggregates them
+    as chunks complete; summary() may be called from another thread at any
+    time to stream partial results.
+    """
+
+    def __init__(self, snapshot: bytes, trials: int, k_links: int = 1, k_nodes: int = 0, seed: int = 0,
+                 workers: Optional[int] = None, chunk_size: Optional[int] = None, worst: int = 10):
+        if trials <= 0:
+            raise ValueError('trials must be positive')
+        if k_links < 0 or k_nodes < 0 or k_links + k_nodes == 0:
+            raise ValueError('k_links and k_nodes must be non-negative and not both zero')
+        self.snapshot = snapshot
+        self.trials = trials
+        self.k_links = k_links
+        self.k_nodes = k_nodes
+        self.seed = seed
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size or max(1, min(500, trials // (self.workers * 4)))
+        self.worst = worst
+        self.status = 'pending'
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._unreachable: List[int] = []
+        self._recompute_ms: List[float] = []
+        self._worst: List[tuple] = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+
+    def run(self, on_progress: Optional[Callable[[dict], None]] = None) -> dict:
+        self.status = 'running'
+        self.started_at = time.time()
+        chunks = [(start, min(self.chunk_size, self.trials - start)) for start in range(0, self.trials, self.chunk_size)]
+        # spawn: forking a process that already runs server and logger threads can deadlock.
+        context = multiprocessing.get_context('spawn')
+        try:
+            with ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                     initargs=(self.snapshot,)) as pool:
+                futures = [pool.submit(_run_chunk, self.seed, start, count, self.k_links, self.k_nodes)
+                           for start, count in chunks]
+                for future in as_completed(futures):
+                    if self._cancelled.is_set():
+                        for pending in futures:
+                            pending.cancel()
+                        self.status = 'cancelled'
+                        break
+                    self._add(future.result())
+                    if on_progress:
+                        on_progress(self.summary())
+                else:
+                    self.status = 'completed'
+        except Exception as e:
+            self.status = 'failed'
+            self.error = str(e)
+        self.finished_at = time.time()
+        return self.summary()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def _add(self, results: List[dict]):
+        with self._lock:
+            for r in results:
+                self._unreachable.append(r['unreachable'])
+                self._recompute_ms.append(r['recompute_ms'])
+                key = (r['unreachable'], r['recompute_ms'], -r['trial'])
+                if len(self._worst) < self.worst:
+                    heapq.heappush(self._worst, (key, r))
+                elif key > self._worst[0][0]:
+                    heapq.heapreplace(self._worst, (key, r))
+
+    def summary(self) -> dict:
+        with self._lock:
+            unreachable = list(self._unreachable)
+            recompute_ms = list(self._recompute_ms)
+            worst = [r for _, r in sorted(self._worst, key=lambda item: item[0], reverse=True)]
+        completed = len(unreachable)
+        elapsed = (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+        return {
+            'status': self.status,
+            'error': self.error,
+            'trials': self.trials,
+            'completed': completed,
+            'k_links': self.k_links,
+            'k_nodes': self.k_nodes,
+            'seed': self.seed,
+            'workers': self.workers,
+            'elapsed_seconds': round(elapsed, 3),
+            'trials_per_second': round(completed / elapsed, 1) if elapsed else 0.0,
+            'partitioned_fraction': round(sum(1 for u in unreachable if u) / completed, 6) if completed else 0.0,
+            'unreachable': percentiles(unreachable),
+            'recompute_ms': percentiles(recompute_ms),
+            'worst': worst
+        }
@@ -0,0 +1,404 @@
+"""
+N-1 / N-2 contingency analysis: what every single link or node failure (and
+optionally every pair of link failures) would do to the spanning tree, worked
+out from one converged baseline of a published snapshot, so it needs no
+lock on the live topology.
+
+The baseline is the tree STP converges to for the current state: the unique
+minimum spanning tree under (cost, link id) of the component that holds the
+elected root. Impacts are counted within that component.
+
+- Bridges and articulation points come from one iterative Tarjan DFS.
+- Every non-tree link is walked once along its tree cycle, in cost order.
+  The first link to cover a tree link is that link's replacement, and the
+  links passing through a node are the only ones that can re-join the
+  pieces left by that node's failure, so each node failure is settled with a
+  Kruskal over just those candidates.
+- Two-link cuts use XOR labelling: every non-tree link gets a random 64-bit
+  label and every tree link the XOR of the labels crossing its subtree; two
+  links with the same non-zero label disconnect the network together.
+"""
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List
+from backend.core.bridge import BridgeId
+from backend.core.link import LinkState, link_cost
+from backend.core.node import NodeState
+from backend.core.snapshot import TopologySnapshot
+
+
+PARENT_SIDE = -1
+# Two-link cuts listed per run; all of them are counted.
+MAX_CUTS = 1000
+
+
+class ContingencyAnalysis:
+    """
+    Single-failure impact of every node and link in `snapshot`; with
+    `double`, also the pairs of links whose joint failure partitions the
+    network (at most `limit` of them are listed, all are counted).
+    """
+
+    def __init__(self, snapshot: TopologySnapshot, double: bool = False, limit: int = MAX_CUTS, seed: int = 0):
+        self.snapshot = snapshot
+        self.nodes = snapshot.topology['nodes']
+        self.double = double
+        self.limit = limit
+        self.seed = seed
+
+    def run(self) -> dict:
+        started = time.perf_counter()
+        active = self.snapshot.node_collection.indexes['state'].get(NodeState.ACTIVE.value, frozenset())
+        self.bridge_keys = {node_id: BridgeId.parse(self.nodes[node_id]['bridge_id']).key for node_id in active}
+        root = self._root_candidate()
+        result = {
+            'generation': self.snapshot.generation,
+            'root': root,
+            'summary': {'nodes': 0, 'links': 0, 'tree_links': 0, 'bridges': 0, 'articulation_points': 0},
+            'bridges': [],
+            'articulation_points': [],
+            'links': [],
+            'nodes': []
+        }
+        if root is None:
+            result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+            return result
+
+        self._load(root)
+        self._build_tree()
+        self._tarjan()
+        self._walk_cycles()
+
+        ids, links = self.ids, self.link_ids
+        bridges = sorted(
+            ({'link_id': links[e], 'unreachable': self.size[c]} for e, c in self.bridges),
+            key=lambda b: (-b['unreachable'], b['link_id'])
+        )
+        result['bridges'] = bridges
+        result['links'] = self._link_impacts()
+        result['nodes'] = self._node_impacts()
+        result['articulation_points'] = [
+            {'node_id': n['node_id'], 'node_name': n['node_name'], 'unreachable': n['unreachable']}
+            for n in result['nodes'] if n['articulation_point']
+        ]
+        result['summary'] = {
+            'nodes': len(ids),
+            'links': len(links),
+            'tree_links': len(ids) - 1,
+            'bridges': len(bridges),
+            'articulation_points': len(result['articulation_points']),
+            'worst_link': result['links'][0] if result['links'] and result['links'][0]['unreachable'] else None,
+            'worst_node': result['nodes'][0] if result['nodes'] else None
+        }
+        if self.double:
+            result['double'] = self._link_pairs()
+        result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return result
+
+    def _root_candidate(self, exclude=frozenset()):
+        """The active node with the lowest bridge id, ignoring the ids in `exclude`."""
+        keys = self.bridge_keys
+        return min((node_id for node_id in keys if node_id not in exclude), key=keys.__getitem__, default=None)
+
+    def _load(self, root: str):
+        """Index the root's component: UP links between distinct ACTIVE nodes."""
+        links = self.snapshot.topology['links']
+        node_links = self.snapshot.link_collection.indexes['node']
+        up = self.snapshot.link_collection.indexes['state'].get(LinkState.UP.value, frozenset())
+        active = self.bridge_keys
+        adjacent = {}
+        index = {root: 0}
+        ids = [root]
+        for node_id in ids:
+            adjacent[node_id] = incident = sorted(up.intersection(node_links.get(node_id, ())))
+            for link_id in incident:
+                a, b = links[link_id]['nodes']
+                other = b if a == node_id else a
+                if other not in index and other in active:
+                    index[other] = len(ids)
+                    ids.append(other)
+
+        ends_u, ends_v, link_ids, keys = [], [], [], []
+        for i, node_id in enumerate(ids):
+            for link_id in adjacent[node_id]:
+                link = links[link_id]
+                a, b = link['nodes']
+                j = index.get(b if a == node_id else a)
+                # Each link once, from its lower-indexed end; self-loops never join anything.
+                if j is not None and j > i:
+                    ends_u.append(i)
+                    ends_v.append(j)
+                    link_ids.append(link_id)
+                    keys.append((link_cost(link['bandwidth'], link['latency']), link_id))
+
+        self.ids = ids
+        self.ends_u, self.ends_v, self.link_ids = ends_u, ends_v, link_ids
+        self.order = sorted(range(len(link_ids)), key=keys.__getitem__)
+        adjacency = [[] for _ in ids]
+        for e in range(len(link_ids)):
+            adjacency[ends_u[e]].append((ends_v[e], e))
+            adjacency[ends_v[e]].append((ends_u[e], e))
+        self.adjacency = adjacency
+
+    def _build_tree(self):
+        n = len(self.ids)
+        ends_u, ends_v = self.ends_u, self.ends_v
+        leader = list(range(n))
+
+        def find(x):
+            while leader[x] != x:
+                leader[x] = leader[leader[x]]
+                x = leader[x]
+            return x
+
+        in_tree = [False] * len(self.link_ids)
+        tree_adjacency = [[] for _ in range(n)]
+        joined = 0
+        for e in self.order:
+            a, b = find(ends_u[e]), find(ends_v[e])
+            if a != b:
+                leader[a] = b
+                in_tree[e] = True
+                tree_adjacency[ends_u[e]].append((ends_v[e], e))
+                tree_adjacency[ends_v[e]].append((ends_u[e], e))
+                joined += 1
+                if joined == n - 1:
+                    break
+
+        parent = [PARENT_SIDE] * n
+        parent_link = [-1] * n
+        depth = [0] * n
+        children = [[] for _ in range(n)]
+        bfs = [0]
+        for v in bfs:
+            for w, e in tree_adjacency[v]:
+                if e != parent_link[v]:
+                    parent[w] = v
+                    parent_link[w] = e
+                    depth[w] = depth[v] + 1
+                    children[v].append(w)
+                    bfs.append(w)
+        size = [1] * n
+        for v in reversed(bfs[1:]):
+            size[parent[v]] += size[v]
+        # Preorder numbers: v's subtree is [preorder[v], preorder[v] + size[v]).
+        preorder = [0] * n
+        stack = [0]
+        clock = 0
+        while stack:
+            v = stack.pop()
+            preorder[v] = clock
+            clock += 1
+            stack.extend(children[v])
+
+        self.in_tree = in_tree
+        self.parent, self.parent_link, self.depth = parent, parent_link, depth
+        self.children, self.size, self.bfs, self.preorder = children, size, bfs, preorder
+
+    def _tarjan(self):
+        """Bridges and articulation points of the component in one iterative DFS."""
+        adjacency = self.adjacency
+        n = len(self.ids)
+        disc = [-1] * n
+        low = [0] * n
+        cut = [False] * n
+        bridges = []
+        root_children = 0
+        disc[0] = 0
+        clock = 1
+        stack = [(0, -1, iter(adjacency[0]))]
+        while stack:
+            v, via, neighbours = stack[-1]
+            for w, e in neighbours:
+                if e == via:
+                    continue
+                if disc[w] < 0:
+                    disc[w] = low[w] = clock
+                    clock += 1
+                    stack.append((w, e, iter(adjacency[w])))
+                    break
+                if disc[w] < low[v]:
+                    low[v] = disc[w]
+            else:
+                stack.pop()
+                if not stack:
+                    continue
+                p = stack[-1][0]
+                if low[v] < low[p]:
+                    low[p] = low[v]
+                if low[v] > disc[p]:
+                    # A bridge is always a tree link; the side away from the root is cut off.
+                    child = v if self.parent_link[v] == via else p
+                    bridges.append((via, child))
+                if p == 0:
+                    root_children += 1
+                elif low[v] >= disc[p]:
+                    cut[p] = True
+        cut[0] = root_children > 1
+        self.bridges = bridges
+        self.cut = cut
+
+    def _walk_cycles(self):
+        """
+        Walk every non-tree link's tree cycle in cost order, recording the
+        first one to cover each tree link (its replacement) and, for every
+        node the cycle passes through, which two pieces the link would
+        re-join if that node failed.
+        """
+        n = len(self.ids)
+        parent, depth = self.parent, self.depth
+        replacement = [-1] * n
+        candidates = [[] for _ in range(n)]
+        for e in self.order:
+            if self.in_tree[e]:
+                continue
+            x, y = self.ends_u[e], self.ends_v[e]
+            from_x = from_y = PARENT_SIDE
+            while x != y:
+                if depth[x] >= depth[y]:
+                    if replacement[x] < 0:
+                        replacement[x] = e
+                    if from_x != PARENT_SIDE:
+                        candidates[x].append((e, from_x, PARENT_SIDE))
+                    from_x, x = x, parent[x]
+                else:
+                    if replacement[y] < 0:
+                        replacement[y] = e
+                    if from_y != PARENT_SIDE:
+                        candidates[y].append((e, from_y, PARENT_SIDE))
+                    from_y, y = y, parent[y]
+            if from_x != PARENT_SIDE and from_y != PARENT_SIDE:
+                candidates[x].append((e, from_x, from_y))
+        self.replacement = replacement
+        self.candidates = candidates
+
+    def _link_impacts(self) -> List[dict]:
+        links = self.link_ids
+        impacts = []
+        for c in self.bfs[1:]:
+            e, r = self.parent_link[c], self.replacement[c]
+            impacts.append({
+                'link_id': links[e],
+                'replacement': links[r] if r >= 0 else None,
+                'unreachable': 0 if r >= 0 else self.size[c]
+            })
+        impacts.sort(key=lambda i: (-i['unreachable'], i['link_id']))
+        return impacts
+
+    def _node_impacts(self) -> List[dict]:
+        nodes = self.nodes
+        ids, links = self.ids, self.link_ids
+        impacts = []
+        for v in range(len(ids)):
+            added, unreachable, new_root = self._node_failure(v)
+            removed = [links[self.parent_link[c]] for c in self.children[v]]
+            if v:
+                removed.append(links[self.parent_link[v]])
+            impacts.append({
+                'node_id': ids[v],
+                'node_name': nodes[ids[v]]['node_name'],
+                'articulation_point': self.cut[v],
+                'new_root': new_root,
+                'removed': removed,
+                'added': added,
+                'unreachable': unreachable
+            })
+        impacts.sort(key=lambda i: -i['unreachable'])
+        return impacts
+
+    def _node_failure(self, v: int):
+        """(added tree links, unreachable node count, new root id) if node `v` fails."""
+        children, size, parent = self.children[v], self.size, self.parent
+        new_root = self.ids[0]
+        if v == 0:
+            new_root = self._root_candidate(exclude={self.ids[0]})
+            if not children:
+                return [], 0, new_root
+            j = self._index().get(new_root)
+            if j is None:
+                return [], len(self.ids) - 1, new_root
+            while parent[j] != 0:
+                j = parent[j]
+            root_piece = j
+        else:
+            if not children:
+                return [], 0, new_root
+            root_piece = PARENT_SIDE
+
+        leader = {c: c for c in children}
+        leader[PARENT_SIDE] = PARENT_SIDE
+
+        def find(x):
+            while leader[x] != x:
+                leader[x] = leader[leader[x]]
+                x = leader[x]
+            return x
+
+        chosen = []
+        joins = len(leader) - 1
+        for e, a, b in self.candidates[v]:
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                leader[ra] = rb
+                chosen.append((e, a))
+                joins -= 1
+                if not joins:
+                    break
+
+        home = find(root_piece)
+        unreachable = sum(size[c] for c in children if find(c) != home)
+        added = [self.link_ids[e] for e, a in chosen if find(a) == home]
+        return added, unreachable, new_root
+
+    def _index(self) -> Dict[str, int]:
+        return {node_id: i for i, node_id in enumerate(self.ids)}
+
+    def _link_pairs(self) -> dict:
+        """Pairs of non-bridge links that disconnect the network together."""
+        rng = random.Random(self.seed)
+        n = len(self.ids)
+        crossing = [0] * n
+        labels = {}
+        for e in self.order:
+            if not self.in_tree[e]:
+                label = rng.getrandbits(64)
+                labels[e] = label
+                crossing[self.ends_u[e]] ^= label
+                crossing[self.ends_v[e]] ^= label
+        for v in reversed(self.bfs[1:]):
+            crossing[self.parent[v]] ^= crossing[v]
+
+        groups = defaultdict(lambda: ([], []))
+        for c in self.bfs[1:]:
+            if crossing[c]:
+                groups[crossing[c]][0].append(c)
+        for e, label in labels.items():
+            if label in groups:
+                groups[label][1].append(e)
+
+        links, size, preorder = self.link_ids, self.size, self.preorder
+        count = 0
+        pairs = []
+        for tree_children, others in groups.values():
+            k = len(tree_children) + len(others)
+            count += k * (k - 1) // 2
+            for i, c in enumerate(tree_children):
+                for d in tree_children[i + 1:]:
+                    if len(pairs) >= self.limit:
+                        break
+                    # Nested subtrees lose the nodes between the two links,
+                    # disjoint ones lose both subtrees.
+                    if preorder[c] <= preorder[d] < preorder[c] + size[c]:
+                        unreachable = size[c] - size[d]
+                    elif preorder[d] <= preorder[c] < preorder[d] + size[d]:
+                        unreachable = size[d] - size[c]
+                    else:
+                        unreachable = size[c] + size[d]
+                    pairs.append({'links': [links[self.parent_link[c]], links[self.parent_link[d]]],
+                                  'unreachable': unreachable})
+                for e in others:
+                    if len(pairs) < self.limit:
+                        pairs.append({'links': [links[self.parent_link[c]], links[e]], 'unreachable': size[c]})
+        pairs.sort(key=lambda p: -p['unreachable'])
+        return {'pairs': count, 'listed': len(pairs), 'cuts': pairs}
@@ -0,0 +1,121 @@
+"""
+Convergence time: how long after each injected fault the spanning tree is
+stable again.
+
+A fault is stable once a recompute has run after it and no port has changed
+state for `settle` seconds with no recompute pending. Its convergence time
+runs from the fault to the last port change or recompute before that quiet
+window. Faults that overlap converge together at the same moment.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from backend.utils.stats import percentiles
+
+
+class ConvergenceTracker:
+    def __init__(
+        self,
+        last_change: Callable[[], float],
+        busy: Callable[[], bool],
+        reachable: Optional[Callable[[], int]] = None,
+        settle: float = 1.0,
+        capacity: int = 1000,
+        on_converged: Optional[Callable[[dict], None]] = None
+    ):
+        self._last_change = last_change
+        self._busy = busy
+        self._reachable = reachable
+        self.settle = settle
+        self.on_converged = on_converged
+        self.faults_recorded = 0
+        self._pending: List[dict] = []
+        self._completed = deque(maxlen=capacity)
+        self._durations: Dict[str, deque] = {}
+        self._capacity = capacity
+        self._last_recompute = 0.0
+        self._reachable_after = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def record_fault(self, event_type: str, ids: dict, at: Optional[float] = None):
+        with self._lock:
+            self.faults_recorded += 1
+            self._pending.append({
+                'type': event_type,
+                'ids': ids,
+                'at': time.monotonic() if at is None else at,
+                'timestamp': time.time()
+            })
+
+    def note_recompute(self, at: Optional[float] = None):
+        """Call after every recompute; stability is checked once the settle window has passed."""
+        with self._lock:
+            self._last_recompute = time.monotonic() if at is None else at
+            if self._reachable is not None:
+                self._reachable_after = self._reachable()
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.settle, self.check)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def check(self, now: Optional[float] = None) -> List[dict]:
+        """Settle every pending fault the tree has been stable since; returns them."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self._pending or self._busy():
+                return []
+            stable_since = max(self._last_change(), self._last_recompute)
+            if now - stable_since < self.settle:
+                return []
+            settled, waiting = [], []
+            for fault in self._pending:
+                (settled if fault['at'] <= self._last_recompute else waiting).append(fault)
+            if not settled:
+                return []
+            self._pending = waiting
+            results = []
+            for fault in settled:
+                seconds = stable_since - fault['at']
+                result = {
+                    'type': fault['type'],
+                    'ids': fault['ids'],
+                    'timestamp': fault['timestamp'],
+                    'convergence_seconds': round(seconds, 6),
+                    'reachable_after': self._reachable_after
+                }
+                self._completed.append(result)
+                durations = self._durations.get(fault['type'])
+                if durations is None:
+                    durations = self._durations[fault['type']] = deque(maxlen=self._capacity)
+                durations.append(seconds)
+                results.append(result)
+        if self.on_converged:
+            for result in results:
+                self.on_converged(result)
+        return results
+
+    def stop(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+
+    def get_status(self, limit: int = 20) -> dict:
+        self.check()
+        now = time.monotonic()
+        with self._lock:
+            pending = [
+                {'type': f['type'], 'ids': f['ids'], 'timestamp': f['timestamp'], 'elapsed_seconds': round(now - f['at'], 6)}
+                for f in self._pending
+            ]
+            recent = list(self._completed)[-limit:] if limit else []
+            durations = {t: list(d) for t, d in self._durations.items()}
+        return {
+            'settle_seconds': self.settle,
+            'faults_recorded': self.faults_recorded,
+            'pending': pending,
+            'by_type': {t: percentiles(values, digits=6) for t, values in durations.items()},
+            'recent': recent
+        }
@@ -0,0 +1,323 @@
+"""
+Data-plane simulation over the forwarding topology.
+
+Hosts attach to bridges and send frames. A bridge learns the source MAC on the
+ingress port, forwards to the learned port when it has a fresh entry and floods
+otherwise, always only through FORWARDING ports. Entries age out after
+`aging_time`; when the spanning tree changes, entries learned before the change
+age out `forward_delay` seconds later, as after an 802.1D topology change
+notification. Until then a stale entry that points at a port which is no longer
+forwarding drops the frame.
+
+send() walks a single frame hop by hop through the per-bridge tables, which
+are mirrored into Port.mac_table. send_bulk() pushes arrays of frames through
+the TreeIndex of the current forwarding forest in a handful of NumPy
+operations. It tracks learning per host rather than per bridge: a destination
+is known once it has sent since the last tree change and within the aging time,
+and frames to unknown destinations are flooded.
+"""
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+import numpy as np
+from backend.core.node import NodeState, PortState
+from backend.core.topology import Topology
+from backend.core.treeindex import TreeIndex
+
+
+DEFAULT_AGING = 300.0
+DEFAULT_FORWARD_DELAY = 15.0
+# Locally administered, unicast: 0a:xx:xx:xx:xx:xx.
+HOST_MAC_BASE = 0x0a << 40
+
+
+class Host:
+    __slots__ = ('mac', 'node_id', 'index')
+
+    def __init__(self, mac: str, node_id: str, index: int):
+        self.mac = mac
+        self.node_id = node_id
+        self.index = index
+
+    def to_dict(self) -> dict:
+        return {'mac': self.mac, 'node_id': self.node_id}
+
+
+def _format_mac(value: int) -> str:
+    return ':'.join(f'{b:02x}' for b in value.to_bytes(6, 'big'))
+
+
+class DataPlane:
+    def __init__(
+        self,
+        topology: Topology,
+        aging_time: float = DEFAULT_AGING,
+        forward_delay: float = DEFAULT_FORWARD_DELAY,
+        max_hops: Optional[int] = None
+    ):
+        self.topology = topology
+        self.aging_time = aging_time
+        self.forward_delay = forward_delay
+        self.max_hops = max_hops
+        self.hosts: Dict[str, Host] = {}
+        self._host_list: List[Host] = []
+        # node id -> MAC -> port id; the learn time lives in Port.mac_table.
+        self.fdb: Dict[str, Dict[str, int]] = {}
+        self._heard = np.full(0, -np.inf)
+        self._tree = frozenset(topology.spanning_tree_links)
+        self._generation = topology.generation
+        self._tc_at = -np.inf
+        self._host_nodes = None
+        self.frames = 0
+        self.delivered = 0
+        self.flooded = 0
+        self.drops = Counter()
+        self.latency_total = 0.0
+        self.hops_total = 0
+
+    def attach_host(self, node_id: str, mac: Optional[str] = None) -> Host:
+        if node_id not in self.topology.nodes:
+            raise ValueError(f'Node not found: {node_id}')
+        host = self._register(node_id, mac)
+        self._grow()
+        return host
+
+    def attach_hosts(self, node_ids: List[str], count: int = 1) -> List[Host]:
+        """`count` hosts on each node, with the per-host arrays grown once."""
+        for node_id in node_ids:
+            if node_id not in self.topology.nodes:
+                raise ValueError(f'Node not found: {node_id}')
+        hosts = [self._register(node_id, None) for node_id in node_ids for _ in range(count)]
+        self._grow()
+        return hosts
+
+    def _register(self, node_id: str, mac: Optional[str]) -> Host:
+        index = len(self._host_list)
+        mac = mac or _format_mac(HOST_MAC_BASE | (index + 1))
+        if mac in self.hosts:
+            raise ValueError(f'MAC already attached: {mac}')
+        host = Host(mac, node_id, index)
+        self.hosts[mac] = host
+        self._host_list.append(host)
+        return host
+
+    def _grow(self):
+        missing = len(self._host_list) - len(self._heard)
+        if missing:
+            self._heard = np.concatenate((self._heard, np.full(missing, -np.inf)))
+            self._host_nodes = None
+
+    def _check_tree(self, now: float):
+        if self.topology.generation == self._generation:
+            return
+        self._generation = self.topology.generation
+        tree = self.topology.spanning_tree_links
+        if tree != self._tree:
+            self._tree = frozenset(tree)
+            self._tc_at = now
+
+    def _fresh(self, learned_at, now: float):
+        """Works on floats and arrays alike."""
+        fresh = learned_at >= now - self.aging_time
+        if now < self._tc_at + self.forward_delay:
+            return fresh
+        return fresh & (learned_at >= self._tc_at)
+
+    def _learn(self, node_id: str, port, mac: str, now: float):
+        table = self.fdb.setdefault(node_id, {})
+        previous = table.get(mac)
+        if previous is not None and previous != port.port_id:
+            old_port = self.topology.nodes[node_id].ports.get(previous)
+            if old_port is not None:
+                old_port.mac_table.pop(mac, None)
+        table[mac] = port.port_id
+        port.mac_table[mac] = now
+
+    def _lookup(self, node, mac: str, now: float):
+        table = self.fdb.get(node.id)
+        port_id = table.get(mac) if table else None
+        if port_id is None:
+            return None
+        port = node.ports.get(port_id)
+        learned_at = port.mac_table.get(mac) if port is not None else None
+        if learned_at is None or not self._fresh(learned_at, now):
+            del table[mac]
+            if learned_at is not None:
+                del port.mac_table[mac]
+            return None
+        return port
+
+    def flush(self):
+        for node_id, table in self.fdb.items():
+            node = self.topology.nodes.get(node_id)
+            for mac, port_id in table.items():
+                port = node.ports.get(port_id) if node else None
+                if port is not None:
+                    port.mac_table.pop(mac, None)
+        self.fdb = {}
+        self._heard[:] = -np.inf
+
+    def send(self, src_mac: str, dst_mac: str, now: Optional[float] = None) -> dict:
+        """Forward one frame hop by hop; returns its outcome."""
+        now = time.monotonic() if now is None else now
+        self._check_tree(now)
+        src = self.hosts[src_mac]
+        dst = self.hosts.get(dst_mac)
+        nodes = self.topology.nodes
+        result = {'delivered': False, 'flooded': False, 'reason': None, 'hops': None, 'latency': None}
+
+        if nodes[src.node_id].state != NodeState.ACTIVE:
+            result['reason'] = 'bridge_down'
+            return self._count(result)
+        self._heard[src.index] = now
+
+        visited = {src.node_id}
+        frontier = [(src.node_id, None, 0, 0.0)]
+        while frontier:
+            node_id, ingress, hops, latency = frontier.pop()
+            node = nodes[node_id]
+            if ingress is not None:
+                self._learn(node_id, ingress, src_mac, now)
+            if dst is not None and dst.node_id == node_id:
+                result.update(delivered=True, hops=hops, latency=latency)
+                continue
+
+            egress = self._lookup(node, dst_mac, now)
+            if egress is not None:
+                if egress is ingress:
+                    continue
+                if egress.state != PortState.FORWARDING or not egress.link or not egress.link.is_up():
+                    result['reason'] = result['reason'] or 'stale_entry'
+                    continue
+                out = [egress]
+            else:
+                result['flooded'] = True
+                out = [
+                    p for p in node.ports.values()
+                    if p is not ingress and p.state == PortState.FORWARDING and p.link and p.link.is_up()
+                ]
+
+            for port in out:
+                other = port.link.get_other_port(port)
+                neighbor = nodes.get(other.node_id)
+                if neighbor is None or neighbor.state != NodeState.ACTIVE or other.state != PortState.FORWARDING:
+                    continue
+                if self.max_hops is not None and hops + 1 > self.max_hops:
+                    result['reason'] = result['reason'] or 'hop_limit'
+                    continue
+                if other.node_id in visited:
+                    result['reason'] = result['reason'] or 'loop'
+                    continue
+                visited.add(other.node_id)
+                frontier.append((other.node_id, other, hops + 1, latency + port.link.latency))
+
+        if result['delivered']:
+            result['reason'] = None
+        elif result['reason'] is None:
+            result['reason'] = 'unreachable' if dst is not None else 'unknown_destination'
+        return self._count(result)
+
+    def _count(self, result: dict) -> dict:
+        self.frames += 1
+        if result['flooded']:
+            self.flooded += 1
+        if result['delivered']:
+            self.delivered += 1
+            self.latency_total += result['latency']
+            self.hops_total += result['hops']
+        else:
+            self.drops[result['reason']] += 1
+        return result
+
+    def _bulk_nodes(self, index: TreeIndex) -> np.ndarray:
+        if self._host_nodes is None or self._host_nodes[0] is not index:
+            nodes = np.array([index.index[h.node_id] for h in self._host_list], dtype=np.int64)
+            self._host_nodes = (index, nodes)
+        return self._host_nodes[1]
+
+    def send_bulk(self, src: np.ndarray, dst: np.ndarray, now: Optional[float] = None) -> dict:
+        """
+        Forward frames src[i] -> dst[i] (host indices) along the current
+        forwarding forest, all at once.
+        """
+        started = time.perf_counter()
+        now = time.monotonic() if now is None else now
+        self._check_tree(now)
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        index = TreeIndex.of(self.topology)
+        host_nodes = self._bulk_nodes(index)
+        a, b = host_nodes[src], host_nodes[dst]
+
+        src_up = index.active[a]
+        connected = index.connected(a, b)
+        known = self._fresh(self._heard[dst], now)
+        flooded = src_up & ~known
+        lca = index.lca(a[connected], b[connected])
+        latency = index.latency(a[connected], b[connected], lca)
+        hops = index.hops(a[connected], b[connected], lca)
+        np.maximum.at(self._heard, src[src_up], now)
+
+        frames = len(src)
+        delivered = int(connected.sum())
+        bridge_down = int((~src_up).sum())
+        drops = {'bridge_down': bridge_down, 'unreachable': frames - delivered - bridge_down}
+        drops = {reason: count for reason, count in drops.items() if count}
+        flooded_count = int(flooded.sum())
+
+        self.frames += frames
+        self.delivered += delivered
+        self.flooded += flooded_count
+        self.drops.update(drops)
+        self.latency_total += float(latency.sum())
+        self.hops_total += int(hops.sum())
+
+        elapsed = time.perf_counter() - started
+        return {
+            'frames': frames,
+            'delivered': delivered,
+            'dropped': frames - delivered,
+            'flooded': flooded_count,
+            'drops': drops,
+            'latency': _distribution(latency),
+            'hops': _distribution(hops),
+            'elapsed_ms': round(elapsed * 1000, 3),
+            'frames_per_second': round(frames / elapsed) if elapsed > 0 else None
+        }
+
+    def random_traffic(self, frames: int, seed: Optional[int] = None):
+        """Uniform (src, dst) host index pairs with src != dst."""
+        count = len(self._host_list)
+        if count < 2:
+            raise ValueError('at least two hosts must be attached')
+        rng = np.random.default_rng(seed)
+        src = rng.integers(0, count, frames)
+        dst = (src + rng.integers(1, count, frames)) % count
+        return src, dst
+
+    def get_status(self) -> dict:
+        return {
+            'hosts': len(self._host_list),
+            'fdb_entries': sum(len(t) for t in self.fdb.values()),
+            'aging_time': self.aging_time,
+            'forward_delay': self.forward_delay,
+            'frames': self.frames,
+            'delivered': self.delivered,
+            'dropped': self.frames - self.delivered,
+            'flooded': self.flooded,
+            'drops': dict(self.drops),
+            'mean_latency': round(self.latency_total / self.delivered, 6) if self.delivered else None,
+            'mean_hops': round(self.hops_total / self.delivered, 3) if self.delivered else None
+        }
+
+
+def _distribution(values: np.ndarray) -> Optional[dict]:
+    if not len(values):
+        return None
+    p50, p99 = np.percentile(values, (50, 99))
+    return {
+        'mean': round(float(values.mean()), 6),
+        'p50': round(float(p50), 6),
+        'p99': round(float(p99), 6),
+        'max': round(float(values.max()), 6)
+    }
@@ -0,0 +1,289 @@
+"""
+Append-only journal of topology mutations, and deterministic replay.
+
+Each line is a JSON entry with `seq`, `ts`, `type` and the topology
+`generation` after the entry took effect:
+
+- `base`: a binary snapshot (see persistence.py) the following entries apply to
+- `mutation`: batch-style operations, e.g. `[{"op": "fail_node", "node_id": ...}]`
+- `recompute`: a spanning-tree recompute and how long it took
+
+Entries of any other type are skipped and counted in the replay report.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Iterator, List, Optional
+from backend.core import persistence
+from backend.core.batch import OperationBatch, OperationError
+from backend.core.stp import STPCalculator
+from backend.core.topology import Topology
+from backend.utils.logtail import iter_lines_reverse
+
+
+class Journal:
+    """
+    Entries are buffered in memory and written by a background thread every
+    `flush_interval` seconds (or once `max_pending` entries are queued), with a
+    single fsync per batch, so appending never waits on the disk.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.2, max_pending: int = 1024):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.appended = 0
+        self.written = 0
+        self.fsyncs = 0
+        self._seq = 0
+        self._pending: List[str] = []
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self.truncated_bytes = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(path):
+            # A crash mid-write leaves a partial last line; drop it before appending.
+            self.truncated_bytes = _truncate_torn_tail(path)
+            # Continue the sequence of an existing journal so base snapshot names stay unique.
+            last = next(_parsed_reverse(path), None)
+            self._seq = last['seq'] if last else 0
+        self._file = open(path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._worker, name='journal-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def append(self, entry_type: str, generation: int, **fields) -> dict:
+        with self._condition:
+            self._seq += 1
+            entry = {'seq': self._seq, 'ts': time.time(), 'type': entry_type, 'generation': generation}
+            entry.update(fields)
+            self._pending.append(json.dumps(entry, separators=(',', ':')))
+            self.appended += 1
+            if len(self._pending) >= self.max_pending:
+                self._condition.notify_all()
+        return entry
+
+    def append_base(self, topology: Topology, reason: str) -> dict:
+        """Snapshot `topology` next to the journal and start a new replay segment from it."""
+        with self._condition:
+            name = f"{os.path.basename(self.path)}.{self._seq + 1}.base.trsp"
+        persistence.save(topology, os.path.join(os.path.dirname(os.path.abspath(self.path)), name))
+        return self.append('base', topology.generation, snapshot=name, reason=reason)
+
+    def flush(self):
+        with self._write_lock:
+            with self._condition:
+                lines, self._pending = self._pending, []
+            if not lines or self._file.closed:
+                return
+            self._file.write('\n'.join(lines) + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.written += len(lines)
+            self.fsyncs += 1
+
+    def close(self):
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout=1.0)
+        self.flush()
+        self._file.close()
+
+    def get_status(self) -> dict:
+        with self._condition:
+            pending = len(self._pending)
+        return {
+            'path': self.path,
+            'appended': self.appended,
+            'written': self.written,
+            'pending': pending,
+            'fsyncs': self.fsyncs,
+            'truncated_bytes': self.truncated_bytes
+        }
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                if not self._closed and len(self._pending) < self.max_pending:
+                    self._condition.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self.flush()
+
+
+def _truncate_torn_tail(path: str, block_size: int = 8192) -> int:
+    """Cut the file back to its last newline; returns the number of bytes removed."""
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        position = size
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size)
+            newline = block.rfind(b'\n')
+            if newline >= 0:
+                end = position + newline + 1
+                break
+        else:
+            end = 0
+        if end < size:
+            f.truncate(end)
+        return size - end
+
+
+def _parsed_reverse(path: str) -> Iterator[dict]:
+    """Entries from last to first, skipping lines that do not parse."""
+    for line in iter_lines_reverse(path):
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+
+def read_journal(path: str) -> Iterator[dict]:
+    """
+    Entries in order. A final line that does not parse is the torn write of a
+    crash and is skipped; an unparsable line followed by others is corruption
+    and raises.
+    """
+    torn = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if torn is not None:
+                raise torn
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                torn = e
+                continue
+            yield entry
+
+
+class Replay:
+    """
+    Re-executes a journal against fresh Topology/STPCalculator instances.
+
+    `full` mode runs at full speed and recomputes exactly where the journal
+    recorded a recompute, so the resulting generations must match the original
+    run. `virtual` mode ignores the recorded recomputes and instead derives
+    them from the entry timestamps with the RecomputeScheduler rules
+    (`quiet_period` / `max_delay`), advancing a virtual clock instead of
+    sleeping — useful for seeing how coalescing settings change the cost.
+    """
+
+    MODES = ('full', 'virtual')
+
+    def __init__(self, path: str, mode: str = 'full', quiet_period: float = 0.05, max_delay: float = 0.5):
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown replay mode: {mode}')
+        self.path = path
+        self.mode = mode
+        self.quiet_period = quiet_period
+        self.max_delay = max_delay
+        self.topology: Optional[Topology] = None
+        self.calculator: Optional[STPCalculator] = None
+        self.recomputes: List[dict] = []
+        self.errors: List[dict] = []
+        self.mutations = 0
+        self.generation_mismatches = 0
+        self.unknown_entries = Counter()
+        self._generation_offset = 0
+        self._since_recompute = 0
+        self._dirty_since: Optional[float] = None
+        self._last_change = 0.0
+
+    def run(self) -> dict:
+        started = time.perf_counter()
+        for entry in read_journal(self.path):
+            handler = getattr(self, f"_on_{entry['type']}", None)
+            if handler:
+                handler(entry)
+            else:
+                self.unknown_entries[entry['type']] += 1
+        if self.mode == 'virtual' and self._dirty_since is not None:
+            self._recompute(self._due(), None)
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed: float) -> dict:
+        costs = sorted(r['cost_ms'] for r in self.recomputes)
+        return {
+            'journal': self.path,
+            'mode': self.mode,
+            'mutations': self.mutations,
+            'recompute_count': len(costs),
+            'recompute_total_ms': round(sum(costs), 3),
+            'recompute_max_ms': costs[-1] if costs else 0.0,
+            'recompute_p50_ms': costs[len(costs) // 2] if costs else 0.0,
+            'generation_mismatches': self.generation_mismatches,
+            'unknown_entries': dict(self.unknown_entries),
+            'errors': self.errors,
+            'elapsed_ms': round(elapsed * 1000, 3),
+            'recomputes': self.recomputes
+        }
+
+    def _on_base(self, entry: dict):
+        if self.mode == 'virtual' and self._dirty_since is not None:
+            self._recompute(self._due(), None)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        self.topology = persistence.load(os.path.join(directory, entry['snapshot']))
+        self.calculator = STPCalculator(self.topology)
+        self._generation_offset = entry['generation'] - self.topology.generation
+        self._since_recompute = 0
+
+    def _on_mutation(self, entry: dict):
+        self._apply(entry, lambda: OperationBatch.from_payload(self.topology, entry['operations']).apply())
+
+    def _on_recompute(self, entry: dict):
+        if self.mode == 'full' and self.topology is not None:
+            self._recompute(entry['ts'], entry)
+
+    def _apply(self, entry: dict, action):
+        if self.topology is None:
+            self.errors.append({'seq': entry['seq'], 'message': 'Entry precedes any base snapshot'})
+            return
+        if self.mode == 'virtual':
+            if self._dirty_since is not None and entry['ts'] >= self._due():
+                self._recompute(self._due(), None)
+            if self._dirty_since is None:
+                self._dirty_since = entry['ts']
+            self._last_change = entry['ts']
+        try:
+            action()
+        except OperationError as e:
+            self.errors.append({'seq': entry['seq'], 'message': str(e)})
+            return
+        self.mutations += 1
+        self._since_recompute += 1
+        self._check_generation(entry)
+
+    def _due(self) -> float:
+        return min(self._last_change + self.quiet_period, self._dirty_since + self.max_delay)
+
+    def _recompute(self, at: float, entry: Optional[dict]):
+        started = time.perf_counter()
+        self.calculator.update_and_apply()
+        cost_ms = round((time.perf_counter() - started) * 1000, 3)
+        record = {'at': at, 'mutations': self._since_recompute, 'cost_ms': cost_ms}
+        if entry is not None:
+            record['seq'] = entry['seq']
+            record['recorded_ms'] = entry.get('duration_ms')
+            self._check_generation(entry)
+        self.recomputes.append(record)
+        self._since_recompute = 0
+        self._dirty_since = None
+
+    def _check_generation(self, entry: dict):
+        if self.mode == 'full' and entry['generation'] != self.topology.generation + self._generation_offset:
+            self.generation_mismatches += 1
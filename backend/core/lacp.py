@@ -13,6 +13,8 @@ class LACPDetector:
         self.on_failure: List[Callable[[Link], None]] = []
         self.on_recovery: List[Callable[[Link], None]] = []
         self.task = None
+        self.probes_sent = 0
+        self.probe_misses = 0
 
     def add_link(self, link: Link):
         if link not in self.links:
@@ -29,7 +31,9 @@ class LACPDetector:
         self.on_recovery.append(callback)
 
     async def probe_link(self, link: Link):
+        self.probes_sent += 1
         if link.state == LinkState.DOWN:
+            self.probe_misses += 1
             return
 
         link.lacp_success()
@@ -55,6 +59,8 @@ class LACPDetector:
             'running': self.running,
             'link_count': len(self.links),
             'up_count': sum(1 for l in self.links if l.is_up()),
-            'down_count': sum(1 for l in self.links if not l.is_up())
+            'down_count': sum(1 for l in self.links if not l.is_up()),
+            'probes_sent': self.probes_sent,
+            'probe_misses': self.probe_misses
         }
         return status
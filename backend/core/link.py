@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 import time
 
 
@@ -9,6 +9,11 @@ class LinkState(Enum):
     DEGRADED = "DEGRADED"
 
 
+def link_cost(bandwidth: float, latency: float) -> float:
+    """STP path cost of an UP link."""
+    return (1.0 / bandwidth) * 1000 + latency
+
+
 class Link:
     def __init__(self, port1, port2, bandwidth: float = 1000.0, latency: float = 1.0):
         self.link_id = f"{port1.node_id}-{port1.port_id}<->{port2.node_id}-{port2.port_id}"
@@ -21,10 +26,35 @@ class Link:
         self.lacp_fail_count = 0
         self.lacp_success_count = 0
         self.created_at = time.time()
+        self.state_listeners: List[Callable[['Link', LinkState], None]] = []
 
         port1.connect_link(self)
         port2.connect_link(self)
 
+    @classmethod
+    def restore(cls, link_id: str, port1, port2, state: LinkState, bandwidth: float, latency: float,
+                lacp_fail_count: int = 0, lacp_success_count: int = 0, listener: Optional[Callable] = None) -> 'Link':
+        """Rebuild a link from persisted state and attach it to both ports
+        without going through connect_link's state transitions."""
+        now = time.time()
+        link = cls.__new__(cls)
+        link.__dict__ = {
+            'link_id': link_id,
+            'port1': port1,
+            'port2': port2,
+            'state': state,
+            'bandwidth': bandwidth,
+            'latency': latency,
+            'last_lacp_time': now,
+            'lacp_fail_count': lacp_fail_count,
+            'lacp_success_count': lacp_success_count,
+            'created_at': now,
+            'state_listeners': [listener] if listener else []
+        }
+        port1.link = link
+        port2.link = link
+        return link
+
     def get_other_port(self, port):
         if port == self.port1:
             return self.port2
@@ -40,15 +70,22 @@ class Link:
         self.lacp_fail_count = 0
         self.last_lacp_time = time.time()
         if self.state != LinkState.UP:
-            self.state = LinkState.UP
+            self._set_state(LinkState.UP)
 
     def lacp_fail(self):
         self.lacp_fail_count += 1
         if self.lacp_fail_count >= 3:
-            self.state = LinkState.DOWN
+            self._set_state(LinkState.DOWN)
 
-    def set_state(self, new_state: LinkState):
+    def _set_state(self, new_state: LinkState):
+        old_state = self.state
         self.state = new_state
+        if old_state != new_state:
+            for listener in self.state_listeners:
+                listener(self, old_state)
+
+    def set_state(self, new_state: LinkState):
+        self._set_state(new_state)
         if new_state == LinkState.DOWN:
             self.lacp_fail_count = 3
         elif new_state == LinkState.UP:
@@ -61,7 +98,7 @@ class Link:
     def get_cost(self) -> float:
         if not self.is_up():
             return float('inf')
-        return (1.0 / self.bandwidth) * 1000 + self.latency
+        return link_cost(self.bandwidth, self.latency)
 
     def to_dict(self) -> dict:
         return {
@@ -76,4 +113,4 @@ class Link:
     def disconnect(self):
         self.port1.disconnect_link()
         self.port2.disconnect_link()
-        self.state = LinkState.DOWN
+        self._set_state(LinkState.DOWN)
@@ -1,6 +1,7 @@
 from enum import Enum
-from typing import Dict, Optional
+from typing import Callable, Dict, List, Optional
 import time
+from backend.core.bridge import BridgeId
 
 
 class PortState(Enum):
@@ -22,20 +23,41 @@ class Port:
         self.node_id = node_id
         self.state = PortState.DISABLED
         self.link = None
-        self.mac_table: Dict[str, str] = {}
+        self.mac_table: Dict[str, float] = {}
         self.last_bpdu_time = 0.0
         self.bpdu_count = 0
+        self.state_listeners: List[Callable[['Port', PortState], None]] = []
+
+    @classmethod
+    def restore(cls, port_id: int, node_id: str, state: PortState, listener: Optional[Callable] = None) -> 'Port':
+        """Rebuild a port from persisted state without the constructor's defaults."""
+        port = cls.__new__(cls)
+        port.__dict__ = {
+            'port_id': port_id,
+            'node_id': node_id,
+            'state': state,
+            'link': None,
+            'mac_table': {},
+            'last_bpdu_time': 0.0,
+            'bpdu_count': 0,
+            'state_listeners': [listener] if listener else []
+        }
+        return port
 
     def connect_link(self, link):
         self.link = link
-        self.state = PortState.BLOCKING
+        self.update_state(PortState.BLOCKING)
 
     def disconnect_link(self):
         self.link = None
-        self.state = PortState.DISABLED
+        self.update_state(PortState.DISABLED)
 
     def update_state(self, new_state: PortState):
+        old_state = self.state
         self.state = new_state
+        if old_state != new_state:
+            for listener in self.state_listeners:
+                listener(self, old_state)
 
     def record_bpdu(self):
         self.last_bpdu_time = time.time()
@@ -57,6 +79,7 @@ class Node:
         Node._id_counter += 1
         self.id = f"node_{Node._id_counter}"
         self.node_name = node_name
+        self.bridge_id = BridgeId.for_node(self.id)
         self.state = NodeState.ACTIVE
         self.ports: Dict[int, Port] = {}
         self.is_root = False
@@ -64,10 +87,48 @@ class Node:
         self.root_path_cost = 0
         self.parent_port: Optional[Port] = None
         self.last_heartbeat = time.time()
+        self.state_listeners: List[Callable[['Node', NodeState], None]] = []
+        self.port_listeners: List[Callable[[Port, PortState], None]] = []
+
+    @classmethod
+    def restore(cls, node_id: str, node_name: str, state: NodeState, ports: Dict[int, Port], is_root: bool,
+                root_id: Optional[str], root_path_cost: float, listener: Optional[Callable] = None,
+                port_listener: Optional[Callable] = None, bridge_id: Optional[BridgeId] = None) -> 'Node':
+        """Rebuild a node with a persisted id. The id counter is only ever raised,
+        so nodes created afterwards cannot collide with restored ones."""
+        node = cls.__new__(cls)
+        node.__dict__ = {
+            'id': node_id,
+            'node_name': node_name,
+            'bridge_id': bridge_id or BridgeId.for_node(node_id),
+            'state': state,
+            'ports': ports,
+            'is_root': is_root,
+            'root_id': root_id,
+            'root_path_cost': root_path_cost,
+            'parent_port': None,
+            'last_heartbeat': time.time(),
+            'state_listeners': [listener] if listener else [],
+            'port_listeners': [port_listener] if port_listener else []
+        }
+        return node
+
+    @classmethod
+    def reserve_ids(cls, node_ids):
+        highest = cls._id_counter
+        for node_id in node_ids:
+            prefix, _, number = node_id.rpartition('_')
+            if prefix == 'node' and number.isdigit():
+                highest = max(highest, int(number))
+        cls._id_counter = highest
 
     def add_port(self, port_id: int) -> Port:
         if port_id not in self.ports:
-            self.ports[port_id] = Port(port_id, self.id)
+            port = Port(port_id, self.id)
+            port.state_listeners.extend(self.port_listeners)
+            self.ports[port_id] = port
+            for listener in self.port_listeners:
+                listener(port, None)
         return self.ports[port_id]
 
     def get_port(self, port_id: int) -> Optional[Port]:
@@ -79,13 +140,20 @@ class Node:
     def get_forwarding_ports(self):
         return [p for p in self.ports.values() if p.state == PortState.FORWARDING]
 
+    def _set_state(self, new_state: NodeState):
+        old_state = self.state
+        self.state = new_state
+        if old_state != new_state:
+            for listener in self.state_listeners:
+                listener(self, old_state)
+
     def set_failed(self):
-        self.state = NodeState.FAILED
+        self._set_state(NodeState.FAILED)
         for port in self.ports.values():
-            port.state = PortState.DISABLED
+            port.update_state(PortState.DISABLED)
 
     def set_active(self):
-        self.state = NodeState.ACTIVE
+        self._set_state(NodeState.ACTIVE)
         self.last_heartbeat = time.time()
 
     def update_heartbeat(self):
@@ -102,5 +170,6 @@ class Node:
             'node_name': self.node_name,
             'state': self.state.value,
             'is_root': self.is_root,
-            'ports': {pid: p.to_dict() for pid, p in self.ports.items()}
+            'ports': {pid: p.to_dict() for pid, p in self.ports.items()},
+            'bridge_id': str(self.bridge_id)
         }
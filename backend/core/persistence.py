@@ -0,0 +1,232 @@
+"""
+Compact binary snapshots of a Topology.
+
+Layout (little-endian): a fixed header, a NUL-separated string table holding
+node ids, node names and link ids, then one packed column per field for nodes,
+ports, links and the spanning-tree link set. Every section starts on an 8-byte
+boundary so it can be cast straight out of an mmap without copying. The
+last column holds the 64-bit bridge id key of every node.
+
+On load the topology's state indexes are built straight from the decoded
+columns rather than by walking the restored objects again.
+"""
+import gc
+import mmap
+import os
+import struct
+from array import array
+from itertools import chain, compress, islice, repeat
+from operator import eq
+from typing import List
+from backend.core.bridge import BridgeId, BridgeQueue
+from backend.core.topology import Topology
+from backend.core.node import Node, Port, NodeState, PortState
+from backend.core.link import Link, LinkState
+
+
+MAGIC = b'TRSP'
+VERSION = 2
+HEADER = struct.Struct('<4sHHIIIIQid')
+
+NODE_STATES = list(NodeState)
+PORT_STATES = list(PortState)
+LINK_STATES = list(LinkState)
+
+
+class SnapshotFormatError(ValueError):
+    pass
+
+
+def _pad(size: int) -> int:
+    return (-size) % 8
+
+
+def _group(keys: List, codes: List[int], states: List) -> dict:
+    """{state: set of keys} from parallel key and state-code columns."""
+    return {state: set(compress(keys, map(eq, codes, repeat(code)))) for code, state in enumerate(states)}
+
+
+def dumps(topology: Topology) -> bytes:
+    nodes = topology.get_all_nodes()
+    links = topology.get_all_links()
+    node_index = {n.id: i for i, n in enumerate(nodes)}
+    link_index = {l.link_id: i for i, l in enumerate(links)}
+
+    port_index = {}
+    port_ids = array('I')
+    port_states = array('B')
+    port_counts = array('I')
+    for node in nodes:
+        port_counts.append(len(node.ports))
+        for port in node.ports.values():
+            port_index[id(port)] = len(port_ids)
+            port_ids.append(port.port_id)
+            port_states.append(PORT_STATES.index(port.state))
+
+    node_state_codes = {s: i for i, s in enumerate(NODE_STATES)}
+    link_state_codes = {s: i for i, s in enumerate(LINK_STATES)}
+
+    strings = [n.id for n in nodes] + [n.node_name for n in nodes] + [l.link_id for l in links]
+    string_blob = '\x00'.join(strings).encode('utf-8')
+
+    tree = array('I', sorted(link_index[l] for l in topology.spanning_tree_links if l in link_index))
+    root_index = node_index[topology.root_node.id] if topology.root_node and topology.root_node.id in node_index else -1
+
+    columns = [
+        array('B', [node_state_codes[n.state] for n in nodes]),
+        array('B', [1 if n.is_root else 0 for n in nodes]),
+        port_counts,
+        array('i', [node_index.get(n.root_id, -1) if n.root_id else -1 for n in nodes]),
+        array('d', [float(n.root_path_cost) for n in nodes]),
+        port_ids,
+        port_states,
+        array('I', [port_index[id(l.port1)] for l in links]),
+        array('I', [port_index[id(l.port2)] for l in links]),
+        array('B', [link_state_codes[l.state] for l in links]),
+        array('d', [l.bandwidth for l in links]),
+        array('d', [l.latency for l in links]),
+        array('I', [l.lacp_fail_count for l in links]),
+        array('I', [l.lacp_success_count for l in links]),
+        tree,
+        array('Q', [n.bridge_id.key for n in nodes])
+    ]
+
+    parts = [
+        HEADER.pack(MAGIC, VERSION, 0, len(nodes), len(port_ids), len(links), len(tree),
+                    len(string_blob), root_index, topology.last_update_time),
+        string_blob,
+        b'\x00' * _pad(HEADER.size + len(string_blob))
+    ]
+    for column in columns:
+        data = column.tobytes()
+        parts.append(data)
+        parts.append(b'\x00' * _pad(len(data)))
+    return b''.join(parts)
+
+
+def loads(data) -> Topology:
+    # Decoding allocates hundreds of thousands of long-lived objects at once;
+    # letting the cyclic collector run over them mid-load roughly doubles the time.
+    view = memoryview(data)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _decode(view)
+    finally:
+        view.release()
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _decode(view: memoryview) -> Topology:
+    if len(view) < HEADER.size:
+        raise SnapshotFormatError('Snapshot is truncated')
+    magic, version, _, n_nodes, n_ports, n_links, n_tree, strings_len, root_index, last_update = \
+        HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise SnapshotFormatError('Not a topology snapshot')
+    if version != VERSION:
+        raise SnapshotFormatError(f'Unsupported snapshot version: {version}')
+
+    offset = HEADER.size
+    blob = bytes(view[offset:offset + strings_len]).decode('utf-8')
+    strings = blob.split('\x00') if (n_nodes or n_links) else []
+    offset += strings_len + _pad(HEADER.size + strings_len)
+
+    def column(fmt: str, count: int) -> List:
+        nonlocal offset
+        size = struct.calcsize(fmt) * count
+        if offset + size > len(view):
+            raise SnapshotFormatError('Snapshot is truncated')
+        values = view[offset:offset + size].cast(fmt).tolist()
+        offset += size + _pad(size)
+        return values
+
+    node_states = column('B', n_nodes)
+    node_is_root = column('B', n_nodes)
+    port_counts = column('I', n_nodes)
+    node_root_ids = column('i', n_nodes)
+    node_root_costs = column('d', n_nodes)
+    port_ids = column('I', n_ports)
+    port_states = column('B', n_ports)
+    link_port1 = column('I', n_links)
+    link_port2 = column('I', n_links)
+    link_states = column('B', n_links)
+    link_bandwidths = column('d', n_links)
+    link_latencies = column('d', n_links)
+    link_fail_counts = column('I', n_links)
+    link_success_counts = column('I', n_links)
+    tree = column('I', n_tree)
+    bridge_keys = column('Q', n_nodes)
+
+    node_ids = strings[:n_nodes]
+    node_names = strings[n_nodes:2 * n_nodes]
+    link_ids = strings[2 * n_nodes:2 * n_nodes + n_links]
+
+    topology = Topology()
+    on_node, on_port, on_link = topology.listeners()
+    restore_port, restore_node, restore_link = Port.restore, Node.restore, Link.restore
+    from_key = BridgeId.from_key
+
+    # Owning node of every port, in port order.
+    port_nodes = list(chain.from_iterable(map(repeat, node_ids, port_counts)))
+    ports: List[Port] = [
+        restore_port(port_id, node_id, PORT_STATES[state], on_port)
+        for port_id, node_id, state in zip(port_ids, port_nodes, port_states)
+    ]
+    # Each node takes the next port_counts[i] ports off a shared iterator.
+    port_items = zip(port_ids, ports)
+    nodes: List[Node] = [
+        restore_node(node_id, name, NODE_STATES[state], dict(islice(port_items, count)), is_root == 1,
+                     node_ids[root] if root >= 0 else None, cost, on_node, on_port, from_key(key))
+        for node_id, name, state, count, is_root, root, cost, key in zip(
+            node_ids, node_names, node_states, port_counts, node_is_root, node_root_ids, node_root_costs, bridge_keys)
+    ]
+
+    node_links = {node_id: {} for node_id in node_ids}
+    links = []
+    for link_id, port1, port2, state, bandwidth, latency, fails, successes in zip(
+            link_ids, link_port1, link_port2, link_states, link_bandwidths, link_latencies,
+            link_fail_counts, link_success_counts):
+        link = restore_link(link_id, ports[port1], ports[port2], LINK_STATES[state],
+                            bandwidth, latency, fails, successes, on_link)
+        links.append(link)
+        node_links[port_nodes[port1]][link_id] = link
+        node_links[port_nodes[port2]][link_id] = link
+
+    active_code = NODE_STATES.index(NodeState.ACTIVE)
+    active = list(map(eq, node_states, repeat(active_code)))
+    indexes = {
+        'nodes_by_state': _group(node_ids, node_states, NODE_STATES),
+        'links_by_state': _group(link_ids, link_states, LINK_STATES),
+        'ports_by_state': _group(list(zip(port_nodes, port_ids)), port_states, PORT_STATES),
+        'node_links': node_links,
+        'spanning_tree_nodes': {port_nodes[link_port1[i]] for i in tree} | {port_nodes[link_port2[i]] for i in tree},
+        'root_queue': BridgeQueue(zip(compress(bridge_keys, active), compress(node_ids, active)))
+    }
+
+    Node.reserve_ids(node_ids)
+    topology.adopt(nodes, links, {link_ids[i] for i in tree}, nodes[root_index] if root_index >= 0 else None, indexes)
+    topology.last_update_time = last_update
+    return topology
+
+
+def save(topology: Topology, path: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(dumps(topology))
+    os.replace(temp_path, path)
+
+
+def load(path: str) -> Topology:
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise SnapshotFormatError('Snapshot is empty')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return loads(view)
+            finally:
+                view.release()
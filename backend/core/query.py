@@ -0,0 +1,108 @@
+from bisect import bisect_left
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
+
+
+Index = Union[FrozenSet[str], Dict[str, FrozenSet[str]]]
+
+
+class QueryError(ValueError):
+    pass
+
+
+class IndexedCollection:
+    """
+    Immutable, ordered list of serialized objects plus frozen copies of the
+    Topology indexes that select them.
+
+    An index is either a set (boolean filter such as spanning-tree membership)
+    or a mapping from value to set (state, node id). Filters intersect index
+    sets and only the matching ids are ordered and paged, so a query touches
+    the matches rather than the whole collection.
+    """
+
+    def __init__(self, items: List[dict], key: str, indexes: Dict[str, Index]):
+        self.items = items
+        self.key = key
+        self.indexes = indexes
+        self.ids = [item[key] for item in items]
+        self.position = {item_id: i for i, item_id in enumerate(self.ids)}
+
+    def select(self, filters: Dict[str, str], cursor: Optional[str] = None, limit: Optional[int] = None) -> Tuple[List[dict], Optional[str], int]:
+        include: List[FrozenSet[str]] = []
+        exclude: List[FrozenSet[str]] = []
+        for name, raw in filters.items():
+            index = self.indexes.get(name)
+            if index is None:
+                raise QueryError(f'Unknown filter: {name}')
+            if isinstance(index, dict):
+                values = [v for v in raw.split(',') if v]
+                unknown = [v for v in values if v not in index]
+                if unknown and name != 'node':
+                    raise QueryError(f"Invalid value for {name}: {','.join(unknown)}")
+                members = frozenset().union(*(index.get(v, frozenset()) for v in values))
+                include.append(members)
+            elif raw.lower() in ('true', '1', 'yes'):
+                include.append(index)
+            elif raw.lower() in ('false', '0', 'no'):
+                exclude.append(index)
+            else:
+                raise QueryError(f'Invalid value for {name}: {raw}')
+
+        start = 0
+        if cursor:
+            try:
+                start = int(cursor)
+            except ValueError:
+                start = -1
+            # Only the canonical form select() hands out: no sign, padding or whitespace.
+            if start < 0 or str(start) != cursor:
+                raise QueryError(f'Invalid cursor: {cursor}')
+        if limit is not None and limit <= 0:
+            raise QueryError('limit must be positive')
+
+        if include:
+            matches = set(min(include, key=len))
+            for members in include:
+                matches &= members
+            for members in exclude:
+                matches -= members
+            positions = sorted(self.position[item_id] for item_id in matches if item_id in self.position)
+            total = len(positions)
+            offset = bisect_left(positions, start)
+            page = positions[offset:offset + limit] if limit is not None else positions[offset:]
+            has_more = limit is not None and offset + limit < total
+        else:
+            excluded = frozenset().union(*exclude) if exclude else frozenset()
+            total = len(self.items) - len(excluded & self.position.keys())
+            page = []
+            has_more = False
+            position = start
+            while position < len(self.ids):
+                if self.ids[position] not in excluded:
+                    if limit is not None and len(page) == limit:
+                        has_more = True
+                        break
+                    page.append(position)
+                position += 1
+
+        next_cursor = str(page[-1] + 1) if page and has_more else None
+        return [self.items[p] for p in page], next_cursor, total
+
+    def replace(self, items: List[dict], indexes: Dict[str, Index]) -> 'IndexedCollection':
+        """
+        Collection over `items`, which must hold the same ids in the same
+        order, sharing this one's positions; `indexes` replace the named ones.
+        """
+        collection = IndexedCollection.__new__(IndexedCollection)
+        collection.items = items
+        collection.key = self.key
+        collection.indexes = dict(self.indexes, **indexes)
+        collection.ids = self.ids
+        collection.position = self.position
+        return collection
+
+
+def project(items: List[dict], fields: Optional[List[str]]) -> List[dict]:
+    if not fields:
+        return items
+    return [{f: item[f] for f in fields if f in item} for item in items]
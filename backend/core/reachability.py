@@ -0,0 +1,189 @@
+"""
+All-pairs reachability over the forwarding topology.
+
+Two active nodes can exchange frames exactly when they are joined by UP links
+whose ports are both FORWARDING, so the n x n reachability matrix is a
+permutation of a block-diagonal one and one component label per node
+describes it completely. Labels are computed once per topology generation
+with a union-find pass over the forwarding links and published with the
+snapshot. The matrix is served as runs over the nodes ordered by component,
+or as packed bitset rows for a bounded window of nodes, whose column order is
+paged separately, and compared with the labels published for the previous
+generation.
+"""
+import base64
+import time
+import weakref
+from typing import List, Optional
+import numpy as np
+from backend.core.node import NodeState, PortState
+from backend.core.topology import Topology
+
+
+DIFF_LIMIT = 100
+MAX_ROWS = 1024
+
+
+def _pairs(sizes: np.ndarray) -> int:
+    return int((sizes * (sizes - 1) // 2).sum())
+
+
+class ReachabilityLabels:
+    """Forwarding component of every node (-1 for failed nodes) at one generation."""
+
+    def __init__(self, topology: Topology):
+        started = time.perf_counter()
+        self.topology = weakref.ref(topology)
+        self.generation = topology.generation
+        self.ids: List[str] = list(topology.nodes)
+        index = {node_id: i for i, node_id in enumerate(self.ids)}
+        n = len(self.ids)
+
+        active = np.fromiter((node.state == NodeState.ACTIVE for node in topology.nodes.values()), dtype=bool, count=n)
+        parent = list(range(n))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        # Forwarding links whose ends were already joined: each closes a loop.
+        cycle_links = []
+        forwarding = PortState.FORWARDING
+        for link in topology.links.values():
+            if not link.is_up() or link.port1.state != forwarding or link.port2.state != forwarding:
+                continue
+            a, b = index.get(link.port1.node_id), index.get(link.port2.node_id)
+            if a is None or b is None or not (active[a] and active[b]):
+                continue
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[ra] = rb
+            else:
+                cycle_links.append(link.link_id)
+
+        roots = np.fromiter((find(i) for i in range(n)), dtype=np.int64, count=n)
+        labels = np.full(n, -1, dtype=np.int64)
+        if active.any():
+            _, labels[active] = np.unique(roots[active], return_inverse=True)
+        self.active = active
+        self.labels = labels
+        self.sizes = np.bincount(labels[active])
+        self.cycle_links = cycle_links
+        self.previous: Optional['ReachabilityLabels'] = None
+        self.elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+
+    @classmethod
+    def publish(cls, topology: Topology, current: Optional['ReachabilityLabels']) -> 'ReachabilityLabels':
+        """
+        Labels for the topology's generation, reusing `current` (the labels
+        published last) when nothing changed; otherwise `current` becomes the
+        new labels' previous generation.
+        """
+        if current is not None and current.topology() is topology and current.generation == topology.generation:
+            return current
+        labels = cls(topology)
+        if current is not None:
+            current.previous = None
+            labels.previous = current
+        return labels
+
+    def summary(self) -> dict:
+        n = len(self.ids)
+        reachable = int(self.active.sum())
+        return {
+            'generation': self.generation,
+            'nodes': n,
+            'reachable_nodes': reachable,
+            'components': len(self.sizes),
+            'largest_component': int(self.sizes.max(initial=0)),
+            'reachable_pairs': _pairs(self.sizes),
+            'total_pairs': n * (n - 1) // 2,
+            'fully_connected': len(self.sizes) <= 1 and reachable == n,
+            'elapsed_ms': self.elapsed_ms
+        }
+
+    def runs(self) -> dict:
+        """
+        Active nodes ordered by component; row and column i of the matrix in
+        this order are set exactly over the run containing i.
+        """
+        active = np.nonzero(self.active)[0]
+        order = active[np.argsort(self.labels[active], kind='stable')]
+        ends = np.cumsum(self.sizes)
+        ids = self.ids
+        return {
+            'order': [ids[i] for i in order.tolist()],
+            'runs': [[start, size] for start, size in zip((ends - self.sizes).tolist(), self.sizes.tolist())],
+            'failed': [ids[i] for i in np.nonzero(~self.active)[0].tolist()]
+        }
+
+    def node_ids(self, offset: int, limit: int) -> dict:
+        """Node order of the matrix rows and columns, one window at a time."""
+        ids = self.ids[offset:offset + limit]
+        return {
+            'node_ids': ids,
+            'offset': offset,
+            'next_offset': offset + limit if offset + limit < len(self.ids) else None
+        }
+
+    def rows(self, offset: int, limit: int) -> dict:
+        """
+        Matrix rows offset..offset+limit in node order, each packed big-endian
+        into base64. Only the row keys are included; column j is the j-th id
+        of node_ids().
+        """
+        labels = self.labels
+        window = labels[offset:offset + limit]
+        matrix = (window[:, None] == labels[None, :]) & (window >= 0)[:, None]
+        packed = np.packbits(matrix, axis=1)
+        return {
+            'row_ids': self.ids[offset:offset + limit],
+            'offset': offset,
+            'row_bytes': packed.shape[1],
+            'rows': [base64.b64encode(row).decode('ascii') for row in packed]
+        }
+
+    def diff(self) -> Optional[dict]:
+        """Pairs and nodes whose reachability changed since the previous generation."""
+        previous = self.previous
+        if previous is None:
+            return None
+        if previous.ids == self.ids:
+            old, new = previous.labels, self.labels
+            common = self.ids
+            added, removed = [], []
+        else:
+            old_index = {node_id: i for i, node_id in enumerate(previous.ids)}
+            common = [node_id for node_id in self.ids if node_id in old_index]
+            new_index = set(self.ids)
+            old = previous.labels[np.array([old_index[i] for i in common], dtype=np.int64)]
+            new_positions = {node_id: i for i, node_id in enumerate(self.ids)}
+            new = self.labels[np.array([new_positions[i] for i in common], dtype=np.int64)]
+            added = [node_id for node_id in self.ids if node_id not in old_index]
+            removed = [node_id for node_id in previous.ids if node_id not in new_index]
+
+        # Pairs among the nodes present in both generations, counted per
+        # (old component, new component) cell.
+        old_sizes = np.bincount(old[old >= 0]) if (old >= 0).any() else np.zeros(0, dtype=np.int64)
+        new_sizes = np.bincount(new[new >= 0]) if (new >= 0).any() else np.zeros(0, dtype=np.int64)
+        both = (old >= 0) & (new >= 0)
+        cell = old * (len(new_sizes) + 1) + new
+        _, cell_of, cell_sizes = np.unique(cell[both], return_inverse=True, return_counts=True)
+        kept = _pairs(cell_sizes)
+
+        changed = (old >= 0) != (new >= 0)
+        cell_size = cell_sizes[cell_of]
+        changed[both] = (cell_size != old_sizes[old[both]]) | (cell_size != new_sizes[new[both]])
+        changed_ids = [common[i] for i in np.nonzero(changed)[0][:DIFF_LIMIT].tolist()]
+
+        return {
+            'previous_generation': previous.generation,
+            'lost_pairs': _pairs(old_sizes) - kept,
+            'gained_pairs': _pairs(new_sizes) - kept,
+            'changed_count': int(changed.sum()),
+            'changed_nodes': changed_ids,
+            'added_nodes': added[:DIFF_LIMIT],
+            'removed_nodes': removed[:DIFF_LIMIT]
+        }
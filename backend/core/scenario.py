@@ -0,0 +1,351 @@
+"""
+Declarative, timed fault-injection scenarios.
+
+A scenario is a JSON object (or YAML document) such as:
+
+    name: composite_failure
+    clock: virtual            # or wall
+    events:
+      - {at: 0.0, op: link_down, link: [Node1, Node2]}
+      - {at: 1.5, op: fail_node, node: Node3}
+      - {at: 3.0, assert: {active_nodes: 3, reachable: [Node1, Node2, Node4]}}
+
+Operations are the /api/batch operations; nodes are referenced by name or id
+and links by id or by the pair of node names they connect. Spanning-tree
+recomputes are coalesced with the same quiet-period / max-delay rules as the
+RecomputeScheduler, against either a virtual clock or wall time.
+"""
+import contextlib
+import json
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from backend.core.batch import LINK_OPERATIONS, NODE_OPERATIONS, OperationBatch
+from backend.core.node import NodeState
+from backend.core.stp import STPCalculator
+from backend.core.topology import Topology
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+
+CLOCKS = ('virtual', 'wall')
+ASSERTIONS = ('root', 'active_nodes', 'spanning_tree_links', 'reachable', 'unreachable')
+
+
+class ScenarioError(ValueError):
+    pass
+
+
+class Scenario:
+    def __init__(self, name: str, events: List[dict], description: str = '', clock: str = 'virtual'):
+        self.name = name
+        self.events = events
+        self.description = description
+        self.clock = clock
+
+    @classmethod
+    def parse(cls, text: str, content_type: str = 'application/json') -> 'Scenario':
+        if 'yaml' in content_type:
+            if yaml is None:
+                raise ScenarioError('YAML scenarios require PyYAML')
+            try:
+                data = yaml.safe_load(text)
+            except yaml.YAMLError as e:
+                raise ScenarioError(f'Invalid YAML: {e}')
+        else:
+            try:
+                data = json.loads(text)
+            except ValueError as e:
+                raise ScenarioError(f'Invalid JSON: {e}')
+        return cls.from_dict(data)
+
+    @classmethod
+    def from_dict(cls, data) -> 'Scenario':
+        if not isinstance(data, dict):
+            raise ScenarioError('scenario must be an object')
+        name = data.get('name')
+        if not isinstance(name, str) or not name:
+            raise ScenarioError('scenario needs a name')
+        clock = data.get('clock', 'virtual')
+        if clock not in CLOCKS:
+            raise ScenarioError(f'clock must be one of {", ".join(CLOCKS)}')
+        events = data.get('events')
+        if not isinstance(events, list) or not events:
+            raise ScenarioError('events must be a non-empty list')
+
+        checked = []
+        for index, event in enumerate(events):
+            if not isinstance(event, dict):
+                raise ScenarioError(f'event {index} must be an object')
+            at = event.get('at', 0)
+            if not isinstance(at, (int, float)) or at < 0:
+                raise ScenarioError(f'event {index}: "at" must be a non-negative number')
+            if 'assert' in event:
+                checks = event['assert']
+                if not isinstance(checks, dict) or not checks:
+                    raise ScenarioError(f'event {index}: assert must be a non-empty object')
+                unknown = [k for k in checks if k not in ASSERTIONS]
+                if unknown:
+                    raise ScenarioError(f"event {index}: unknown assertion {', '.join(unknown)}")
+            elif event.get('op') in NODE_OPERATIONS:
+                if 'node' not in event:
+                    raise ScenarioError(f'event {index}: {event["op"]} needs a node')
+            elif event.get('op') in LINK_OPERATIONS:
+                if 'link' not in event:
+                    raise ScenarioError(f'event {index}: {event["op"]} needs a link')
+            else:
+                raise ScenarioError(f"event {index}: unknown operation {event.get('op')}")
+            checked.append(dict(event, at=float(at), index=index))
+
+        checked.sort(key=lambda e: e['at'])
+        return cls(name, checked, data.get('description', ''), clock)
+
+    def operations(self, topology: Topology) -> List[dict]:
+        """The scenario's operations resolved to /api/batch form for `topology`, in time order."""
+        return [resolve_operation(topology, e) for e in self.events if 'op' in e]
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'description': self.description,
+            'clock': self.clock,
+            'events': [{k: v for k, v in e.items() if k != 'index'} for e in self.events]
+        }
+
+
+def resolve_operation(topology: Topology, event: dict) -> dict:
+    if 'node' in event:
+        ref = event['node']
+        node = topology.get_node(ref) or topology.get_node_by_name(ref)
+        if not node:
+            raise ScenarioError(f"event {event['index']}: node not found: {ref}")
+        return {'op': event['op'], 'node_id': node.id}
+
+    ref = event['link']
+    if isinstance(ref, str):
+        link = topology.get_link(ref)
+    elif isinstance(ref, list) and len(ref) == 2:
+        ends = [topology.get_node(r) or topology.get_node_by_name(r) for r in ref]
+        link = None
+        if all(ends):
+            link = next((l for l in topology.get_node_links(ends[0])
+                         if ends[1].id in l.get_connected_nodes()), None)
+    else:
+        link = None
+    if not link:
+        raise ScenarioError(f"event {event['index']}: link not found: {ref}")
+    return {'op': event['op'], 'link_id': link.link_id}
+
+
+def reachable_nodes(topology: Topology) -> set:
+    """Active nodes connected to the root over UP spanning-tree links."""
+    root = topology.root_node
+    if not root or root.state != NodeState.ACTIVE:
+        return set()
+    tree = topology.spanning_tree_links
+    seen = {root.id}
+    queue = deque([root.id])
+    while queue:
+        node_id = queue.popleft()
+        for link_id, link in topology.node_links.get(node_id, {}).items():
+            if link_id not in tree or not link.is_up():
+                continue
+            for other_id in link.get_connected_nodes():
+                other = topology.nodes.get(other_id)
+                if other_id not in seen and other and other.state == NodeState.ACTIVE:
+                    seen.add(other_id)
+                    queue.append(other_id)
+    return seen
+
+
+class ScenarioRunner:
+    """
+    Executes one scenario against `topology`.
+
+    By default the runner owns the topology (callers pass a clone), applies
+    operations directly and recomputes with its own STPCalculator. For a live
+    session, pass the session's writer `lock` plus `apply` and `recompute`
+    callables that also publish each change to readers.
+    """
+
+    def __init__(
+        self,
+        scenario: Scenario,
+        topology: Topology,
+        clock: Optional[str] = None,
+        quiet_period: float = 0.05,
+        max_delay: float = 0.5,
+        lock=None,
+        apply: Optional[Callable[[dict], None]] = None,
+        recompute: Optional[Callable[[], None]] = None
+    ):
+        self.scenario = scenario
+        self.topology = topology
+        self.clock = clock or scenario.clock
+        if self.clock not in CLOCKS:
+            raise ScenarioError(f'clock must be one of {", ".join(CLOCKS)}')
+        self.quiet_period = quiet_period
+        self.max_delay = max_delay
+        self.lock = lock
+        self._apply_operation = apply or (lambda op: OperationBatch.from_payload(topology, [op]).apply())
+        self._recompute_tree = recompute or STPCalculator(topology).update_and_apply
+        self.progress = 0
+        self.total = len(scenario.events)
+        self._now = 0.0
+        self._started = 0.0
+        self._dirty_since: Optional[float] = None
+        self._last_change = 0.0
+        self._unconverged: List[dict] = []
+        self.results: List[dict] = []
+        self.recomputes: List[dict] = []
+        self.timeline: List[dict] = []
+
+    def run(self) -> dict:
+        with self._locked():
+            operations = {e['index']: resolve_operation(self.topology, e) for e in self.scenario.events if 'op' in e}
+        self._started = time.monotonic()
+        self._record_reachability()
+
+        for event in self.scenario.events:
+            while self._dirty_since is not None and self._due() <= event['at']:
+                self._advance(self._due())
+                self._recompute()
+            self._advance(event['at'])
+            if 'op' in event:
+                self._apply(event, operations[event['index']])
+            else:
+                self._check(event)
+            self.progress += 1
+
+        while self._dirty_since is not None:
+            self._advance(self._due())
+            self._recompute()
+
+        assertions = [r for r in self.results if 'assert' in r]
+        return {
+            'scenario': self.scenario.name,
+            'clock': self.clock,
+            'passed': all(r['passed'] for r in assertions),
+            'duration_seconds': round(self._now, 6),
+            'recompute_count': len(self.recomputes),
+            'events': self.results,
+            'recomputes': self.recomputes,
+            'reachability': self.timeline
+        }
+
+    def _locked(self):
+        return self.lock if self.lock is not None else contextlib.nullcontext()
+
+    def _advance(self, at: float):
+        if self.clock == 'wall':
+            remaining = self._started + at - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+            self._now = max(at, time.monotonic() - self._started)
+        else:
+            self._now = max(self._now, at)
+
+    def _due(self) -> float:
+        return min(self._last_change + self.quiet_period, self._dirty_since + self.max_delay)
+
+    def _apply(self, event: dict, operation: dict):
+        with self._locked():
+            self._apply_operation(operation)
+        if self._dirty_since is None:
+            self._dirty_since = self._now
+        self._last_change = self._now
+        result = dict(operation, index=event['index'], at=event['at'], convergence_seconds=None)
+        self._unconverged.append(result)
+        self.results.append(result)
+
+    def _recompute(self):
+        started = time.perf_counter()
+        with self._locked():
+            self._recompute_tree()
+        cost = time.perf_counter() - started
+        if self.clock == 'wall':
+            self._now = time.monotonic() - self._started
+        else:
+            self._now += cost
+        for result in self._unconverged:
+            result['convergence_seconds'] = round(self._now - result['at'], 6)
+        self.recomputes.append({
+            'at': round(self._now, 6),
+            'events': [r['index'] for r in self._unconverged],
+            'cost_ms': round(cost * 1000, 3)
+        })
+        self._unconverged = []
+        self._dirty_since = None
+        self._record_reachability()
+
+    def _record_reachability(self):
+        with self._locked():
+            reachable = reachable_nodes(self.topology)
+            unreachable = sorted(n.node_name for n in self.topology.nodes.values() if n.id not in reachable)
+        self.timeline.append({'at': round(self._now, 6), 'reachable': len(reachable), 'unreachable': unreachable})
+
+    def _check(self, event: dict):
+        with self._locked():
+            topology = self.topology
+            reachable = {topology.nodes[n].node_name for n in reachable_nodes(topology)}
+            actual = {
+                'root': topology.root_node.node_name if topology.root_node else None,
+                'active_nodes': len(topology.get_active_nodes()),
+                'spanning_tree_links': len(topology.spanning_tree_links),
+            }
+        failures = []
+        for key, expected in event['assert'].items():
+            if key == 'reachable':
+                value = sorted(set(expected) - reachable)
+                ok = not value
+            elif key == 'unreachable':
+                value = sorted(set(expected) & reachable)
+                ok = not value
+            else:
+                value = actual[key]
+                ok = value == expected
+            if not ok:
+                failures.append({'check': key, 'expected': expected, 'actual': value})
+        self.results.append({
+            'index': event['index'],
+            'at': event['at'],
+            'assert': event['assert'],
+            'passed': not failures,
+            'failures': failures
+        })
+
+
+BUILTIN_SCENARIOS: Dict[str, dict] = {
+    'link_failure': {
+        'name': 'link_failure',
+        'description': 'Take down the Node1-Node2 link',
+        'events': [{'at': 0, 'op': 'link_down', 'link': ['Node1', 'Node2']}]
+    },
+    'link_recovery': {
+        'name': 'link_recovery',
+        'description': 'Bring the Node1-Node2 link back up',
+        'events': [{'at': 0, 'op': 'link_up', 'link': ['Node1', 'Node2']}]
+    },
+    'node_failure': {
+        'name': 'node_failure',
+        'description': 'Fail Node3',
+        'events': [{'at': 0, 'op': 'fail_node', 'node': 'Node3'}]
+    },
+    'composite_failure': {
+        'name': 'composite_failure',
+        'description': 'Link and node failure followed by recovery of both',
+        'clock': 'wall',
+        'events': [
+            {'at': 0.0, 'assert': {'active_nodes': 4, 'reachable': ['Node1', 'Node2', 'Node3', 'Node4']}},
+            {'at': 1.5, 'op': 'link_down', 'link': ['Node1', 'Node2']},
+            {'at': 3.0, 'op': 'fail_node', 'node': 'Node3'},
+            {'at': 4.5, 'assert': {'active_nodes': 3, 'reachable': ['Node1', 'Node2', 'Node4']}},
+            {'at': 6.0, 'op': 'recover_node', 'node': 'Node3'},
+            {'at': 7.5, 'op': 'link_up', 'link': ['Node1', 'Node2']},
+            {'at': 9.0, 'assert': {'active_nodes': 4, 'reachable': ['Node1', 'Node2', 'Node3', 'Node4']}}
+        ]
+    }
+}
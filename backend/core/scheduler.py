@@ -0,0 +1,125 @@
+import threading
+import time
+from typing import Callable, Optional
+from backend.utils.logger import get_logger
+
+
+class RecomputeScheduler:
+    """
+    Coalesces topology changes into spanning-tree recomputes.
+
+    Every change marks the topology dirty. A worker thread runs the callback
+    once the topology has been quiet for `quiet_period` seconds, or at the
+    latest `max_delay` seconds after the first unprocessed change. Changes that
+    arrive while the callback is running mark the topology dirty again, so a
+    change is never dropped.
+    """
+
+    def __init__(self, callback: Callable[[], None], quiet_period: float = 0.05, max_delay: float = 0.5):
+        self.callback = callback
+        self.quiet_period = quiet_period
+        self.max_delay = max_delay
+        self.change_count = 0
+        self.recompute_count = 0
+        self.last_recompute_time = 0.0
+        self.error_count = 0
+        self.last_error: Optional[dict] = None
+        self._condition = threading.Condition()
+        self._run_lock = threading.Lock()
+        self._dirty_since: Optional[float] = None
+        self._last_change = 0.0
+        self._in_progress = False
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def mark_dirty(self):
+        with self._condition:
+            now = time.monotonic()
+            if self._dirty_since is None:
+                self._dirty_since = now
+            self._last_change = now
+            self.change_count += 1
+            self._ensure_worker()
+            self._condition.notify_all()
+
+    def is_pending(self) -> bool:
+        with self._condition:
+            return self._dirty_since is not None or self._in_progress
+
+    def flush(self) -> bool:
+        """Run a pending recompute in the calling thread. Returns True if one ran."""
+        with self._run_lock:
+            with self._condition:
+                if self._dirty_since is None:
+                    return False
+                self._dirty_since = None
+                self._in_progress = True
+            self._run()
+            return True
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._dirty_since is not None or self._in_progress:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def get_status(self) -> dict:
+        with self._condition:
+            return {
+                'state': 'pending' if self._dirty_since is not None or self._in_progress else 'current',
+                'change_count': self.change_count,
+                'recompute_count': self.recompute_count,
+                'last_recompute_time': self.last_recompute_time,
+                'quiet_period': self.quiet_period,
+                'max_delay': self.max_delay,
+                'error_count': self.error_count,
+                'last_error': self.last_error
+            }
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped = False
+            self._thread = threading.Thread(target=self._worker, name='stp-recompute', daemon=True)
+            self._thread.start()
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if self._dirty_since is None:
+                        self._condition.wait()
+                        continue
+                    due = min(self._last_change + self.quiet_period, self._dirty_since + self.max_delay)
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if self._stopped:
+                    return
+            self.flush()
+
+    def _run(self):
+        try:
+            self.callback()
+        except Exception as e:
+            get_logger().error(f"Recompute callback error: {type(e).__name__}: {e}")
+            with self._condition:
+                self.error_count += 1
+                self.last_error = {'message': f"{type(e).__name__}: {e}", 'time': time.time()}
+        finally:
+            with self._condition:
+                self._in_progress = False
+                self.recompute_count += 1
+                self.last_recompute_time = time.time()
+                self._condition.notify_all()
@@ -0,0 +1,193 @@
+import time
+import weakref
+from collections import defaultdict
+from backend.core.topology import Topology
+from backend.core.node import NodeState
+from backend.core.link import LinkState
+from backend.core.stp import STPCalculator
+from backend.core.query import IndexedCollection
+from backend.utils.profiling import span
+
+
+class TopologySnapshot:
+    """
+    Read-only view of the topology captured by the single writer.
+
+    Readers only ever dereference the currently published snapshot, so they
+    never observe a half-applied mutation or spanning-tree update. The payloads
+    are shared between requests and must not be mutated; copy before adding keys.
+    `encoded` caches serialized response bodies for this snapshot.
+    """
+
+    def __init__(self, version: int, topology: dict, nodes: list, links: list, spanning_tree: dict, summary: dict):
+        self.version = version
+        self.topology = topology
+        self.nodes = nodes
+        self.links = links
+        self.spanning_tree = spanning_tree
+        self.summary = summary
+        self.created_at = time.time()
+        # Topology generation the node and link payloads describe.
+        self.generation = None
+        self.encoded = {}
+        self.node_collection: IndexedCollection = None
+        self.link_collection: IndexedCollection = None
+        self.connectivity_seconds = 0.0
+        # Link utilization for the session's traffic matrix, if one is set.
+        self.utilization = None
+        # Forwarding component labels, linked to those of the previous generation.
+        self.reachability = None
+        # TreeIndex of the forwarding forest, for path queries.
+        self.tree_index = None
+        # Version of the full capture whose connectivity, spanning tree,
+        # reachability and utilization this snapshot carries.
+        self.captured_version = version
+        self.source = None
+        self.structure = None
+
+    def can_patch(self, topology: Topology) -> bool:
+        """Whether `topology` still has the nodes and links this snapshot was captured from."""
+        return self.source is not None and self.source() is topology and self.structure == topology.structure
+
+    @classmethod
+    def capture(cls, version: int, topology: Topology, stp_calculator: STPCalculator) -> 'TopologySnapshot':
+        topology.take_changes()
+        started = time.perf_counter()
+        with span('connectivity'):
+            connectivity = topology.get_all_connectivity()
+        connectivity_seconds = time.perf_counter() - started
+        with span('to_dict'):
+            topology_dict = topology.to_dict(connectivity)
+        nodes = [topology_dict['nodes'][n.id] for n in topology.get_all_nodes()]
+        links = [topology_dict['links'][l.link_id] for l in topology.get_all_links()]
+
+        active_nodes = sum(1 for n in topology.nodes.values() if n.state == NodeState.ACTIVE)
+        summary = {
+            'total_nodes': len(topology.nodes),
+            'active_nodes': active_nodes,
+            'failed_nodes': len(topology.nodes) - active_nodes,
+            'total_links': len(topology.links),
+            'up_links': sum(1 for l in topology.links.values() if l.state == LinkState.UP),
+            'down_links': sum(1 for l in topology.links.values() if l.state == LinkState.DOWN),
+            'spanning_tree_links': len(topology.spanning_tree_links),
+            'root_node_id': topology.root_node.id if topology.root_node else None,
+            'root_node_name': topology.root_node.node_name if topology.root_node else None
+        }
+
+        snapshot = cls(
+            version=version,
+            topology=topology_dict,
+            nodes=[{k: v for k, v in n.items() if k != 'connectivity'} for n in nodes],
+            links=links,
+            spanning_tree=stp_calculator.get_spanning_tree_info(),
+            summary=summary
+        )
+        with span('snapshot_indexes'):
+            snapshot.node_collection, snapshot.link_collection = cls._capture_collections(snapshot, topology)
+        snapshot.connectivity_seconds = connectivity_seconds
+        snapshot.generation = topology.generation
+        snapshot.source = weakref.ref(topology)
+        snapshot.structure = topology.structure
+        return snapshot
+
+    @classmethod
+    def patch(cls, previous: 'TopologySnapshot', version: int, topology: Topology) -> 'TopologySnapshot':
+        """
+        Snapshot for a mutation made while a recompute is pending. Only the
+        nodes and links whose state changed are serialized again and only the
+        state indexes are refreshed; connectivity, the spanning tree, the tree
+        index and the other derived views carry over from `previous` until the recompute
+        publishes a full capture. `previous` must satisfy can_patch().
+        """
+        node_ids, link_ids, port_keys = topology.take_changes()
+        node_ids = node_ids | {node_id for node_id, _ in port_keys}
+        port_links = {
+            port.link.link_id: port.link for port in (
+                topology.nodes[node_id].ports.get(port_id) for node_id, port_id in port_keys
+            ) if port and port.link
+        }
+
+        topology_dict = dict(previous.topology, nodes=dict(previous.topology['nodes']),
+                             links=dict(previous.topology['links']))
+        nodes, links = list(previous.nodes), list(previous.links)
+        node_position = previous.node_collection.position
+        for node_id in node_ids:
+            data = topology.nodes[node_id].to_dict()
+            nodes[node_position[node_id]] = data
+            connectivity = previous.topology['nodes'][node_id]['connectivity']
+            topology_dict['nodes'][node_id] = dict(data, connectivity=connectivity)
+        link_position = previous.link_collection.position
+        for link_id in link_ids:
+            data = topology.links[link_id].to_dict()
+            links[link_position[link_id]] = data
+            topology_dict['links'][link_id] = data
+
+        active_nodes = len(topology.nodes_by_state[NodeState.ACTIVE])
+        summary = dict(
+            previous.summary,
+            active_nodes=active_nodes,
+            failed_nodes=len(topology.nodes) - active_nodes,
+            up_links=len(topology.links_by_state[LinkState.UP]),
+            down_links=len(topology.links_by_state[LinkState.DOWN])
+        )
+
+        snapshot = cls(version, topology_dict, nodes, links, previous.spanning_tree, summary)
+        node_collection, link_collection = previous.node_collection, previous.link_collection
+        snapshot.node_collection = node_collection.replace(nodes, {
+            'state': {s.value: frozenset(ids) for s, ids in topology.nodes_by_state.items()},
+            'port_state': cls._patch_index(
+                node_collection.indexes['port_state'], node_ids,
+                lambda node_id: {p.state.value for p in topology.nodes[node_id].ports.values()}
+            )
+        })
+        snapshot.link_collection = link_collection.replace(links, {
+            'state': {s.value: frozenset(ids) for s, ids in topology.links_by_state.items()},
+            'port_state': cls._patch_index(
+                link_collection.indexes['port_state'], set(port_links),
+                lambda link_id: {port_links[link_id].port1.state.value, port_links[link_id].port2.state.value}
+            )
+        })
+        snapshot.generation = topology.generation
+        snapshot.reachability = previous.reachability
+        snapshot.tree_index = previous.tree_index
+        snapshot.utilization = previous.utilization
+        snapshot.captured_version = previous.captured_version
+        snapshot.source = previous.source
+        snapshot.structure = previous.structure
+        return snapshot
+
+    @staticmethod
+    def _patch_index(index: dict, changed: set, values_of) -> dict:
+        """`index` (value -> ids) with every id in `changed` moved to the values `values_of` gives it."""
+        if not changed:
+            return index
+        added = defaultdict(set)
+        for item_id in changed:
+            for value in values_of(item_id):
+                added[value].add(item_id)
+        return {value: (index.get(value, frozenset()) - changed) | added[value] for value in set(index) | set(added)}
+
+    @staticmethod
+    def _capture_collections(snapshot: 'TopologySnapshot', topology: Topology):
+        ports_by_state = {s.value: keys for s, keys in topology.ports_by_state.items()}
+
+        def port_links(keys):
+            link_ids = set()
+            for node_id, port_id in keys:
+                port = topology.nodes[node_id].ports.get(port_id) if node_id in topology.nodes else None
+                if port and port.link:
+                    link_ids.add(port.link.link_id)
+            return frozenset(link_ids)
+
+        node_collection = IndexedCollection(snapshot.nodes, 'node_id', {
+            'state': {s.value: frozenset(ids) for s, ids in topology.nodes_by_state.items()},
+            'in_tree': frozenset(topology.spanning_tree_nodes),
+            'port_state': {state: frozenset(node_id for node_id, _ in keys) for state, keys in ports_by_state.items()}
+        })
+        link_collection = IndexedCollection(snapshot.links, 'link_id', {
+            'state': {s.value: frozenset(ids) for s, ids in topology.links_by_state.items()},
+            'in_tree': frozenset(topology.spanning_tree_links),
+            'node': {node_id: frozenset(links) for node_id, links in topology.node_links.items()},
+            'port_state': {state: port_links(keys) for state, keys in ports_by_state.items()}
+        })
+        return node_collection, link_collection
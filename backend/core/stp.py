@@ -3,6 +3,7 @@ from typing import Set
 from backend.core.topology import Topology
 from backend.core.node import Node, PortState
 from backend.core.link import Link
+from backend.utils.profiling import span
 
 
 class STPCalculator:
@@ -10,11 +11,13 @@ class STPCalculator:
         self.topology = topology
 
     def calculate_spanning_tree(self) -> Set[str]:
-        self.topology.elect_root()
+        with span('elect_root'):
+            self.topology.elect_root()
         if not self.topology.root_node:
             return set()
 
-        st_links = self._prim_mst()
+        with span('prim_mst'):
+            st_links = self._prim_mst()
         return st_links
 
     def _prim_mst(self) -> Set[str]:
@@ -67,7 +70,8 @@ class STPCalculator:
 
     def update_and_apply(self):
         st_links = self.calculate_spanning_tree()
-        self.topology.update_spanning_tree(st_links)
+        with span('update_spanning_tree'):
+            self.topology.update_spanning_tree(st_links)
         return st_links
 
     def get_spanning_tree_info(self) -> dict:
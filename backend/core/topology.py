@@ -1,5 +1,7 @@
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from collections import deque
 import time
+from backend.core.bridge import BridgeQueue
 from backend.core.node import Node, NodeState, PortState
 from backend.core.link import Link, LinkState
 
@@ -11,9 +13,122 @@ class Topology:
         self.spanning_tree_links: Set[str] = set()
         self.root_node: Optional[Node] = None
         self.last_update_time = time.time()
+        self.generation = 0
+        self.last_port_change = 0.0
+        # Called with (operation, ids) by the inject_* helpers.
+        self.fault_listeners: List[Callable[[str, dict], None]] = []
+
+        # Secondary indexes kept current by state listeners on nodes, ports and
+        # links, so filtered queries never scan the full object lists.
+        self.nodes_by_state: Dict[NodeState, Set[str]] = {s: set() for s in NodeState}
+        self.links_by_state: Dict[LinkState, Set[str]] = {s: set() for s in LinkState}
+        self.ports_by_state: Dict[PortState, Set[Tuple[str, int]]] = {s: set() for s in PortState}
+        self.node_links: Dict[str, Dict[str, Link]] = {}
+        self.spanning_tree_nodes: Set[str] = set()
+        # Active bridges ordered by bridge id, so elect_root() never scans.
+        self.root_queue = BridgeQueue()
+        # Nodes, links and ports whose state changed since take_changes(), and a
+        # counter bumped whenever nodes or links are added or removed.
+        self.changed_nodes: Set[str] = set()
+        self.changed_links: Set[str] = set()
+        self.changed_ports: Set[Tuple[str, int]] = set()
+        self.structure = 0
 
     def add_node(self, node: Node):
         self.nodes[node.id] = node
+        self.node_links.setdefault(node.id, {})
+        self.nodes_by_state[node.state].add(node.id)
+        if node.state == NodeState.ACTIVE:
+            self.root_queue.set(node.id, node.bridge_id.key)
+        for port in node.ports.values():
+            self.ports_by_state[port.state].add((port.node_id, port.port_id))
+            port.state_listeners.append(self._on_port_state)
+        node.state_listeners.append(self._on_node_state)
+        node.port_listeners.append(self._on_port_state)
+        self.structure += 1
+        self.generation += 1
+
+    def listeners(self) -> Tuple[Callable, Callable, Callable]:
+        """(node, port, link) state listeners, for objects restored outside add_node/add_link."""
+        return self._on_node_state, self._on_port_state, self._on_link_state
+
+    def adopt(self, nodes: List[Node], links: List[Link], spanning_tree_links: Set[str], root_node: Optional[Node],
+              indexes: Optional[dict] = None):
+        """Install restored objects in bulk, already wired to listeners(), and
+        rebuild the indexes once instead of updating them per object. A caller
+        that already holds them can pass `indexes` (attribute name -> value)."""
+        self.nodes = {n.id: n for n in nodes}
+        self.links = {l.link_id: l for l in links}
+        self.spanning_tree_links = set(spanning_tree_links)
+        self.root_node = root_node
+        if indexes is None:
+            self.rebuild_indexes()
+            return
+        for name in ('nodes_by_state', 'links_by_state', 'ports_by_state', 'node_links', 'spanning_tree_nodes',
+                     'root_queue'):
+            setattr(self, name, indexes[name])
+        self.structure += 1
+        self.generation += 1
+
+    def rebuild_indexes(self):
+        nodes = self.nodes.values()
+        self.nodes_by_state = {s: {n.id for n in nodes if n.state is s} for s in NodeState}
+        self.root_queue = BridgeQueue((n.bridge_id.key, n.id) for n in nodes if n.state is NodeState.ACTIVE)
+        self.links_by_state = {s: {l.link_id for l in self.links.values() if l.state is s} for s in LinkState}
+        self.ports_by_state = {s: set() for s in PortState}
+        for node in nodes:
+            for port in node.ports.values():
+                self.ports_by_state[port.state].add((port.node_id, port.port_id))
+        self.node_links = {node_id: {} for node_id in self.nodes}
+        node_links = self.node_links
+        for link_id, link in self.links.items():
+            node_links.setdefault(link.port1.node_id, {})[link_id] = link
+            node_links.setdefault(link.port2.node_id, {})[link_id] = link
+        self._index_spanning_tree()
+        self.structure += 1
+        self.generation += 1
+
+    def take_changes(self) -> Tuple[Set[str], Set[str], Set[Tuple[str, int]]]:
+        """(nodes, links, ports) changed since the last call, clearing them."""
+        changes = self.changed_nodes, self.changed_links, self.changed_ports
+        self.changed_nodes, self.changed_links, self.changed_ports = set(), set(), set()
+        return changes
+
+    def _on_node_state(self, node: Node, old_state: NodeState):
+        self.nodes_by_state[old_state].discard(node.id)
+        self.nodes_by_state[node.state].add(node.id)
+        self.changed_nodes.add(node.id)
+        if node.state == NodeState.ACTIVE:
+            self.root_queue.set(node.id, node.bridge_id.key)
+        else:
+            self.root_queue.discard(node.id)
+        self.generation += 1
+
+    def _on_port_state(self, port, old_state: Optional[PortState]):
+        self.last_port_change = time.monotonic()
+        key = (port.node_id, port.port_id)
+        if old_state is not None:
+            self.ports_by_state[old_state].discard(key)
+        self.ports_by_state[port.state].add(key)
+        self.changed_ports.add(key)
+
+    def _on_link_state(self, link: Link, old_state: LinkState):
+        self.links_by_state[old_state].discard(link.link_id)
+        self.links_by_state[link.state].add(link.link_id)
+        self.changed_links.add(link.link_id)
+        self.generation += 1
+
+    def _index_link(self, link: Link):
+        self.links_by_state[link.state].add(link.link_id)
+        for node_id in link.get_connected_nodes():
+            self.node_links.setdefault(node_id, {})[link.link_id] = link
+
+    def _index_spanning_tree(self):
+        self.spanning_tree_nodes = set()
+        for link_id in self.spanning_tree_links:
+            link = self.links.get(link_id)
+            if link:
+                self.spanning_tree_nodes.update(link.get_connected_nodes())
 
     def get_node(self, node_id: str) -> Optional[Node]:
         return self.nodes.get(node_id)
@@ -26,10 +141,21 @@ class Topology:
 
     def add_link(self, link: Link):
         self.links[link.link_id] = link
+        self._index_link(link)
+        link.state_listeners.append(self._on_link_state)
+        self.structure += 1
+        self.generation += 1
 
     def remove_link(self, link: Link):
         if link.link_id in self.links:
             del self.links[link.link_id]
+            self.links_by_state[link.state].discard(link.link_id)
+            for node_id in link.get_connected_nodes():
+                self.node_links.get(node_id, {}).pop(link.link_id, None)
+            if self._on_link_state in link.state_listeners:
+                link.state_listeners.remove(self._on_link_state)
+            self.structure += 1
+            self.generation += 1
 
     def get_link(self, link_id: str) -> Optional[Link]:
         return self.links.get(link_id)
@@ -48,52 +174,49 @@ class Topology:
 
     def get_neighbors(self, node: Node) -> List[Tuple[Node, Link]]:
         neighbors = []
-        for link in self.links.values():
+        for link in self.node_links.get(node.id, {}).values():
             if not link.is_up():
                 continue
             n1_id, n2_id = link.get_connected_nodes()
-            if node.id == n1_id:
-                neighbor = self.nodes.get(n2_id)
-                if neighbor and neighbor.state == NodeState.ACTIVE:
-                    neighbors.append((neighbor, link))
-            elif node.id == n2_id:
-                neighbor = self.nodes.get(n1_id)
-                if neighbor and neighbor.state == NodeState.ACTIVE:
-                    neighbors.append((neighbor, link))
+            neighbor = self.nodes.get(n2_id if node.id == n1_id else n1_id)
+            if neighbor and neighbor.state == NodeState.ACTIVE:
+                neighbors.append((neighbor, link))
         return neighbors
 
     def get_node_links(self, node: Node) -> List[Link]:
-        node_links = []
-        for link in self.links.values():
-            n1_id, n2_id = link.get_connected_nodes()
-            if node.id in (n1_id, n2_id):
-                node_links.append(link)
-        return node_links
+        return list(self.node_links.get(node.id, {}).values())
 
-    def elect_root(self):
-        active_nodes = self.get_active_nodes()
-        if not active_nodes:
-            self.root_node = None
-            return
+    def root_candidate(self, exclude: Set[str] = frozenset()) -> Optional[Node]:
+        """The active node with the lowest bridge id, ignoring the ids in `exclude`."""
+        node_id = self.root_queue.smallest(exclude)
+        return self.nodes[node_id] if node_id is not None else None
 
-        def get_priority(node: Node) -> int:
-            try:
-                return int(node.id.split('_')[1])
-            except (IndexError, ValueError):
-                return 0
+    def set_bridge_priority(self, node: Node, priority: int):
+        node.bridge_id = node.bridge_id.with_priority(priority)
+        if node.id in self.root_queue:
+            self.root_queue.set(node.id, node.bridge_id.key)
+        self.changed_nodes.add(node.id)
+        self.generation += 1
 
-        self.root_node = min(active_nodes, key=get_priority)
-        self.root_node.is_root = True
-        self.root_node.root_id = self.root_node.id
-        self.root_node.root_path_cost = 0
+    def elect_root(self):
+        """Only the outgoing and incoming root are touched; the candidate comes from root_queue."""
+        old_root = self.root_node
+        new_root = self.root_candidate()
+        if old_root is not None and old_root is not new_root:
+            old_root.is_root = False
+        self.root_node = new_root
+        if new_root is None:
+            return
 
-        for node in active_nodes:
-            if node != self.root_node:
-                node.is_root = False
+        new_root.is_root = True
+        new_root.root_id = new_root.id
+        new_root.root_path_cost = 0
 
     def update_spanning_tree(self, st_links: Set[str]):
         self.spanning_tree_links = st_links
         self.last_update_time = time.time()
+        self._index_spanning_tree()
+        self.generation += 1
 
         for node in self.nodes.values():
             for port in node.ports.values():
@@ -115,6 +238,7 @@ class Topology:
             ids = link.get_connected_nodes()
             if (n1.id in ids and n2.id in ids):
                 link.set_state(LinkState.DOWN)
+                self._notify_fault('link_down', {'link_id': link.link_id})
                 return True
         return False
 
@@ -128,6 +252,7 @@ class Topology:
             ids = link.get_connected_nodes()
             if (n1.id in ids and n2.id in ids):
                 link.set_state(LinkState.UP)
+                self._notify_fault('link_up', {'link_id': link.link_id})
                 return True
         return False
 
@@ -135,6 +260,7 @@ class Topology:
         node = self.get_node_by_name(node_name)
         if node:
             node.set_failed()
+            self._notify_fault('fail_node', {'node_id': node.id})
             return True
         return False
 
@@ -142,9 +268,14 @@ class Topology:
         node = self.get_node_by_name(node_name)
         if node:
             node.set_active()
+            self._notify_fault('recover_node', {'node_id': node.id})
             return True
         return False
 
+    def _notify_fault(self, operation: str, ids: dict):
+        for listener in self.fault_listeners:
+            listener(operation, ids)
+
     def check_connectivity_to_root(self, node: Node) -> dict:
         """
         Check if a node can reach the root node.
@@ -160,10 +291,10 @@ class Topology:
             return {'reachable': False, 'path': [], 'blocked_by': 'node_failed'}
         
         visited = set()
-        queue = [(node.id, [])]
+        queue = deque([(node.id, [])])
         
         while queue:
-            current_id, path = queue.pop(0)
+            current_id, path = queue.popleft()
             
             if current_id in visited:
                 continue
@@ -176,7 +307,7 @@ class Topology:
             if not current_node or current_node.state == NodeState.FAILED:
                 continue
             
-            for link in self.links.values():
+            for link in self.node_links.get(current_id, {}).values():
                 n1_id, n2_id = link.get_connected_nodes()
                 
                 neighbor_id = None
@@ -205,15 +336,52 @@ class Topology:
     def get_all_connectivity(self) -> dict:
         """
         Get connectivity status for all nodes to the root.
+
+        One BFS outward from the root over UP links and ACTIVE nodes gives every
+        node a shortest path, instead of one search per node.
         """
+        root = self.root_node
+        if not root:
+            return {node_id: {'reachable': False, 'path': [], 'blocked_by': 'no_root'} for node_id in self.nodes}
+
+        paths = {}
+        if root.state == NodeState.ACTIVE:
+            paths[root.id] = []
+            queue = deque([root.id])
+            while queue:
+                current_id = queue.popleft()
+                for link in self.node_links.get(current_id, {}).values():
+                    if not link.is_up():
+                        continue
+                    n1_id, n2_id = link.get_connected_nodes()
+                    neighbor_id = n2_id if n1_id == current_id else n1_id
+                    if neighbor_id in paths:
+                        continue
+                    neighbor_node = self.nodes.get(neighbor_id)
+                    if neighbor_node and neighbor_node.state == NodeState.ACTIVE:
+                        paths[neighbor_id] = [{
+                            'link_id': link.link_id,
+                            'link_state': link.state.value,
+                            'from_node': neighbor_id,
+                            'to_node': current_id
+                        }] + paths[current_id]
+                        queue.append(neighbor_id)
+
         connectivity = {}
         for node_id, node in self.nodes.items():
-            if node.id != (self.root_node.id if self.root_node else None):
-                connectivity[node_id] = self.check_connectivity_to_root(node)
+            if node_id == root.id:
+                continue
+            if node.state == NodeState.FAILED:
+                connectivity[node_id] = {'reachable': False, 'path': [], 'blocked_by': 'node_failed'}
+            elif node_id in paths:
+                connectivity[node_id] = {'reachable': True, 'path': paths[node_id], 'blocked_by': None}
+            else:
+                connectivity[node_id] = {'reachable': False, 'path': [], 'blocked_by': 'no_path'}
         return connectivity
     
-    def to_dict(self) -> dict:
-        connectivity = self.get_all_connectivity()
+    def to_dict(self, connectivity: Optional[dict] = None) -> dict:
+        if connectivity is None:
+            connectivity = self.get_all_connectivity()
         
         nodes_dict = {}
         for n in self.nodes.values():
@@ -0,0 +1,210 @@
+"""
+Array view of the forwarding forest: the active nodes joined by UP links
+whose ports are both FORWARDING, rooted at the STP root (other partitions at
+their first node). Built once per topology generation and shared by the
+data-plane and path queries.
+
+Lowest common ancestors come from an Euler tour with a sparse table of
+depth minima, so any batch of node pairs is answered with a constant number
+of NumPy operations, and a single pair in O(1). Path queries then only walk
+the path itself.
+"""
+import weakref
+from collections import deque
+from typing import Dict, List, Optional
+import numpy as np
+from backend.core.node import NodeState, PortState
+from backend.core.topology import Topology
+
+
+_cache: 'weakref.WeakKeyDictionary[Topology, TreeIndex]' = weakref.WeakKeyDictionary()
+
+
+class TreeIndex:
+    def __init__(self, topology: Topology):
+        self.topology = topology
+        self.generation = topology.generation
+        self.ids: List[str] = list(topology.nodes)
+        self.index: Dict[str, int] = {node_id: i for i, node_id in enumerate(self.ids)}
+        n = len(self.ids)
+
+        active = np.zeros(n, dtype=bool)
+        for i, node in enumerate(topology.nodes.values()):
+            active[i] = node.state == NodeState.ACTIVE
+        self.active = active
+
+        adjacency: List[List] = [[] for _ in range(n)]
+        forwarding = PortState.FORWARDING
+        for link in topology.links.values():
+            if not link.is_up() or link.port1.state != forwarding or link.port2.state != forwarding:
+                continue
+            a, b = self.index.get(link.port1.node_id), self.index.get(link.port2.node_id)
+            if a is None or b is None or not (active[a] and active[b]):
+                continue
+            adjacency[a].append((b, link))
+            adjacency[b].append((a, link))
+
+        parent = np.full(n, -1, dtype=np.int64)
+        depth = np.zeros(n, dtype=np.int64)
+        dist = np.zeros(n, dtype=np.float64)
+        bandwidth = np.zeros(n, dtype=np.float64)
+        cost = np.zeros(n, dtype=np.float64)
+        component = np.full(n, -1, dtype=np.int64)
+        parent_link: List = [None] * n
+        children: List[List[int]] = [[] for _ in range(n)]
+        order: List[int] = []
+
+        root = topology.root_node
+        starts = [self.index[root.id]] if root is not None and root.id in self.index else []
+        starts.extend(range(n))
+        label = 0
+        for start in starts:
+            if component[start] >= 0:
+                continue
+            component[start] = label
+            queue = deque([start])
+            while queue:
+                u = queue.popleft()
+                order.append(u)
+                for v, link in adjacency[u]:
+                    if component[v] < 0:
+                        component[v] = label
+                        parent[v] = u
+                        parent_link[v] = link
+                        depth[v] = depth[u] + 1
+                        dist[v] = dist[u] + link.latency
+                        bandwidth[v] = link.bandwidth
+                        cost[v] = cost[u] + link.get_cost()
+                        children[u].append(v)
+                        queue.append(v)
+            label += 1
+
+        self.parent = parent
+        self.parent_link = parent_link
+        self.depth = depth
+        self.dist = dist
+        # Bandwidth of the link to the parent; 0 for component roots.
+        self.bandwidth = bandwidth
+        # STP path cost from the component root.
+        self.cost = cost
+        self.component = component
+        self.components = label
+        self.order = np.array(order, dtype=np.int64)
+        self.children = children
+        self._levels = None
+        self._build_lca([u for u in dict.fromkeys(starts) if parent[u] < 0])
+
+    @classmethod
+    def of(cls, topology: Topology) -> 'TreeIndex':
+        """The index for the topology's current generation, built on first use."""
+        index = _cache.get(topology)
+        if index is None or index.generation != topology.generation:
+            index = _cache[topology] = cls(topology)
+        return index
+
+    def _build_lca(self, roots):
+        n = len(self.ids)
+        euler: List[int] = []
+        first = np.zeros(n, dtype=np.int64)
+        children = self.children
+        for start in roots:
+            first[start] = len(euler)
+            euler.append(start)
+            stack = [(start, iter(children[start]))]
+            while stack:
+                u, it = stack[-1]
+                v = next(it, None)
+                if v is None:
+                    stack.pop()
+                    if stack:
+                        euler.append(stack[-1][0])
+                    continue
+                first[v] = len(euler)
+                euler.append(v)
+                stack.append((v, iter(children[v])))
+
+        tour = np.array(euler, dtype=np.int64)
+        self.first = first
+        self.euler = tour
+        # table[k][i] is the shallowest node of tour[i:i + 2**k].
+        table = [tour]
+        span = 1
+        while 2 * span <= len(tour):
+            prev = table[-1]
+            left, right = prev[:-span], prev[span:]
+            table.append(np.where(self.depth[left] <= self.depth[right], left, right))
+            span *= 2
+        self._table = table
+
+    def lca(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Lowest common ancestors of the pairs (a[i], b[i]); only meaningful where connected()."""
+        a = np.asarray(a, dtype=np.int64)
+        b = np.asarray(b, dtype=np.int64)
+        if not a.size:
+            return a
+        lo = np.minimum(self.first[a], self.first[b])
+        hi = np.maximum(self.first[a], self.first[b]) + 1
+        k = np.floor(np.log2(hi - lo)).astype(np.int64)
+        result = np.empty(a.shape, dtype=np.int64)
+        for level in np.unique(k):
+            mask = k == level
+            row = self._table[level]
+            left = row[lo[mask]]
+            right = row[hi[mask] - (1 << int(level))]
+            result[mask] = np.where(self.depth[left] <= self.depth[right], left, right)
+        return result
+
+    def lca_one(self, a: int, b: int) -> int:
+        lo, hi = sorted((int(self.first[a]), int(self.first[b])))
+        hi += 1
+        level = (hi - lo).bit_length() - 1
+        row = self._table[level]
+        left, right = int(row[lo]), int(row[hi - (1 << level)])
+        return left if self.depth[left] <= self.depth[right] else right
+
+    def path(self, a: int, b: int) -> Optional[dict]:
+        """The forwarding path from node index a to b, or None if they are not connected."""
+        if not (self.active[a] and self.active[b] and self.component[a] == self.component[b]):
+            return None
+        lca = self.lca_one(a, b)
+        up, down = [], []
+        parent, parent_link = self.parent, self.parent_link
+        for node, steps in ((a, up), (b, down)):
+            while node != lca:
+                steps.append((node, parent_link[node]))
+                node = int(parent[node])
+        ids = self.ids
+        nodes = [ids[node] for node, _ in up] + [ids[lca]] + [ids[node] for node, _ in reversed(down)]
+        links = [link.link_id for _, link in up] + [link.link_id for _, link in reversed(down)]
+        return {
+            'nodes': nodes,
+            'links': links,
+            'hops': len(links),
+            'cost': round(float(self.cost[a] + self.cost[b] - 2 * self.cost[lca]), 6),
+            'latency': round(float(self.dist[a] + self.dist[b] - 2 * self.dist[lca]), 6),
+            'turning_node': ids[lca]
+        }
+
+    def subtree_sums(self, values: np.ndarray) -> np.ndarray:
+        """values[v] summed over the subtree of every node v, one tree level at a time."""
+        if self._levels is None:
+            children = np.nonzero(self.parent >= 0)[0]
+            by_depth = children[np.argsort(self.depth[children], kind='stable')]
+            bounds = np.searchsorted(self.depth[by_depth], np.arange(1, int(self.depth.max(initial=0)) + 2))
+            self._levels = [by_depth[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+        sums = np.array(values, dtype=np.float64)
+        parent = self.parent
+        for level in reversed(self._levels):
+            np.add.at(sums, parent[level], sums[level])
+        return sums
+
+    def connected(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return self.active[a] & self.active[b] & (self.component[a] == self.component[b])
+
+    def hops(self, a: np.ndarray, b: np.ndarray, lca: Optional[np.ndarray] = None) -> np.ndarray:
+        lca = self.lca(a, b) if lca is None else lca
+        return self.depth[a] + self.depth[b] - 2 * self.depth[lca]
+
+    def latency(self, a: np.ndarray, b: np.ndarray, lca: Optional[np.ndarray] = None) -> np.ndarray:
+        lca = self.lca(a, b) if lca is None else lca
+        return self.dist[a] + self.dist[b] - 2 * self.dist[lca]
@@ -0,0 +1,165 @@
+"""
+Link utilization for a node-to-node traffic matrix routed over the
+forwarding tree.
+
+Every demand follows the unique tree path between its endpoints. Instead of
+walking each path, a demand from a to b adds its rate at a (upward) and b
+(downward) and subtracts it at their lowest common ancestor; summing these
+marks over every subtree gives the load on each node's link to its parent in
+both directions at once. Links are full duplex, so utilization is the busier
+direction's load over the link bandwidth.
+"""
+import time
+from typing import List, Optional
+import numpy as np
+from backend.core.topology import Topology
+from backend.core.treeindex import TreeIndex
+
+
+DEFAULT_THRESHOLD = 1.0
+MAX_DEMANDS = 1_000_000
+# Loaded links without bandwidth report a utilization of None and count as oversubscribed.
+INF = float('inf')
+
+
+class TrafficMatrix:
+    """Demands as parallel lists of source ids, destination ids and rates (Mbps)."""
+
+    def __init__(self, sources: List[str], destinations: List[str], rates: List[float]):
+        self.sources = sources
+        self.destinations = destinations
+        self.rates = np.asarray(rates, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    @classmethod
+    def from_payload(cls, payload) -> 'TrafficMatrix':
+        """
+        Accepts `{"demands": [{"src": id, "dst": id, "rate": mbps}, ...]}` or
+        `{"matrix": {src: {dst: mbps}}}`.
+        """
+        if not isinstance(payload, dict):
+            raise ValueError('body must be an object')
+        sources, destinations, rates = [], [], []
+        if 'matrix' in payload:
+            matrix = payload['matrix']
+            if not isinstance(matrix, dict) or not all(isinstance(row, dict) for row in matrix.values()):
+                raise ValueError('matrix must map source ids to {destination id: rate}')
+            for src, row in matrix.items():
+                for dst, rate in row.items():
+                    sources.append(src)
+                    destinations.append(dst)
+                    rates.append(rate)
+        else:
+            demands = payload.get('demands')
+            if not isinstance(demands, list):
+                raise ValueError('demands must be a list')
+            for i, demand in enumerate(demands):
+                if not isinstance(demand, dict):
+                    raise ValueError(f'demand {i} must be an object')
+                sources.append(demand.get('src'))
+                destinations.append(demand.get('dst'))
+                rates.append(demand.get('rate'))
+
+        if not sources:
+            raise ValueError('at least one demand is required')
+        if len(sources) > MAX_DEMANDS:
+            raise ValueError(f'at most {MAX_DEMANDS} demands are supported')
+        for i, (src, dst, rate) in enumerate(zip(sources, destinations, rates)):
+            if not isinstance(src, str) or not isinstance(dst, str):
+                raise ValueError(f'demand {i} needs string src and dst node ids')
+            if isinstance(rate, bool) or not isinstance(rate, (int, float)) or not rate >= 0:
+                raise ValueError(f'demand {i} needs a non-negative rate')
+        return cls(sources, destinations, rates)
+
+    def unknown_nodes(self, topology: Topology) -> List[str]:
+        nodes = topology.nodes
+        return sorted({n for n in self.sources + self.destinations if n not in nodes})
+
+
+class UtilizationAnalysis:
+    def __init__(self, topology: Topology, matrix: TrafficMatrix, threshold: float = DEFAULT_THRESHOLD):
+        self.topology = topology
+        self.matrix = matrix
+        self.threshold = threshold
+
+    def run(self) -> dict:
+        started = time.perf_counter()
+        index = TreeIndex.of(self.topology)
+        n = len(index.ids)
+        lookup = index.index
+        a = np.fromiter((lookup.get(s, -1) for s in self.matrix.sources), dtype=np.int64, count=len(self.matrix))
+        b = np.fromiter((lookup.get(d, -1) for d in self.matrix.destinations), dtype=np.int64, count=len(self.matrix))
+        rates = self.matrix.rates
+
+        known = (a >= 0) & (b >= 0)
+        routed = known.copy()
+        routed[known] = index.connected(a[known], b[known])
+        a, b, rates_routed = a[routed], b[routed], rates[routed]
+        lca = index.lca(a, b)
+
+        # Rate leaving each subtree towards the root, and entering it from the root.
+        up = np.bincount(a, rates_routed, n) - np.bincount(lca, rates_routed, n)
+        down = np.bincount(b, rates_routed, n) - np.bincount(lca, rates_routed, n)
+        up = index.subtree_sums(up)
+        down = index.subtree_sums(down)
+
+        children = np.nonzero(index.parent >= 0)[0]
+        bandwidth = index.bandwidth[children]
+        peak = np.maximum(up[children], down[children])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            utilization = np.where(bandwidth > 0, peak / bandwidth, np.where(peak > 0, np.inf, 0.0))
+
+        order = np.argsort(-utilization, kind='stable')
+        order = order[peak[order] > 0]
+        nodes = children[order]
+        parent_link = index.parent_link
+        utilization = utilization[order]
+        links = [
+            {
+                'link_id': parent_link[v].link_id,
+                'load_to_root': load_up,
+                'load_from_root': load_down,
+                'bandwidth': bw,
+                'utilization': u if u != INF else None,
+                'oversubscribed': over
+            }
+            for v, load_up, load_down, bw, u, over in zip(
+                nodes.tolist(),
+                np.round(up[nodes], 6).tolist(),
+                np.round(down[nodes], 6).tolist(),
+                bandwidth[order].tolist(),
+                np.round(utilization, 6).tolist(),
+                (utilization > self.threshold).tolist()
+            )
+        ]
+
+        return {
+            'generation': index.generation,
+            'threshold': self.threshold,
+            'demands': {
+                'total': len(self.matrix),
+                'routed': int(routed.sum()),
+                'unroutable': int((~routed).sum()),
+                'offered_rate': round(float(rates.sum()), 6),
+                'routed_rate': round(float(rates_routed.sum()), 6)
+            },
+            'max_utilization': links[0]['utilization'] if links else 0.0,
+            'oversubscribed': [l['link_id'] for l in links if l['oversubscribed']],
+            'links': links,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
+
+
+def link_view(result: Optional[dict]) -> Optional[dict]:
+    """The per-link part of a result, as embedded in the topology view."""
+    if result is None:
+        return None
+    return {
+        'generation': result['generation'],
+        'threshold': result['threshold'],
+        'max_utilization': result['max_utilization'],
+        'oversubscribed': result['oversubscribed'],
+        'links': {l['link_id']: l['utilization'] for l in result['links']}
+    }
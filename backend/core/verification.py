@@ -0,0 +1,52 @@
+"""
+Forwarding-loop verification of the tree a recompute published.
+
+The snapshot's reachability labels come from a union-find over the links
+whose ports are both FORWARDING; a link whose ends were already joined when
+it was reached closes a cycle, i.e. a broadcast loop. Every node the
+snapshot's connectivity check reaches from the root over UP links must also
+share the root's forwarding component, otherwise it is orphaned: physically
+reachable but cut off by the tree. Both come from data the snapshot already
+holds, so verification is one more pass over the nodes.
+
+Only the root's partition has a tree in this simulator, so nodes in other
+partitions are not reported.
+"""
+import time
+import numpy as np
+from backend.core.snapshot import TopologySnapshot
+
+
+LIST_LIMIT = 100
+
+
+class ForwardingVerification:
+    def __init__(self, snapshot: TopologySnapshot):
+        self.snapshot = snapshot
+
+    def run(self) -> dict:
+        started = time.perf_counter()
+        snapshot = self.snapshot
+        labels = snapshot.reachability
+        cycle_links = labels.cycle_links
+
+        orphaned = []
+        root = snapshot.topology['root_node']
+        root_label = labels.labels[labels.ids.index(root)] if root is not None else -1
+        if root_label >= 0:
+            ids = labels.ids
+            nodes = snapshot.topology['nodes']
+            reachable = np.fromiter(
+                (nodes[node_id]['connectivity']['reachable'] for node_id in ids), dtype=bool, count=len(ids)
+            )
+            orphaned = [ids[i] for i in np.nonzero(reachable & (labels.labels != root_label))[0].tolist()]
+
+        return {
+            'generation': labels.generation,
+            'ok': not cycle_links and not orphaned,
+            'cycle_count': len(cycle_links),
+            'cycle_links': cycle_links[:LIST_LIMIT],
+            'orphaned_count': len(orphaned),
+            'orphaned_nodes': orphaned[:LIST_LIMIT],
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
@@ -1,5 +1,6 @@
 import sys
 import os
+import argparse
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from backend.api.app import NetworkAPI
@@ -7,11 +8,32 @@ from backend.utils.logger import get_logger
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Network simulator backend')
+    parser.add_argument('--port', type=int, default=5002)
+    parser.add_argument('--production', action='store_true',
+                        help='serve with a threaded WSGI server instead of the Flask development server')
+    parser.add_argument('--threads', type=int, default=8, help='worker threads in production mode')
+    parser.add_argument('--snapshot', help='start from a binary topology snapshot instead of the 4-node mesh')
+    parser.add_argument('--journal', help='append every topology mutation to this journal file')
+    parser.add_argument('--max-sessions', type=int, default=16, help='simulation sessions kept in memory')
+    parser.add_argument('--session-memory-mb', type=int, help='evict idle sessions above this estimated total')
+    parser.add_argument('--no-profiling', action='store_true', help='do not record per-phase recompute timings')
+    parser.add_argument('--convergence-settle', type=float, default=1.0,
+                        help='seconds without port changes before the tree counts as converged')
+    args = parser.parse_args()
+
     logger = get_logger(log_dir='logs')
     logger.startup('BackendServer')
 
-    api = NetworkAPI()
-    print("Backend API: http://localhost:5002")
+    api = NetworkAPI(
+        initial_snapshot=args.snapshot,
+        journal_path=args.journal,
+        max_sessions=args.max_sessions,
+        session_memory_limit=args.session_memory_mb * 1024 * 1024 if args.session_memory_mb else None,
+        profiling=not args.no_profiling,
+        convergence_settle=args.convergence_settle
+    )
+    print(f"Backend API: http://localhost:{args.port}")
     print(f"Log file: {logger.get_log_file_path()}")
 
-    api.run(host='0.0.0.0', port=5002, debug=False)
+    api.run(host='0.0.0.0', port=args.port, debug=False, production=args.production, threads=args.threads)
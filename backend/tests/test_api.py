@@ -1,9 +1,14 @@
 import pytest
 import sys
 import os
+import threading
+import time
+import gzip
+import json
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from backend.api.app import NetworkAPI
+from backend.core.link import LinkState
 
 
 class TestAPI:
@@ -76,6 +81,30 @@ class TestAPI:
             data = response.get_json()
             assert data['status'] == 'success'
 
+    def test_recompute_after_consecutive_failures(self, api, client):
+        links = client.get('/api/topology/links').get_json()['links']
+        for link in links[:2]:
+            response = client.post(f"/api/links/{link['link_id']}/down")
+            assert response.get_json()['spanning_tree_state'] in ('pending', 'current')
+        assert api.recompute_scheduler.wait_idle(timeout=2.0)
+        data = client.get('/api/topology').get_json()
+        assert data['spanning_tree_state'] == 'current'
+        assert links[0]['link_id'] not in data['spanning_tree']
+        assert links[1]['link_id'] not in data['spanning_tree']
+        assert len(data['spanning_tree']) == 3
+
+    def test_mutations_patch_the_snapshot_until_recompute(self):
+        api = NetworkAPI(recompute_quiet_period=0.3, recompute_max_delay=1.0)
+        client = api.app.test_client()
+        captured = api.snapshot.version
+        link_id = client.get('/api/topology/links').get_json()['links'][0]['link_id']
+        client.post(f'/api/links/{link_id}/down')
+        assert api.snapshot.captured_version == captured < api.snapshot.version
+        down = client.get('/api/topology/links?state=DOWN').get_json()['links']
+        assert [link['link_id'] for link in down] == [link_id]
+        assert api.recompute_scheduler.wait_idle(timeout=5)
+        assert api.snapshot.captured_version == api.snapshot.version
+
     def test_toggle_link(self, client):
         response = client.get('/api/topology/links')
         links = response.get_json()['links']
@@ -132,6 +161,524 @@ class TestAPI:
         assert 'scenarios' in data
         assert isinstance(data['scenarios'], list)
 
+    def test_batch(self, client):
+        links = client.get('/api/topology/links').get_json()['links']
+        nodes = client.get('/api/topology/nodes').get_json()['nodes']
+        response = client.post('/api/batch', json={'operations': [
+            {'op': 'link_down', 'link_id': links[0]['link_id']},
+            {'op': 'fail_node', 'node_id': nodes[3]['node_id']}
+        ]})
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['status'] == 'success'
+        assert data['applied'] == 2
+        assert {'id': nodes[3]['node_id'], 'old': 'ACTIVE', 'new': 'FAILED'} in data['deltas']['nodes']
+        assert data['deltas']['links'][0]['new'] == 'DOWN'
+
+    def test_batch_is_atomic(self, client):
+        links = client.get('/api/topology/links').get_json()['links']
+        response = client.post('/api/batch', json={'operations': [
+            {'op': 'link_down', 'link_id': links[0]['link_id']},
+            {'op': 'fail_node', 'node_id': 'missing'}
+        ]})
+        assert response.status_code == 400
+        assert response.get_json()['index'] == 1
+        links = client.get('/api/topology/links').get_json()['links']
+        assert all(l['state'] == 'UP' for l in links)
+
+    def test_readers_see_published_snapshot(self, api, client):
+        version = api.snapshot.version
+        api.topology.get_all_links()[0].set_state(LinkState.DOWN)
+        links = client.get('/api/topology/links').get_json()['links']
+        assert all(l['state'] == 'UP' for l in links)
+
+        link_id = links[1]['link_id']
+        client.post(f'/api/links/{link_id}/down')
+        assert api.snapshot.version > version
+        links = client.get('/api/topology/links').get_json()['links']
+        assert [l['state'] for l in links if l['link_id'] == link_id] == ['DOWN']
+
+    def test_concurrent_reads_never_see_torn_tree(self, api):
+        errors = []
+        stop = threading.Event()
+
+        def reader():
+            client = api.app.test_client()
+            while not stop.is_set():
+                data = client.get('/api/topology').get_json()
+                active = sum(1 for n in data['nodes'].values() if n['state'] == 'ACTIVE')
+                if data['spanning_tree'] and len(data['spanning_tree']) != active - 1:
+                    errors.append(data['spanning_tree'])
+
+        threads = [threading.Thread(target=reader) for _ in range(4)]
+        for t in threads:
+            t.start()
+        client = api.app.test_client()
+        node_id = client.get('/api/topology/nodes').get_json()['nodes'][3]['node_id']
+        for _ in range(10):
+            client.post('/api/batch', json={'operations': [{'op': 'fail_node', 'node_id': node_id}]})
+            client.post('/api/batch', json={'operations': [{'op': 'recover_node', 'node_id': node_id}]})
+        stop.set()
+        for t in threads:
+            t.join()
+        assert errors == []
+
+    def test_compact_format(self, client):
+        data = client.get('/api/topology/links?format=compact').get_json()
+        assert data['format'] == 'compact'
+        assert data['columns']['links'][0] == 'link_id'
+        assert len(data['links']) == 6
+
+        data = client.get('/api/topology?format=compact').get_json()
+        assert len(data['nodes']) == 4
+        assert set(data['connectivity']) == {n[0] for n in data['nodes']}
+
+    def test_large_response_is_compressed(self, client):
+        response = client.get('/api/topology', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        data = json.loads(gzip.decompress(response.data))
+        assert len(data['nodes']) == 4
+
+    def test_list_filters(self, client):
+        nodes = client.get('/api/topology/nodes').get_json()['nodes']
+        client.post('/api/batch', json={'operations': [{'op': 'fail_node', 'node_id': nodes[2]['node_id']}]})
+
+        data = client.get('/api/topology/nodes?state=FAILED&fields=node_id,state').get_json()
+        assert data['nodes'] == [{'node_id': nodes[2]['node_id'], 'state': 'FAILED'}]
+        assert data['total'] == 1
+
+        data = client.get('/api/topology/links?in_tree=true').get_json()
+        assert data['total'] == 2
+        data = client.get('/api/topology/links?port_state=BLOCKING&state=UP').get_json()
+        assert all(l['state'] == 'UP' for l in data['links'])
+        assert data['total'] == 4
+        data = client.get(f"/api/topology/links?node={nodes[0]['node_id']}").get_json()
+        assert data['total'] == 3
+
+    def test_list_pagination(self, client):
+        seen = []
+        cursor = None
+        while True:
+            url = '/api/topology/links?limit=4' + (f'&cursor={cursor}' if cursor else '')
+            data = client.get(url).get_json()
+            seen.extend(l['link_id'] for l in data['links'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        assert len(seen) == 6
+        assert len(set(seen)) == 6
+
+    def test_list_invalid_query(self, client):
+        assert client.get('/api/topology/nodes?state=BROKEN').status_code == 400
+        assert client.get('/api/topology/nodes?color=red').status_code == 400
+        assert client.get('/api/topology/nodes?fields=color').status_code == 400
+        for cursor in ('-1', '01', '+1', '%201', 'x'):
+            response = client.get(f'/api/topology/nodes?cursor={cursor}')
+            assert response.status_code == 400 and 'Invalid cursor' in response.get_json()['message']
+        assert client.get('/api/topology/nodes?cursor=1').status_code == 200
+
+    def test_metrics(self, client):
+        client.get('/api/topology')
+        client.post('/api/batch', json={'operations': [{'op': 'fail_node', 'node_id': 'missing'}]})
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+        text = response.get_data(as_text=True)
+        assert 'tinyrstp_http_request_duration_seconds_count{endpoint="/api/topology",method="GET"} 1' in text
+        assert 'tinyrstp_http_request_duration_seconds_bucket{endpoint="/api/batch",method="POST",le="+Inf"} 1' in text
+        assert 'tinyrstp_stp_recomputes_total' in text
+        assert 'tinyrstp_topology_objects{kind="total_nodes"} 4' in text
+        assert 'tinyrstp_bpdu_sent_total 0' in text
+
+    def test_debug_logs_filters(self, api, client):
+        api.logger.warning('tail-marker')
+        api.logger.flush()
+        data = client.get('/api/debug/logs?lines=5&level=WARNING&q=tail-marker').get_json()
+        assert any(l.endswith('tail-marker') for log in data['logs'] for l in log['lines'])
+        assert client.get('/api/debug/logs?level=LOUD').status_code == 400
+        assert client.get('/api/debug/logs?lines=-3').status_code == 400
+        assert client.get('/api/debug/logs?follow=1&timeout=abc').status_code == 400
+
+    def test_events(self, client):
+        nodes = client.get('/api/topology/nodes').get_json()['nodes']
+        client.post('/api/batch', json={'operations': [{'op': 'fail_node', 'node_id': nodes[1]['node_id']}]})
+        data = client.get('/api/events?type=node').get_json()
+        assert data['events'][-1]['ids'] == {'node_id': nodes[1]['node_id']}
+        assert data['events'][-1]['event'] == 'fail_node'
+        data = client.get('/api/events?type=stp,topology').get_json()
+        assert [e['type'] for e in data['events']][-2:] == ['stp', 'topology']
+        assert client.get('/api/events?since=yesterday').status_code == 400
+
+    def test_save_and_load_snapshot(self, tmp_path):
+        api = NetworkAPI(snapshot_dir=str(tmp_path))
+        client = api.app.test_client()
+        assert client.post('/api/topology/save', json={'name': 'mesh'}).status_code == 200
+        expected = client.get('/api/topology/spanning-tree').get_json()
+
+        nodes = client.get('/api/topology/nodes').get_json()['nodes']
+        client.post('/api/batch', json={'operations': [{'op': 'fail_node', 'node_id': nodes[0]['node_id']}]})
+        response = client.post('/api/topology/load', json={'name': 'mesh'})
+        assert response.status_code == 200
+        assert response.get_json()['nodes'] == 4
+        assert client.get('/api/topology/spanning-tree').get_json() == expected
+        assert client.get('/api/topology/nodes?state=FAILED').get_json()['total'] == 0
+
+        assert client.post('/api/topology/load', json={'name': 'missing'}).status_code == 404
+        assert client.post('/api/topology/save', json={'name': '../escape'}).status_code == 400
+
+        warm = NetworkAPI(initial_snapshot=str(tmp_path / 'mesh.trsp'))
+        assert warm.app.test_client().get('/api/topology/spanning-tree').get_json() == expected
+
+    def test_journal_replay(self, tmp_path):
+        from backend.core.journal import Replay
+        path = str(tmp_path / 'journal.jsonl')
+        api = NetworkAPI(journal_path=path)
+        client = api.app.test_client()
+        nodes = client.get('/api/topology/nodes').get_json()['nodes']
+        client.post(f"/api/nodes/{nodes[0]['node_id']}/fail")
+        client.post('/api/test/scenario/link_failure')
+        assert api.recompute_scheduler.wait_idle(timeout=5)
+        client.post('/api/topology/reset')
+        link_id = client.get('/api/topology/links').get_json()['links'][0]['link_id']
+        assert client.post('/api/batch', json={'operations': [{'op': 'toggle_link', 'link_id': link_id}]}).status_code == 200
+        api.journal.close()
+
+        report = Replay(path).run()
+        assert report['mutations'] == 3
+        assert report['recompute_count'] >= 2
+        assert report['generation_mismatches'] == 0
+        assert report['errors'] == []
+
+    def test_sessions_are_isolated(self, client):
+        session_id = client.post('/api/sessions', json={'session_id': 'alice'}).get_json()['session']['session_id']
+        nodes = client.get(f'/api/sessions/{session_id}/topology/nodes').get_json()['nodes']
+        assert client.post(f"/api/sessions/{session_id}/nodes/{nodes[0]['node_id']}/fail").status_code == 200
+        failed = client.get('/api/topology/nodes?state=FAILED', headers={'X-Session-Id': session_id}).get_json()
+        assert failed['total'] == 1
+        assert client.get('/api/topology/nodes?state=FAILED').get_json()['total'] == 0
+        assert client.post(f"/api/nodes/{nodes[0]['node_id']}/fail").status_code == 404
+
+        assert client.get('/api/sessions/nobody/topology').status_code == 404
+        assert client.post('/api/sessions', json={'session_id': 'alice'}).status_code == 400
+        assert client.delete(f'/api/sessions/{session_id}').status_code == 200
+        assert client.get(f'/api/sessions/{session_id}/topology').status_code == 404
+
+    def test_sessions_evict_and_rehydrate(self, tmp_path):
+        api = NetworkAPI(session_dir=str(tmp_path), max_sessions=1)
+        client = api.app.test_client()
+        client.post('/api/sessions', json={'session_id': 'a'})
+        link_id = client.get('/api/sessions/a/topology/links').get_json()['links'][0]['link_id']
+        client.post('/api/sessions/a/batch', json={'operations': [{'op': 'link_down', 'link_id': link_id}]})
+        expected = client.get('/api/sessions/a/topology/spanning-tree').get_json()
+
+        client.post('/api/sessions', json={'session_id': 'b'})
+        states = {s['session_id']: s['state'] for s in client.get('/api/sessions').get_json()['sessions']}
+        assert states == {'default': 'active', 'a': 'evicted', 'b': 'active'}
+
+        assert client.get('/api/sessions/a/topology/spanning-tree').get_json() == expected
+        status = client.get('/api/sessions/a').get_json()
+        assert status['state'] == 'active' and status['rehydrations'] == 1 and status['memory_bytes'] > 0
+        assert client.get('/api/sessions/b').get_json()['state'] == 'evicted'
+
+    def test_eviction_io_does_not_block_other_sessions(self, tmp_path, monkeypatch):
+        from backend.api import sessions
+        api = NetworkAPI(session_dir=str(tmp_path), max_sessions=4)
+        client = api.app.test_client()
+        client.post('/api/sessions', json={'session_id': 'a'})
+        client.post('/api/sessions', json={'session_id': 'b'})
+        saving, release = threading.Event(), threading.Event()
+        save = sessions.persistence.save
+
+        def slow_save(topology, path):
+            saving.set()
+            release.wait(5)
+            save(topology, path)
+
+        monkeypatch.setattr(sessions.persistence, 'save', slow_save)
+        worker = threading.Thread(target=api.sessions.evict, args=('a',))
+        worker.start()
+        assert saving.wait(5)
+        assert client.get('/api/sessions/b/topology').status_code == 200
+        assert len(client.get('/api/sessions').get_json()['sessions']) == 3
+        assert worker.is_alive()
+        release.set()
+        worker.join(5)
+        assert client.get('/api/sessions/a').get_json()['state'] == 'evicted'
+        assert client.get('/api/sessions/a/topology').status_code == 200
+
+    def test_rehydration_does_not_block_other_sessions(self, tmp_path):
+        api = NetworkAPI(session_dir=str(tmp_path), max_sessions=4)
+        client = api.app.test_client()
+        client.post('/api/sessions', json={'session_id': 'a'})
+        client.post('/api/sessions', json={'session_id': 'b'})
+        convergence = api.sessions._active['a'].convergence
+        convergence.note_recompute()
+        assert api.sessions.evict('a')
+        assert convergence._timer.finished.is_set()
+
+        restoring, release = threading.Event(), threading.Event()
+        restore = api.sessions._restore
+
+        def slow_restore(session_id, path):
+            restoring.set()
+            release.wait(5)
+            return restore(session_id, path)
+
+        api.sessions._restore = slow_restore
+        results = []
+        workers = [threading.Thread(target=lambda: results.append(api.sessions.acquire('a'))) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        assert restoring.wait(5)
+        assert client.get('/api/sessions/b/topology').status_code == 200
+        assert client.get('/api/sessions/a').get_json()['state'] == 'evicted'
+        release.set()
+        for worker in workers:
+            worker.join(5)
+        assert len(results) == 2 and results[0] is results[1]
+        assert results[0].rehydrations == 1 and results[0].active_requests == 2
+
+    def test_scenarios_run_concurrently(self, api, client):
+        scenario = {
+            'name': 'flap',
+            'events': [
+                {'at': 0, 'op': 'link_down', 'link': ['Node1', 'Node2']},
+                {'at': 0.2, 'op': 'link_up', 'link': ['Node1', 'Node2']},
+                {'at': 1, 'assert': {'active_nodes': 4}}
+            ]
+        }
+        assert client.post('/api/scenarios', json=scenario).status_code == 201
+        assert client.post('/api/scenarios', json={'name': 'node_failure', 'events': scenario['events']}).status_code == 400
+        assert any(s['name'] == 'flap' for s in client.get('/api/scenarios').get_json()['scenarios'])
+
+        runs = [client.post('/api/scenarios/flap/run').get_json() for _ in range(3)]
+        assert all(r['status'] in ('queued', 'running', 'completed') for r in runs)
+        for run in runs:
+            done = api.scenarios.wait(run['run_id'], timeout=5)
+            assert done['status'] == 'completed'
+            assert done['result']['passed']
+            assert done['result']['recompute_count'] == 2
+        # Runs use clones; the session itself is untouched.
+        assert client.get('/api/topology/links?state=DOWN').get_json()['total'] == 0
+
+        live = client.post('/api/scenarios/node_failure/run', json={'live': True, 'wait': True}).get_json()
+        assert live['status'] == 'completed'
+        assert client.get('/api/topology/nodes?state=FAILED').get_json()['total'] == 1
+        assert client.post('/api/scenarios/missing/run').status_code == 404
+
+    def test_chaos_campaign(self, client):
+        response = client.post('/api/chaos', json={'trials': 20, 'k_links': 2, 'workers': 1})
+        assert response.status_code == 202
+        campaign_id = response.get_json()['campaign_id']
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            data = client.get(f'/api/chaos/{campaign_id}').get_json()
+            if data['status'] not in ('pending', 'running'):
+                break
+            time.sleep(0.1)
+        assert data['status'] == 'completed'
+        assert data['completed'] == 20
+        assert set(data['recompute_ms']) >= {'p50', 'p99', 'max'}
+        assert client.post('/api/chaos', json={'trials': 10, 'k_links': 0}).status_code == 400
+        assert client.get('/api/chaos/chaos-999').status_code == 404
+
+    def test_finished_chaos_campaigns_are_capped(self):
+        client = NetworkAPI(keep_chaos_campaigns=1).app.test_client()
+        ids = []
+        for _ in range(3):
+            campaign_id = client.post('/api/chaos', json={'trials': 5, 'workers': 1}).get_json()['campaign_id']
+            deadline = time.time() + 30
+            while client.get(f'/api/chaos/{campaign_id}').get_json()['status'] in ('pending', 'running'):
+                assert time.time() < deadline
+                time.sleep(0.05)
+            ids.append(campaign_id)
+        assert [client.get(f'/api/chaos/{i}').status_code for i in ids] == [404, 404, 200]
+
+
+    def test_contingency_analysis(self, client):
+        data = client.get('/api/analysis/contingency?double=1').get_json()
+        assert data['summary']['nodes'] == 4
+        assert data['bridges'] == [] and data['articulation_points'] == []
+        assert all(l['replacement'] for l in data['links'])
+        assert data['double']['pairs'] == 0
+        assert not data['cached']
+        assert client.get('/api/analysis/contingency?double=1').get_json()['cached']
+        assert client.get('/api/analysis/contingency?double=1&limit=1').get_json()['cached']
+
+        node_id = client.get('/api/topology/nodes').get_json()['nodes'][1]['node_id']
+        client.post(f'/api/nodes/{node_id}/fail')
+        data = client.get('/api/analysis/contingency?double=1&limit=2').get_json()
+        assert not data['cached']
+        assert data['summary']['nodes'] == 3
+        assert len(data['nodes']) == 2
+        assert client.get('/api/analysis/contingency?limit=x').status_code == 400
+
+
+    def test_set_node_priority(self, api, client):
+        nodes = client.get('/api/topology/nodes').get_json()['nodes']
+        node_id = nodes[2]['node_id']
+        response = client.post(f'/api/nodes/{node_id}/priority', json={'priority': 4096})
+        assert response.status_code == 200
+        assert response.get_json()['bridge_id'].startswith('4096.')
+        assert api.recompute_scheduler.wait_idle(timeout=2.0)
+        assert client.get('/api/topology').get_json()['root_node'] == node_id
+        assert client.post(f'/api/nodes/{node_id}/priority', json={'priority': 1000}).status_code == 400
+        assert client.post('/api/nodes/missing/priority', json={'priority': 4096}).status_code == 404
+
+    def test_reads_do_not_wait_for_the_writer(self, api, client):
+        node_id = client.get('/api/topology/nodes').get_json()['nodes'][0]['node_id']
+        link_id = client.get('/api/topology/links').get_json()['links'][0]['link_id']
+        held, release = threading.Event(), threading.Event()
+
+        def writer():
+            with api._write_lock:
+                held.set()
+                release.wait(10)
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        assert held.wait(5)
+        try:
+            started = time.time()
+            for url in (f'/api/path?src={node_id}&dst=Node4', '/api/dataplane', '/api/analysis/contingency',
+                        f'/api/debug/nodes/{node_id}', f'/api/debug/links/{link_id}'):
+                assert client.get(url).status_code == 200, url
+            assert time.time() - started < 5
+        finally:
+            release.set()
+            thread.join()
+        data = client.get(f'/api/debug/nodes/{node_id}').get_json()
+        assert data['node']['node_id'] == node_id and len(data['connected_links']) == 3
+        data = client.get(f'/api/debug/links/{link_id}').get_json()
+        assert data['endpoints']['node1']['node_id'] == data['link']['nodes'][0]
+        assert client.get('/api/debug/nodes/missing').status_code == 404
+        assert client.get('/api/debug/links/missing').status_code == 404
+
+    def test_path_query(self, api, client):
+        nodes = client.get('/api/topology/nodes').get_json()['nodes']
+        root = client.get('/api/topology').get_json()['root_node']
+        leaf = next(n['node_id'] for n in nodes if n['node_id'] != root)
+        data = client.get(f'/api/path?src={leaf}&dst={root}').get_json()
+        assert data['reachable'] and data['hops'] == 1
+        assert data['nodes'] == [leaf, root] and len(data['links']) == 1
+        assert client.get(f"/api/path?src={nodes[0]['node_name']}&dst={nodes[3]['node_name']}").get_json()['reachable']
+
+        client.post(f'/api/nodes/{leaf}/fail')
+        assert api.recompute_scheduler.wait_idle(timeout=2.0)
+        data = client.get(f'/api/path?src={leaf}&dst={root}').get_json()
+        assert not data['reachable'] and data['reason'] == 'src_failed'
+        assert client.get('/api/path?src=nope&dst=node_1').status_code == 404
+        assert client.get('/api/path?src=x').status_code == 400
+
+    def test_reachability(self, api, client):
+        data = client.get('/api/reachability').get_json()
+        assert data['fully_connected'] and data['runs'] == [[0, 4]] and data['reachable_pairs'] == 6
+
+        node = data['order'][0]
+        client.post(f'/api/nodes/{node}/fail')
+        assert api.recompute_scheduler.wait_idle(timeout=2.0)
+        data = client.get('/api/reachability').get_json()
+        assert data['failed'] == [node] and data['reachable_pairs'] == 3 and data['runs'] == [[0, 3]]
+        assert data['diff']['previous_generation'] < data['generation']
+
+        data = client.get('/api/reachability?format=bitset&offset=0&limit=2').get_json()
+        assert len(data['rows']) == 2 and data['row_bytes'] == 1
+        columns = client.get('/api/reachability?format=ids&limit=3').get_json()
+        assert data['row_ids'] == columns['node_ids'][:2] and columns['next_offset'] == 3
+        last = client.get('/api/reachability?format=ids&offset=3&limit=3').get_json()
+        assert len(last['node_ids']) == 1 and last['next_offset'] is None
+        assert client.get('/api/reachability?format=csv').status_code == 400
+        assert client.get('/api/reachability?format=bitset&limit=0').status_code == 400
+
+    def test_forwarding_verification(self, api, client):
+        link_id = client.get('/api/topology/links').get_json()['links'][0]['link_id']
+        client.post(f'/api/links/{link_id}/down')
+        assert api.recompute_scheduler.wait_idle(timeout=2.0)
+        assert api.forwarding_check['ok'] and api.forwarding_check['generation'] == api.topology.generation
+
+        api.topology.update_spanning_tree(set(api.topology.links))
+        api._publish_snapshot()
+        api._verify_forwarding()
+        events = client.get('/api/events?type=stp').get_json()['events']
+        violation = next(e for e in events if e['event'] == 'forwarding_violation')
+        assert violation['fields']['cycle_count'] == 2 and len(violation['ids']['cycle_links']) == 2
+        metrics = client.get('/metrics').get_data(as_text=True)
+        assert 'tinyrstp_forwarding_cycle_links 2' in metrics
+        assert 'tinyrstp_forwarding_violations_total 1' in metrics
+
+    def test_link_utilization(self, client):
+        assert client.get('/api/analysis/utilization').status_code == 404
+        nodes = [n['node_id'] for n in client.get('/api/topology/nodes').get_json()['nodes']]
+        demands = [{'src': nodes[1], 'dst': nodes[2], 'rate': 1500}, {'src': nodes[3], 'dst': nodes[0], 'rate': 100}]
+        data = client.post('/api/analysis/utilization', json={'demands': demands}).get_json()
+        assert data['demands']['routed'] == 2
+        assert data['max_utilization'] == 1.5 and data['oversubscribed']
+
+        view = client.get('/api/topology').get_json()['link_utilization']
+        assert view['oversubscribed'] == data['oversubscribed']
+        assert view['links'][data['oversubscribed'][0]] == 1.5
+        assert 'tinyrstp_oversubscribed_links 2' in client.get('/metrics').get_data(as_text=True)
+        assert client.get('/api/analysis/utilization?limit=1').get_json()['links'][0]['utilization'] == 1.5
+
+        bad = client.post('/api/analysis/utilization', json={'demands': [{'src': 'nope', 'dst': nodes[0], 'rate': 1}]})
+        assert bad.status_code == 400
+        client.delete('/api/analysis/utilization')
+        assert client.get('/api/topology').get_json()['link_utilization'] is None
+
+    def test_dataplane_traffic(self, client):
+        assert client.post('/api/dataplane/traffic', json={'frames': 10}).status_code == 400
+        response = client.post('/api/dataplane/hosts', json={'per_node': 2})
+        assert response.status_code == 201 and response.get_json()['attached'] == 8
+        data = client.post('/api/dataplane/traffic', json={'frames': 5000, 'seed': 1}).get_json()
+        assert data['delivered'] == 5000 and data['flooded'] == 5000
+        assert data['hops']['max'] <= 3
+
+        hosts = response.get_json()['hosts']
+        frame = client.post('/api/dataplane/traffic', json={'src': hosts[0]['mac'], 'dst': hosts[7]['mac']}).get_json()
+        assert frame['delivered']
+        status = client.get('/api/dataplane').get_json()
+        assert status['hosts'] == 8 and status['frames'] == 5001 and status['fdb_entries'] > 0
+        assert 'tinyrstp_dataplane_frames_total{outcome="delivered"} 5001' in client.get('/metrics').get_data(as_text=True)
+
+    def test_profile_breakdown(self, api, client):
+        links = client.get('/api/topology/links').get_json()['links']
+        client.post('/api/batch', json={'operations': [{'op': 'link_down', 'link_id': links[0]['link_id']}]})
+        data = client.get('/api/debug/profile').get_json()
+        assert data['enabled']
+        trace = data['recent'][-1]
+        assert trace['kind'] == 'recompute'
+        assert {'elect_root', 'prim_mst', 'update_spanning_tree', 'connectivity', 'to_dict'} <= set(trace['phases'])
+        assert data['percentiles']['total']['count'] == len(data['recent'])
+
+        response = client.get('/api/topology/spanning-tree?profile=1')
+        assert response.status_code == 200
+        assert response.headers['X-Profiled-Status'] == '200'
+        assert 'get_spanning_tree' in response.get_data(as_text=True)
+
+        response = client.post('/api/batch?profile=1', json={'operations': [{'op': 'link_up', 'link_id': links[0]['link_id']}]})
+        assert 'X-Profiled-Status' not in response.headers and response.get_json()['status'] == 'success'
+        unprofiled = NetworkAPI(profiling=False).app.test_client()
+        assert unprofiled.get('/api/topology/spanning-tree?profile=1').get_json()['root_node']
+
+
+    def test_convergence_tracking(self):
+        api = NetworkAPI(recompute_quiet_period=0.01, convergence_settle=0.1)
+        client = api.app.test_client()
+        links = client.get('/api/topology/links?in_tree=true').get_json()['links']
+        client.post(f"/api/links/{links[0]['link_id']}/down")
+        client.post('/api/batch', json={'operations': [{'op': 'link_up', 'link_id': links[0]['link_id']}]})
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            data = client.get('/api/convergence').get_json()
+            if not data['pending'] and data['recent']:
+                break
+            time.sleep(0.05)
+        assert set(data['by_type']) == {'link_down', 'link_up'}
+        assert all(r['convergence_seconds'] >= 0 and r['reachable_after'] == 3 for r in data['recent'])
+        assert 'stp_convergence_seconds_bucket{event_type="link_down"' in client.get('/metrics').get_data(as_text=True)
+        assert client.get('/api/convergence?limit=-1').status_code == 400
+        assert client.get('/api/convergence?limit=x').status_code == 400
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -1,10 +1,35 @@
+import json
 import pytest
+import numpy as np
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../../')))
 
 from backend.core.node import Node, NodeState, PortState
+from backend.core.bridge import BridgeId, BridgeQueue, validate_priority
+from backend.core.bpdu import BPDU, BPDUManager
 from backend.core.link import Link, LinkState
+from backend.core.scheduler import RecomputeScheduler
+from backend.core.topology import Topology
+from backend.core.stp import STPCalculator
+from backend.core import persistence
+from backend.core.journal import Journal, Replay, read_journal
+from backend.core.scenario import Scenario, ScenarioError, ScenarioRunner
+from backend.core.chaos import ChaosCampaign, run_trials
+from backend.core.contingency import ContingencyAnalysis
+from backend.core.convergence import ConvergenceTracker
+from backend.core.dataplane import DataPlane
+from backend.core.treeindex import TreeIndex
+from backend.core.reachability import ReachabilityLabels
+from backend.core.snapshot import TopologySnapshot
+from backend.core.verification import ForwardingVerification
+from backend.core.utilization import TrafficMatrix, UtilizationAnalysis
+from backend.bench import suite
+from backend.utils.logger import get_logger, _RateLimiter
+from backend.utils.events import EventBuffer
+from backend.utils.profiling import Profiler, span
+from backend.utils.stats import percentiles
+from backend.utils.logtail import LogFilter, iter_lines_reverse, parse_since, tail
 
 
 class TestNode:
@@ -35,6 +60,70 @@ class TestNode:
         assert node.state == NodeState.ACTIVE
 
 
+class TestBridgeId:
+    def test_key_and_bytes_order(self):
+        ids = [BridgeId(4096, 0x0200000000ff), BridgeId(32768, 0x020000000001), BridgeId(32768, 0x020000000002)]
+        assert sorted(reversed(ids)) == ids
+        assert sorted(b.to_bytes() for b in ids) == [b.to_bytes() for b in ids]
+        assert BridgeId.from_bytes(ids[0].to_bytes()) == ids[0]
+        assert BridgeId.parse(str(ids[1])) == ids[1]
+        assert str(BridgeId.for_node('node_7')) == '32768.02:00:00:00:00:07'
+        with pytest.raises(ValueError):
+            validate_priority(100)
+
+    def test_priority_decides_election(self):
+        topology, nodes, _ = TestTopologyIndexes().build()
+        STPCalculator(topology).update_and_apply()
+        assert topology.root_node is nodes[0]
+        topology.set_bridge_priority(nodes[2], 4096)
+        STPCalculator(topology).update_and_apply()
+        assert topology.root_node is nodes[2]
+
+    def test_queue_matches_min(self):
+        import random
+        rng = random.Random(7)
+        queue, keys = BridgeQueue(), {}
+        for _ in range(2000):
+            node_id = f'n{rng.randrange(50)}'
+            if rng.random() < 0.3:
+                queue.discard(node_id)
+                keys.pop(node_id, None)
+            else:
+                keys[node_id] = rng.randrange(1000)
+                queue.set(node_id, keys[node_id])
+            expected = min(keys, key=lambda n: (keys[n], n)) if keys else None
+            assert queue.peek() == expected and len(queue) == len(keys)
+            exclude = set(rng.sample(sorted(keys), min(3, len(keys))))
+            rest = [n for n in keys if n not in exclude]
+            assert queue.smallest(exclude) == (min(rest, key=lambda n: (keys[n], n)) if rest else None)
+
+    def test_root_failover_touches_old_and_new_root(self):
+        topology, nodes, _ = TestTopologyIndexes().build()
+        topology.elect_root()
+        assert topology.root_node is nodes[0] and nodes[0].is_root
+        nodes[0].set_failed()
+        topology.elect_root()
+        assert topology.root_node is nodes[1]
+        assert [n.is_root for n in nodes] == [False, True, False]
+        nodes[0].set_active()
+        topology.elect_root()
+        assert topology.root_node is nodes[0] and not nodes[1].is_root
+
+    def test_bpdu_round_trip_and_processing(self):
+        a, b = Node('A'), Node('B')
+        b.bridge_id = b.bridge_id.with_priority(0)
+        bpdu = BPDU(root=b.bridge_id, sender=b.bridge_id, port_id=1, cost=0)
+        unpacked = BPDU.unpack(bpdu.pack())
+        assert unpacked.root == b.bridge_id and unpacked.sender == b.bridge_id
+
+        manager = BPDUManager()
+        manager.add_node(a)
+        manager.add_node(b)
+        a.root_id = a.id
+        manager.receive_bpdu(a.add_port(1), unpacked)
+        assert a.root_id == b.id and a.root_path_cost == 1
+
+
 class TestLink:
     def test_link_creation(self):
         node1 = Node("Node1")
@@ -68,5 +157,745 @@ class TestLink:
         assert link.lacp_fail_count == 0
 
 
+class TestTopologyIndexes:
+    def build(self):
+        topology = Topology()
+        nodes = [Node(f"Node{i}") for i in range(3)]
+        for node in nodes:
+            topology.add_node(node)
+        links = []
+        for a, b in ((0, 1), (1, 2), (0, 2)):
+            p1 = nodes[a].add_port(len(nodes[a].ports) + 1)
+            p2 = nodes[b].add_port(len(nodes[b].ports) + 1)
+            link = Link(p1, p2, 1000, 1)
+            topology.add_link(link)
+            links.append(link)
+        return topology, nodes, links
+
+    def test_state_indexes_follow_mutations(self):
+        topology, nodes, links = self.build()
+        generation = topology.generation
+        nodes[0].set_failed()
+        links[1].set_state(LinkState.DOWN)
+        assert topology.nodes_by_state[NodeState.FAILED] == {nodes[0].id}
+        assert topology.links_by_state[LinkState.DOWN] == {links[1].link_id}
+        assert (nodes[0].id, 1) in topology.ports_by_state[PortState.DISABLED]
+        assert topology.generation > generation
+
+        nodes[0].set_active()
+        assert topology.nodes_by_state[NodeState.FAILED] == set()
+
+    def test_neighbors_use_adjacency_index(self):
+        topology, nodes, links = self.build()
+        assert {n.id for n, _ in topology.get_neighbors(nodes[0])} == {nodes[1].id, nodes[2].id}
+        links[0].set_state(LinkState.DOWN)
+        assert [n.id for n, _ in topology.get_neighbors(nodes[0])] == [nodes[2].id]
+        assert len(topology.get_node_links(nodes[0])) == 2
+
+    def test_all_connectivity_matches_per_node_search(self):
+        topology, nodes, links = self.build()
+        STPCalculator(topology).update_and_apply()
+        links[0].set_state(LinkState.DOWN)
+        connectivity = topology.get_all_connectivity()
+        for node in nodes[1:]:
+            single = topology.check_connectivity_to_root(node)
+            assert connectivity[node.id]['reachable'] == single['reachable']
+            assert len(connectivity[node.id]['path']) == len(single['path'])
+        assert connectivity[nodes[1].id]['path'][-1]['to_node'] == nodes[0].id
+
+        nodes[2].set_failed()
+        connectivity = topology.get_all_connectivity()
+        assert connectivity[nodes[1].id]['blocked_by'] == 'no_path'
+        assert connectivity[nodes[2].id]['blocked_by'] == 'node_failed'
+
+
+class TestPersistence:
+    def test_round_trip(self, tmp_path):
+        topology, nodes, links = TestTopologyIndexes().build()
+        STPCalculator(topology).update_and_apply()
+        links[2].set_state(LinkState.DOWN)
+        topology.set_bridge_priority(nodes[2], 8192)
+        path = str(tmp_path / 'mesh.trsp')
+        persistence.save(topology, path)
+
+        restored = persistence.load(path)
+        assert restored.to_dict() == topology.to_dict()
+        assert restored.get_node(nodes[2].id).bridge_id.priority == 8192
+        assert restored.links_by_state[LinkState.DOWN] == {links[2].link_id}
+        assert restored.get_node(nodes[0].id).get_port(1).link is restored.get_link(links[0].link_id)
+
+        restored.get_node(nodes[1].id).set_failed()
+        assert nodes[1].id in restored.nodes_by_state[NodeState.FAILED]
+        assert Node("Fresh").id not in restored.nodes
+
+    def test_decoded_indexes_match_rebuild(self):
+        topology, nodes, links = TestTopologyIndexes().build()
+        STPCalculator(topology).update_and_apply()
+        links[1].set_state(LinkState.DOWN)
+        nodes[2].set_failed()
+        restored = persistence.loads(persistence.dumps(topology))
+        names = ('nodes_by_state', 'links_by_state', 'ports_by_state', 'node_links', 'spanning_tree_nodes')
+        decoded = {name: getattr(restored, name) for name in names}
+        root = restored.root_queue.peek(), len(restored.root_queue)
+
+        restored.rebuild_indexes()
+        assert decoded == {name: getattr(restored, name) for name in names}
+        assert root == (restored.root_queue.peek(), len(restored.root_queue))
+
+    def test_rejects_foreign_data(self):
+        with pytest.raises(persistence.SnapshotFormatError):
+            persistence.loads(b'not a snapshot at all, just some bytes')
+
+
+class TestJournal:
+    def test_buffered_entries_are_flushed_in_batches(self, tmp_path):
+        journal = Journal(str(tmp_path / 'j.jsonl'), flush_interval=60)
+        for i in range(5):
+            journal.append('mutation', i, operations=[])
+        assert journal.get_status()['written'] == 0
+        journal.flush()
+        assert journal.get_status()['fsyncs'] == 1
+        journal.close()
+        assert [e['seq'] for e in read_journal(journal.path)] == [1, 2, 3, 4, 5]
+
+        reopened = Journal(journal.path)
+        assert reopened.append('mutation', 0, operations=[])['seq'] == 6
+        reopened.close()
+
+    def test_torn_last_line_is_skipped_and_truncated(self, tmp_path):
+        journal = Journal(str(tmp_path / 'j.jsonl'))
+        journal.append('mutation', 0, operations=[])
+        journal.close()
+        with open(journal.path, 'a') as f:
+            f.write('{"seq":2,"ts":1')
+        assert [e['seq'] for e in read_journal(journal.path)] == [1]
+
+        reopened = Journal(journal.path)
+        assert reopened.truncated_bytes == len('{"seq":2,"ts":1')
+        assert reopened.append('mutation', 0, operations=[])['seq'] == 2
+        reopened.close()
+        assert [e['seq'] for e in read_journal(journal.path)] == [1, 2]
+
+    def test_replay_reproduces_generations(self, tmp_path):
+        topology, nodes, links = TestTopologyIndexes().build()
+        calculator = STPCalculator(topology)
+        calculator.update_and_apply()
+        journal = Journal(str(tmp_path / 'j.jsonl'))
+        journal.append_base(topology, 'test')
+
+        nodes[0].set_failed()
+        journal.append('mutation', topology.generation, operations=[{'op': 'fail_node', 'node_id': nodes[0].id}])
+        links[1].set_state(LinkState.DOWN)
+        journal.append('mutation', topology.generation, operations=[{'op': 'link_down', 'link_id': links[1].link_id}])
+        calculator.update_and_apply()
+        journal.append('recompute', topology.generation, duration_ms=0.1)
+        journal.append('rename', topology.generation)
+        journal.close()
+
+        report = Replay(journal.path).run()
+        assert report['mutations'] == 2
+        assert report['unknown_entries'] == {'rename': 1}
+        assert report['recompute_count'] == 1
+        assert report['recomputes'][0]['mutations'] == 2
+        assert report['generation_mismatches'] == 0
+        assert report['errors'] == []
+
+        virtual = Replay(journal.path, mode='virtual').run()
+        assert virtual['recompute_count'] == 1
+
+
+class TestScenario:
+    def test_virtual_run_coalesces_and_checks(self):
+        topology, nodes, links = TestTopologyIndexes().build()
+        STPCalculator(topology).update_and_apply()
+        scenario = Scenario.from_dict({
+            'name': 'pair',
+            'events': [
+                {'at': 0.0, 'op': 'fail_node', 'node': 'Node2'},
+                {'at': 0.01, 'op': 'link_down', 'link': ['Node0', 'Node1']},
+                {'at': 1.0, 'assert': {'active_nodes': 2, 'reachable': ['Node0'], 'unreachable': ['Node1', 'Node2']}},
+                {'at': 2.0, 'op': 'recover_node', 'node': 'Node2'}
+            ]
+        })
+        result = ScenarioRunner(scenario, topology).run()
+        assert result['passed']
+        assert result['recompute_count'] == 2
+        assert result['recomputes'][0]['events'] == [0, 1]
+        assert 0.05 <= result['events'][0]['convergence_seconds'] < 0.5
+        assert result['reachability'][0]['reachable'] == 3
+        assert result['reachability'][-1]['unreachable'] == []
+
+    def test_validation(self):
+        with pytest.raises(ScenarioError):
+            Scenario.from_dict({'name': 'x', 'events': [{'at': 0, 'op': 'explode'}]})
+        with pytest.raises(ScenarioError):
+            Scenario.from_dict({'name': 'x', 'events': [{'at': -1, 'op': 'fail_node', 'node': 'A'}]})
+        scenario = Scenario.parse('name: y\nevents:\n  - {at: 0, op: fail_node, node: Nowhere}\n', 'application/x-yaml')
+        with pytest.raises(ScenarioError):
+            scenario.operations(Topology())
+
+
+class TestChaos:
+    def test_trials_are_seeded_and_restore_the_topology(self):
+        topology, nodes, links = TestTopologyIndexes().build()
+        STPCalculator(topology).update_and_apply()
+        def outcome(results):
+            return [(r['failed_links'], r['failed_nodes'], r['unreachable']) for r in results]
+
+        first = run_trials(topology, 7, range(10), 1, 1)
+        assert outcome(run_trials(topology, 7, range(5, 10), 1, 1)) == outcome(first[5:])
+        assert topology.nodes_by_state[NodeState.FAILED] == set()
+        assert topology.links_by_state[LinkState.DOWN] == set()
+
+    def test_campaign_aggregates_across_processes(self):
+        topology, nodes, links = TestTopologyIndexes().build()
+        STPCalculator(topology).update_and_apply()
+        campaign = ChaosCampaign(persistence.dumps(topology), trials=12, k_links=2, seed=3, workers=2, chunk_size=5)
+        summary = campaign.run()
+        assert summary['status'] == 'completed'
+        assert summary['completed'] == 12
+        expected = sorted(r['unreachable'] for r in run_trials(topology, 3, range(12), 2, 0))
+        assert summary['unreachable']['max'] == expected[-1]
+        assert len(summary['worst']) == 10
+        with pytest.raises(ValueError):
+            ChaosCampaign(b'', trials=1, k_links=0, k_nodes=0)
+
+
+
+class TestContingency:
+    def build(self):
+        """Ring Node0-Node3 with a chain Node1-Node4-Node5 hanging off it."""
+        topology = Topology()
+        nodes = [Node(f"Node{i}") for i in range(6)]
+        for node in nodes:
+            topology.add_node(node)
+        links = {}
+        for a, b, cost in ((0, 1, 1), (1, 2, 2), (2, 3, 3), (3, 0, 4), (1, 4, 1), (4, 5, 1)):
+            p1 = nodes[a].add_port(len(nodes[a].ports) + 1)
+            p2 = nodes[b].add_port(len(nodes[b].ports) + 1)
+            link = Link(p1, p2, 1000, cost)
+            topology.add_link(link)
+            links[(a, b)] = link
+        STPCalculator(topology).update_and_apply()
+        return topology, nodes, links
+
+    def test_bridges_and_articulation_points(self):
+        topology, nodes, links = self.build()
+        result = ContingencyAnalysis(TopologySnapshot.capture(1, topology, STPCalculator(topology)), double=True).run()
+        assert result['summary']['tree_links'] == 5
+        assert result['bridges'] == [
+            {'link_id': links[(1, 4)].link_id, 'unreachable': 2},
+            {'link_id': links[(4, 5)].link_id, 'unreachable': 1}
+        ]
+        assert [(a['node_name'], a['unreachable']) for a in result['articulation_points']] == [('Node1', 2), ('Node4', 1)]
+        # Any two ring links cut the ring.
+        assert result['double']['pairs'] == 6
+        assert {frozenset(c['links']) for c in result['double']['cuts']} == {
+            frozenset((links[x].link_id, links[y].link_id))
+            for i, x in enumerate(((0, 1), (1, 2), (2, 3), (3, 0))) for y in ((0, 1), (1, 2), (2, 3), (3, 0))[i + 1:]
+        }
+
+    def test_matches_recompute(self):
+        topology, nodes, links = self.build()
+        calculator = STPCalculator(topology)
+        baseline = set(topology.spanning_tree_links)
+        result = ContingencyAnalysis(TopologySnapshot.capture(1, topology, calculator)).run()
+
+        for impact in result['links']:
+            link = topology.links[impact['link_id']]
+            link.set_state(LinkState.DOWN)
+            tree = calculator.update_and_apply()
+            link.set_state(LinkState.UP)
+            if impact['replacement']:
+                assert tree == baseline - {link.link_id} | {impact['replacement']}
+            else:
+                assert len(tree) == len(baseline) - impact['unreachable']
+
+        for impact in result['nodes']:
+            node = topology.nodes[impact['node_id']]
+            node.set_failed()
+            tree = calculator.update_and_apply()
+            node.set_active()
+            assert topology.root_node.id == impact['new_root']
+            assert set(impact['added']) <= tree
+            if not impact['unreachable']:
+                assert tree == baseline - set(impact['removed']) | set(impact['added'])
+        calculator.update_and_apply()
+        assert topology.spanning_tree_links == baseline
+
+
+
+class TestDataPlane:
+    def test_tree_index_lca_matches_parent_walk(self):
+        from backend.bench.topologies import build_topology
+        import numpy as np
+        topology = build_topology(200)
+        STPCalculator(topology).update_and_apply()
+        index = TreeIndex.of(topology)
+        assert TreeIndex.of(topology) is index
+        rng = np.random.default_rng(3)
+        a, b = rng.integers(0, 200, 500), rng.integers(0, 200, 500)
+        for x, y, lca in zip(a, b, index.lca(a, b)):
+            ancestors = set()
+            while x >= 0:
+                ancestors.add(x)
+                x = index.parent[x]
+            while y not in ancestors:
+                y = index.parent[y]
+            assert y == lca
+
+    def test_attach_hosts_in_bulk(self):
+        topology, nodes, links = TestTopologyIndexes().build()
+        dataplane = DataPlane(topology)
+        dataplane.attach_host(nodes[0].id)
+        hosts = dataplane.attach_hosts([n.id for n in nodes], 3)
+        assert len(hosts) == 9 and len(dataplane._heard) == 10
+        assert [h.index for h in hosts] == list(range(1, 10))
+        with pytest.raises(ValueError):
+            dataplane.attach_hosts(['missing'])
+        assert len(dataplane.hosts) == 10
+
+    def test_path_query(self):
+        topology, nodes, links = TestTopologyIndexes().build()
+        links[2].set_state(LinkState.DOWN)
+        STPCalculator(topology).update_and_apply()
+        index = TreeIndex.of(topology)
+        path = index.path(index.index[nodes[2].id], index.index[nodes[0].id])
+        assert path['nodes'] == [nodes[2].id, nodes[1].id, nodes[0].id]
+        assert path['links'] == [links[1].link_id, links[0].link_id]
+        assert path['hops'] == 2 and path['latency'] == 2.0
+        assert path['cost'] == pytest.approx(links[0].get_cost() + links[1].get_cost())
+        assert path['turning_node'] == nodes[0].id
+        assert index.path(0, 0)['hops'] == 0
+
+        nodes[1].set_failed()
+        STPCalculator(topology).update_and_apply()
+        index = TreeIndex.of(topology)
+        assert index.path(index.index[nodes[2].id], index.index[nodes[0].id]) is None
+
+    def test_scalar_and_bulk_paths_agree(self):
+        from backend.bench.topologies import build_topology
+        topology = build_topology(60)
+        STPCalculator(topology).update_and_apply()
+        dataplane = DataPlane(topology)
+        hosts = [dataplane.attach_host(n.id) for n in topology.get_all_nodes()]
+        src, dst = dataplane.random_traffic(300, seed=1)
+        bulk = dataplane.send_bulk(src, dst, now=0.0)
+        assert bulk['delivered'] == 300 and bulk['flooded'] == 300
+
+        index = TreeIndex.of(topology)
+        for s, d in zip(src[:50], dst[:50]):
+            result = dataplane.send(hosts[s].mac, hosts[d].mac, now=1.0)
+            a, b = index.index[hosts[s].node_id], index.index[hosts[d].node_id]
+            assert result['delivered']
+            assert result['latency'] == index.latency([a], [b])[0] == index.path(a, b)['latency']
+            assert index.lca_one(a, b) == index.lca([a], [b])[0]
+        assert any(p.mac_table for n in topology.get_all_nodes() for p in n.ports.values())
+        assert dataplane.send_bulk(src, dst, now=2.0)['flooded'] == 0
+
+    def test_reconvergence_drops_stale_entries_until_they_age(self):
+        topology, nodes, links = TestTopologyIndexes().build()
+        calculator = STPCalculator(topology)
+        calculator.update_and_apply()
+        dataplane = DataPlane(topology, forward_delay=15.0)
+        h0, h2 = dataplane.attach_host(nodes[0].id), dataplane.attach_host(nodes[2].id)
+        dataplane.send(h2.mac, h0.mac, now=0.0)
+        assert dataplane.send(h0.mac, h2.mac, now=0.0) == {
+            'delivered': True, 'flooded': False, 'reason': None, 'hops': 1, 'latency': 1.0
+        }
+
+        links[2].set_state(LinkState.DOWN)
+        calculator.update_and_apply()
+        assert dataplane.send(h0.mac, h2.mac, now=1.0)['reason'] == 'stale_entry'
+        result = dataplane.send(h0.mac, h2.mac, now=20.0)
+        assert result['delivered'] and result['flooded'] and result['hops'] == 2
+
+        nodes[2].set_failed()
+        calculator.update_and_apply()
+        assert dataplane.send_bulk([0], [1], now=40.0)['drops'] == {'unreachable': 1}
+        assert dataplane.get_status()['drops'] == {'stale_entry': 1, 'unreachable': 1}
+
+
+class TestUtilization:
+    def test_loads_match_path_walk(self):
+        from backend.bench.topologies import build_topology
+        import random
+        topology = build_topology(80)
+        STPCalculator(topology).update_and_apply()
+        rng = random.Random(5)
+        ids = list(topology.nodes)
+        demands = [(rng.choice(ids), rng.choice(ids), rng.uniform(0, 100)) for _ in range(400)]
+        matrix = TrafficMatrix.from_payload({'demands': [{'src': s, 'dst': d, 'rate': r} for s, d, r in demands]})
+        result = UtilizationAnalysis(topology, matrix, threshold=0.5).run()
+
+        index = TreeIndex.of(topology)
+        expected = {}
+        for src, dst, rate in demands:
+            a, b = index.index[src], index.index[dst]
+            lca = index.lca([a], [b])[0]
+            for node, direction in ((a, 'load_to_root'), (b, 'load_from_root')):
+                while node != lca:
+                    key = (index.parent_link[node].link_id, direction)
+                    expected[key] = expected.get(key, 0.0) + rate
+                    node = index.parent[node]
+        for link in result['links']:
+            for direction in ('load_to_root', 'load_from_root'):
+                assert link[direction] == pytest.approx(expected.get((link['link_id'], direction), 0.0), abs=1e-5)
+        utilizations = [l['utilization'] for l in result['links']]
+        assert utilizations == sorted(utilizations, reverse=True)
+        assert result['oversubscribed'] == [l['link_id'] for l in result['links'] if l['utilization'] > 0.5]
+
+    def test_partitioned_demands_are_unroutable(self):
+        topology, nodes, links = TestTopologyIndexes().build()
+        nodes[2].set_failed()
+        STPCalculator(topology).update_and_apply()
+        matrix = TrafficMatrix.from_payload({'matrix': {nodes[0].id: {nodes[1].id: 1500, nodes[2].id: 10}}})
+        result = UtilizationAnalysis(topology, matrix).run()
+        assert result['demands']['routed'] == 1 and result['demands']['unroutable'] == 1
+        assert result['links'][0]['utilization'] == 1.5 and result['oversubscribed'] == [result['links'][0]['link_id']]
+        with pytest.raises(ValueError):
+            TrafficMatrix.from_payload({'demands': [{'src': nodes[0].id, 'dst': nodes[1].id, 'rate': -1}]})
+
+
+class TestReachability:
+    def test_labels_match_tree_index(self):
+        from backend.bench.topologies import build_topology
+        import base64
+        topology = build_topology(60)
+        calculator = STPCalculator(topology)
+        calculator.update_and_apply()
+        before = ReachabilityLabels.publish(topology, None)
+        assert ReachabilityLabels.publish(topology, before) is before
+        assert before.summary()['fully_connected'] and before.diff() is None
+
+        nodes = list(topology.nodes.values())
+        for node in nodes[10:13] + nodes[40:42]:
+            node.set_failed()
+        calculator.update_and_apply()
+        after = ReachabilityLabels.publish(topology, before)
+        assert after.previous is before
+
+        index = TreeIndex.of(topology)
+        ids = after.ids
+        n = len(ids)
+        a, b = np.divmod(np.arange(n * n), n)
+        expected = index.connected(a, b).reshape(n, n)
+        rows = after.rows(0, n)
+        assert rows['row_ids'] == ids == after.node_ids(0, n)['node_ids']
+        assert after.rows(3, 2)['row_ids'] == ids[3:5]
+        decoded = np.unpackbits(np.frombuffer(b''.join(base64.b64decode(r) for r in rows['rows']), dtype=np.uint8))
+        assert (decoded.reshape(n, -1)[:, :n].astype(bool) == expected).all()
+
+        summary = after.summary()
+        assert summary['reachable_pairs'] == (expected.sum() - summary['reachable_nodes']) // 2
+        runs = after.runs()
+        position = {node_id: i for i, node_id in enumerate(runs['order'])}
+        for start, size in runs['runs']:
+            block = [index.index[node_id] for node_id in runs['order'][start:start + size]]
+            assert expected[np.ix_(block, block)].all()
+        assert len(position) + len(runs['failed']) == n
+
+        diff = after.diff()
+        assert diff['lost_pairs'] == n * (n - 1) // 2 - summary['reachable_pairs']
+        assert diff['gained_pairs'] == 0 and diff['changed_count'] == n
+
+    def test_diff_across_node_sets(self):
+        topology, nodes, links = TestTopologyIndexes().build()
+        calculator = STPCalculator(topology)
+        calculator.update_and_apply()
+        before = ReachabilityLabels.publish(topology, None)
+        extra = Node('Node9')
+        topology.add_node(extra)
+        calculator.update_and_apply()
+        diff = ReachabilityLabels.publish(topology, before).diff()
+        assert diff['added_nodes'] == [extra.id] and diff['lost_pairs'] == diff['gained_pairs'] == 0
+        assert diff['changed_nodes'] == []
+
+
+class TestTopologySnapshot:
+    def test_patch_matches_full_capture(self):
+        from backend.bench.topologies import build_topology
+        topology = build_topology(50)
+        calculator = STPCalculator(topology)
+        calculator.update_and_apply()
+        before = TopologySnapshot.capture(1, topology, calculator)
+        failed = list(topology.nodes.values())[7]
+        failed.set_failed()
+        link = next(l for l in topology.links.values() if failed.id not in l.get_connected_nodes())
+        link.set_state(LinkState.DOWN)
+
+        patched = TopologySnapshot.patch(before, 2, topology)
+        full = TopologySnapshot.capture(3, topology, calculator)
+        assert patched.nodes == full.nodes and patched.links == full.links
+        assert patched.summary == full.summary
+        for name in ('state', 'port_state'):
+            for collection, expected in ((patched.node_collection, full.node_collection),
+                                         (patched.link_collection, full.link_collection)):
+                index = {k: v for k, v in collection.indexes[name].items() if v}
+                assert index == {k: v for k, v in expected.indexes[name].items() if v}
+        assert patched.captured_version == 1
+        assert patched.topology['nodes'][failed.id]['connectivity'] == before.topology['nodes'][failed.id]['connectivity']
+        assert patched.can_patch(topology)
+        topology.add_node(Node('Extra'))
+        assert not patched.can_patch(topology)
+
+
+class TestForwardingVerification:
+    def verify(self, topology, calculator):
+        snapshot = TopologySnapshot.capture(1, topology, calculator)
+        snapshot.reachability = ReachabilityLabels(topology)
+        return ForwardingVerification(snapshot).run()
+
+    def test_converged_tree_passes(self):
+        from backend.bench.topologies import build_topology
+        topology = build_topology(50)
+        calculator = STPCalculator(topology)
+        calculator.update_and_apply()
+        assert self.verify(topology, calculator)['ok']
+        list(topology.nodes.values())[7].set_failed()
+        calculator.update_and_apply()
+        assert self.verify(topology, calculator)['ok']
+
+    def test_reports_cycle_and_orphan(self):
+        topology, nodes, links = TestTopologyIndexes().build()
+        calculator = STPCalculator(topology)
+        calculator.update_and_apply()
+        blocked = next(l for l in links if l.link_id not in topology.spanning_tree_links)
+        for port in (blocked.port1, blocked.port2):
+            port.update_state(PortState.FORWARDING)
+        result = self.verify(topology, calculator)
+        assert not result['ok'] and result['cycle_count'] == 1 and result['orphaned_nodes'] == []
+
+        for link in links:
+            for port in (link.port1, link.port2):
+                port.update_state(PortState.BLOCKING)
+        result = self.verify(topology, calculator)
+        assert result['cycle_count'] == 0 and result['orphaned_count'] == 2
+        assert topology.root_node.id not in result['orphaned_nodes']
+
+
+class TestBench:
+    def test_suite_reports_every_case(self):
+        report = suite.run(sizes=[10], repeat=1)
+        cases = {r['case'] for r in report['results']}
+        assert cases == {'build', 'stp_update', 'root_failover', 'connectivity', 'to_dict', 'bpdu_tick', 'bpdu_pack',
+                         'bpdu_unpack', 'dataplane_bulk'}
+        assert all(r['ms'] >= 0 and r['peak_bytes'] is not None for r in report['results'])
+
+    def test_compare_flags_slowdowns_beyond_noise(self):
+        baseline = {'results': [
+            {'nodes': 10, 'case': 'stp_update', 'ms': 10.0},
+            {'nodes': 10, 'case': 'bpdu_pack', 'ms': 0.01}
+        ]}
+        report = {'results': [
+            {'nodes': 10, 'case': 'stp_update', 'ms': 20.0},
+            {'nodes': 10, 'case': 'bpdu_pack', 'ms': 0.5},
+            {'nodes': 100, 'case': 'stp_update', 'ms': 99.0}
+        ]}
+        assert [(r['case'], r['ratio']) for r in suite.compare(report, baseline)] == [('stp_update', 2.0)]
+        assert suite.compare(report, baseline, tolerance=1.5) == []
+
+    def test_committed_baseline_covers_the_small_sizes(self):
+        with open(suite.BASELINE) as f:
+            baseline = json.load(f)
+        cases = {r['case'] for r in baseline['results']}
+        assert {(r['nodes'], r['case']) for r in baseline['results']} == {(n, c) for n in (10, 100, 1000) for c in cases}
+        assert 'dataplane_bulk' in cases
+
+
+
+class TestConvergence:
+    def test_fault_settles_after_quiet_window(self):
+        state = {'last_change': 0.0, 'busy': False}
+        tracker = ConvergenceTracker(lambda: state['last_change'], lambda: state['busy'], settle=1.0)
+        tracker.record_fault('link_down', {'link_id': 'l1'}, at=10.0)
+        tracker.record_fault('fail_node', {'node_id': 'n1'}, at=10.2)
+        assert tracker.check(now=20.0) == []  # no recompute has seen the faults yet
+
+        tracker._last_recompute = 10.3
+        state['last_change'] = 10.5
+        state['busy'] = True
+        assert tracker.check(now=20.0) == []
+        state['busy'] = False
+        assert tracker.check(now=11.2) == []  # still inside the settle window
+
+        settled = tracker.check(now=11.5)
+        assert [(r['type'], r['convergence_seconds']) for r in settled] == [('link_down', 0.5), ('fail_node', 0.3)]
+        status = tracker.get_status()
+        assert status['pending'] == []
+        assert status['by_type']['link_down']['count'] == 1
+
+
+class TestRecomputeScheduler:
+    def test_storm_collapses_to_one_recompute(self):
+        calls = []
+        scheduler = RecomputeScheduler(lambda: calls.append(1), quiet_period=0.05, max_delay=1.0)
+        for _ in range(20):
+            scheduler.mark_dirty()
+        assert scheduler.is_pending()
+        assert scheduler.wait_idle(timeout=2.0)
+        assert len(calls) == 1
+        assert scheduler.get_status()['state'] == 'current'
+        scheduler.stop()
+
+    def test_change_during_recompute_is_not_lost(self):
+        calls = []
+
+        def callback():
+            calls.append(1)
+            if len(calls) == 1:
+                scheduler.mark_dirty()
+
+        scheduler = RecomputeScheduler(callback, quiet_period=0.01, max_delay=0.1)
+        scheduler.mark_dirty()
+        assert scheduler.wait_idle(timeout=2.0)
+        assert len(calls) == 2
+        scheduler.stop()
+
+    def test_flush_runs_immediately(self):
+        calls = []
+        scheduler = RecomputeScheduler(lambda: calls.append(1), quiet_period=10.0, max_delay=10.0)
+        scheduler.mark_dirty()
+        assert scheduler.flush()
+        assert calls == [1]
+        assert not scheduler.flush()
+        scheduler.stop()
+
+    def test_callback_errors_are_logged_and_counted(self, caplog):
+        def callback():
+            raise RuntimeError('tree exploded')
+
+        scheduler = RecomputeScheduler(callback, quiet_period=10.0, max_delay=10.0)
+        scheduler.mark_dirty()
+        with caplog.at_level('ERROR', logger='NetworkSimulator'):
+            assert scheduler.flush()
+        message = caplog.records[-1].getMessage()
+        assert 'RuntimeError: tree exploded' in message and "raise RuntimeError('tree exploded')" in message
+        status = scheduler.get_status()
+        assert status['error_count'] == 1 and status['state'] == 'current'
+        assert status['last_error']['message'] == 'RuntimeError: tree exploded'
+        scheduler.stop()
+
+
+class TestNetworkLogger:
+    def test_api_lines_are_rate_limited(self, caplog):
+        logger = get_logger(log_dir='logs')
+        original = logger.rate_limiters['api']
+        logger.rate_limiters['api'] = _RateLimiter(rate=0.0, burst=2)
+        try:
+            with caplog.at_level('INFO', logger='NetworkSimulator'):
+                for _ in range(5):
+                    logger.api_request('GET', '/api/topology')
+                logger.warning('still logged')
+        finally:
+            logger.rate_limiters['api'] = original
+        messages = [r.getMessage() for r in caplog.records]
+        assert messages.count('API Request: GET /api/topology') == 2
+        assert 'still logged' in messages
+
+    def test_suppressed_count_is_reported(self):
+        limiter = _RateLimiter(rate=1000.0, burst=1)
+        assert limiter.acquire() == 0
+        assert limiter.acquire() is None
+        limiter.updated -= 1.0
+        assert limiter.acquire() == 1
+
+    def test_error_stack_is_captured(self, caplog):
+        logger = get_logger(log_dir='logs')
+        with caplog.at_level('ERROR', logger='NetworkSimulator'):
+            logger.error('boom')
+        message = caplog.records[-1].getMessage()
+        assert message.startswith('boom')
+        assert 'test_error_stack_is_captured' in message
+        logger.flush()
+
+
+class TestEventBuffer:
+    def test_ring_is_bounded(self):
+        events = EventBuffer(capacity=3)
+        for i in range(5):
+            events.record('node', 'failed', {'node_id': f'node_{i}'})
+        result = events.query()
+        assert [e.ids['node_id'] for e in result] == ['node_2', 'node_3', 'node_4']
+        assert events.get_status()['dropped'] == 2
+
+    def test_query_filters(self):
+        events = EventBuffer()
+        events.record('node', 'failed', {'node_id': 'node_1'})
+        marker = events.record('link', 'down', {'link_id': 'l1'})
+        events.record('stp', 'recalculated')
+        assert [e.type for e in events.query(types=['node', 'stp'])] == ['node', 'stp']
+        assert [e.type for e in events.query(after_seq=marker.seq)] == ['stp']
+        assert [e.type for e in events.query(limit=1)] == ['stp']
+
+
+
+class TestProfiler:
+    def test_spans_only_record_inside_a_trace(self):
+        profiler = Profiler(capacity=2)
+        with span('outside'):
+            pass
+        for _ in range(3):
+            with profiler.trace('recompute', session_id='s'):
+                with span('phase'):
+                    pass
+                with span('phase'):
+                    pass
+        recent = profiler.recent()
+        assert len(recent) == 2
+        assert set(recent[-1]['phases']) == {'phase'}
+        assert recent[-1]['session_id'] == 's'
+        assert profiler.percentiles()['phase']['count'] == 3
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = Profiler(enabled=False)
+        with profiler.trace('recompute'):
+            with span('phase'):
+                pass
+        assert profiler.recent() == [] and profiler.percentiles() == {}
+
+    def test_percentiles_use_nearest_rank(self):
+        summary = percentiles([4, 1, 3, 2], digits=1)
+        assert summary == {'count': 4, 'p50': 2, 'p90': 4, 'p99': 4, 'max': 4, 'mean': 2.5}
+        assert percentiles([7], points=(0, 100)) == {'count': 1, 'p0': 7, 'p100': 7, 'max': 7, 'mean': 7}
+        assert percentiles([]) == {}
+
+
+class TestLogTail:
+    def write_log(self, path):
+        lines = []
+        for i in range(500):
+            level = 'ERROR' if i % 100 == 0 else 'INFO    '
+            lines.append(f"2026-02-18 10:{i // 60:02d}:{i % 60:02d} | {level} | NetworkSimulator | entry {i}")
+            if i % 100 == 0:
+                lines.append("Stack:")
+                lines.append(f"  frame {i}")
+        path.write_text('\n'.join(lines) + '\n')
+
+    def test_reverse_lines(self, tmp_path):
+        path = tmp_path / 'a.log'
+        self.write_log(path)
+        reversed_lines = list(iter_lines_reverse(str(path), block_size=64))
+        assert reversed_lines[0].endswith('entry 499')
+        assert reversed_lines[-1].endswith('entry 0')
+
+    def test_tail_and_filters(self, tmp_path):
+        path = tmp_path / 'a.log'
+        self.write_log(path)
+        assert [l.rsplit(' ', 1)[1] for l in tail(str(path), 3)] == ['497', '498', '499']
+
+        errors = tail(str(path), 10, LogFilter(level='ERROR'))
+        assert len(errors) == 5
+        assert errors[-1].endswith('entry 400\nStack:\n  frame 400')
+
+        since = parse_since('2026-02-18 10:08:15')
+        recent = tail(str(path), 1000, LogFilter(since=since, contains='entry 49'))
+        assert [l.rsplit(' ', 1)[1] for l in recent] == [str(i) for i in range(495, 500)]
+
+    def test_invalid_level(self):
+        with pytest.raises(ValueError):
+            LogFilter(level='LOUD')
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
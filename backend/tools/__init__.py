@@ -0,0 +1 @@
+# Backend Tools
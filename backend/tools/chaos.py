@@ -0,0 +1,64 @@
+"""
+Run a Monte Carlo chaos campaign and print unreachable-node and recompute-cost statistics.
+
+    python -m backend.tools.chaos --nodes 1000 --trials 5000 --k-links 3
+    python -m backend.tools.chaos --snapshot snapshots/topology.trsp --k-nodes 1 --workers 8
+"""
+import argparse
+import json
+import sys
+from backend.core import persistence
+from backend.core.chaos import ChaosCampaign
+from backend.core.stp import STPCalculator
+
+
+def load_snapshot(args) -> bytes:
+    if args.snapshot:
+        with open(args.snapshot, 'rb') as f:
+            return f.read()
+    from backend.bench.topologies import build_topology
+    topology = build_topology(args.nodes, seed=args.seed)
+    STPCalculator(topology).update_and_apply()
+    return persistence.dumps(topology)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--snapshot', help='binary topology snapshot to test')
+    source.add_argument('--nodes', type=int, default=1000, help='size of a generated topology')
+    parser.add_argument('--trials', type=int, default=1000)
+    parser.add_argument('--k-links', type=int, default=1)
+    parser.add_argument('--k-nodes', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, help='worker processes (default: all cores)')
+    parser.add_argument('--chunk-size', type=int)
+    parser.add_argument('--json', action='store_true', help='print the final summary as JSON')
+    args = parser.parse_args(argv)
+
+    campaign = ChaosCampaign(load_snapshot(args), args.trials, args.k_links, args.k_nodes, args.seed,
+                             args.workers, args.chunk_size)
+
+    def progress(summary):
+        print(f"\r{summary['completed']}/{summary['trials']} trials "
+              f"({summary['trials_per_second']}/s)", end='', file=sys.stderr, flush=True)
+
+    summary = campaign.run(progress)
+    print(file=sys.stderr)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return
+
+    print(f"status={summary['status']} trials={summary['completed']} workers={summary['workers']} "
+          f"elapsed={summary['elapsed_seconds']}s rate={summary['trials_per_second']}/s")
+    print(f"partitioned fraction: {summary['partitioned_fraction']}")
+    for name in ('unreachable', 'recompute_ms'):
+        print(f"{name:<14}" + ' '.join(f"{k}={v}" for k, v in summary[name].items()))
+    print('worst trials:')
+    for r in summary['worst']:
+        print(f"  trial={r['trial']} unreachable={r['unreachable']} recompute_ms={r['recompute_ms']} "
+              f"links={','.join(r['failed_links'])} nodes={','.join(r['failed_nodes'])}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Replay a mutation journal and report the cost of every spanning-tree recompute.
+
+    python -m backend.tools.replay journal/mutations.jsonl
+    python -m backend.tools.replay journal/mutations.jsonl --mode virtual --quiet-period 0.2
+"""
+import argparse
+import json
+from backend.core.journal import Replay
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('journal')
+    parser.add_argument('--mode', choices=Replay.MODES, default='full',
+                        help='full: recompute where the journal did; virtual: re-derive recomputes from timestamps')
+    parser.add_argument('--quiet-period', type=float, default=0.05)
+    parser.add_argument('--max-delay', type=float, default=0.5)
+    parser.add_argument('--json', action='store_true', help='print the full report as JSON')
+    args = parser.parse_args(argv)
+
+    report = Replay(args.journal, args.mode, args.quiet_period, args.max_delay).run()
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"{'seq':>8} {'mutations':>10} {'cost_ms':>10} {'recorded_ms':>12}")
+    for r in report['recomputes']:
+        print(f"{str(r.get('seq', '-')):>8} {r['mutations']:>10} {r['cost_ms']:>10} {str(r.get('recorded_ms', '-')):>12}")
+    print(f"mutations={report['mutations']} recomputes={report['recompute_count']} "
+          f"total_ms={report['recompute_total_ms']} p50_ms={report['recompute_p50_ms']} "
+          f"max_ms={report['recompute_max_ms']} generation_mismatches={report['generation_mismatches']} "
+          f"errors={len(report['errors'])}")
+    for entry_type, count in report['unknown_entries'].items():
+        print(f"warning: skipped {count} entries of unknown type {entry_type!r}")
+
+
+if __name__ == '__main__':
+    main()
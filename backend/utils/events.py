@@ -0,0 +1,84 @@
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Iterable, List, Optional
+
+
+class Event:
+    __slots__ = ('seq', 'timestamp', 'type', 'name', 'ids', 'fields')
+
+    def __init__(self, seq: int, timestamp: float, event_type: str, name: str, ids: dict, fields: dict):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.type = event_type
+        self.name = name
+        self.ids = ids
+        self.fields = fields
+
+    def to_dict(self) -> dict:
+        return {
+            'seq': self.seq,
+            'timestamp': self.timestamp,
+            'type': self.type,
+            'event': self.name,
+            'ids': self.ids,
+            'fields': self.fields
+        }
+
+
+class EventBuffer:
+    """
+    Fixed-size in-memory ring of structured events. Appends are O(1) and the
+    oldest record is overwritten once `capacity` is reached; nothing touches disk.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._events = deque(maxlen=capacity)
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def record(self, event_type: str, name: str, ids: Optional[dict] = None, fields: Optional[dict] = None) -> Event:
+        with self._lock:
+            event = Event(next(self._seq), time.time(), event_type, name, ids or {}, fields or {})
+            self._events.append(event)
+            self.recorded += 1
+        return event
+
+    def query(
+        self,
+        types: Optional[Iterable[str]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        after_seq: Optional[int] = None,
+        limit: int = 100
+    ) -> List[Event]:
+        """Return the newest `limit` matching events, oldest first. Walks back
+        from the newest record and stops at the first one outside the window."""
+        types = set(types) if types else None
+        with self._lock:
+            events = list(self._events)
+
+        matched = []
+        for event in reversed(events):
+            if (since is not None and event.timestamp < since) or (after_seq is not None and event.seq <= after_seq):
+                break
+            if until is not None and event.timestamp > until:
+                continue
+            if types is not None and event.type not in types:
+                continue
+            matched.append(event)
+            if len(matched) >= limit:
+                break
+        matched.reverse()
+        return matched
+
+    def get_status(self) -> dict:
+        return {
+            'capacity': self.capacity,
+            'size': len(self._events),
+            'recorded': self.recorded,
+            'dropped': max(0, self.recorded - self.capacity)
+        }
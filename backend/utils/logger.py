@@ -1,12 +1,85 @@
+import atexit
 import logging
 import logging.handlers
 import os
+import queue
 import sys
+import threading
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional, Tuple
 import traceback
 
 
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    'api': (20.0, 40),
+    'bpdu': (10.0, 20),
+    'lacp': (10.0, 20),
+}
+
+
+class _LazyMessage:
+    """Log message whose joined text is only built when a handler emits it,
+    which happens on the queue listener thread."""
+
+    __slots__ = ('message', 'context', 'params', 'stack', 'suppressed', '_text')
+
+    def __init__(self, message: str, context: dict = None, params: dict = None, stack=None, suppressed: int = 0):
+        self.message = message
+        self.context = context
+        self.params = params
+        self.stack = stack
+        self.suppressed = suppressed
+        self._text = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            parts = [self.message]
+            if self.params:
+                param_str = ' | '.join(f"{k}={v}" for k, v in self.params.items())
+                parts.append(f"[{param_str}]")
+            if self.context:
+                context_str = ' | '.join(f"{k}={v}" for k, v in self.context.items())
+                parts.append(f"Context: {context_str}")
+            if self.suppressed:
+                parts.append(f"suppressed={self.suppressed}")
+            if self.stack:
+                parts.append(f"\nStack:\n{''.join(traceback.format_list(self.stack))}")
+            self._text = ' | '.join(parts)
+        return self._text
+
+
+class _RateLimiter:
+    """Token bucket per log category; counts what it drops so the next
+    emitted line can report it."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.suppressed = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> Optional[int]:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1.0:
+                self.suppressed += 1
+                return None
+            self.tokens -= 1.0
+            suppressed, self.suppressed = self.suppressed, 0
+            return suppressed
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        # Keep the record unformatted; the listener thread's handlers format it.
+        return record
+
+
 class NetworkLogger:
     _instance: Optional['NetworkLogger'] = None
     _initialized: bool = False
@@ -22,7 +95,8 @@ class NetworkLogger:
         log_level: int = logging.DEBUG,
         console_level: int = logging.INFO,
         max_bytes: int = 10 * 1024 * 1024,
-        backup_count: int = 5
+        backup_count: int = 5,
+        rate_limits: Optional[Dict[str, Tuple[float, int]]] = None
     ):
         if self._initialized:
             return
@@ -30,6 +104,11 @@ class NetworkLogger:
         self.log_dir = log_dir
         self.log_level = log_level
         self.console_level = console_level
+        self.handlers = []
+        self.rate_limiters = {
+            category: _RateLimiter(rate, burst)
+            for category, (rate, burst) in (DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits).items()
+        }
 
         if not os.path.exists(log_dir):
             os.makedirs(log_dir)
@@ -40,9 +119,29 @@ class NetworkLogger:
 
         self._setup_file_handler(max_bytes, backup_count)
         self._setup_console_handler()
+        self._setup_queue()
 
         self._initialized = True
 
+    def _setup_queue(self):
+        # Callers only enqueue records; file and console writes happen on the
+        # listener thread so request handlers never block on I/O.
+        self.queue = queue.Queue(-1)
+        self.logger.addHandler(_DeferredQueueHandler(self.queue))
+        self.listener = logging.handlers.QueueListener(self.queue, *self.handlers, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.stop)
+
+    def flush(self):
+        """Block until every queued record has been written."""
+        self.queue.join()
+        for handler in self.handlers:
+            handler.flush()
+
+    def stop(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+
     def _setup_file_handler(self, max_bytes: int, backup_count: int):
         log_file = os.path.join(
             self.log_dir,
@@ -62,7 +161,7 @@ class NetworkLogger:
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         file_handler.setFormatter(file_formatter)
-        self.logger.addHandler(file_handler)
+        self.handlers.append(file_handler)
 
         self._add_context_filter(file_handler)
 
@@ -74,7 +173,7 @@ class NetworkLogger:
             fmt='%(levelname)s: %(message)s'
         )
         console_handler.setFormatter(console_formatter)
-        self.logger.addHandler(console_handler)
+        self.handlers.append(console_handler)
 
     def _add_context_filter(self, handler):
         class ContextFilter(logging.Filter):
@@ -87,54 +186,59 @@ class NetworkLogger:
 
         handler.addFilter(ContextFilter())
 
-    def _format_message(self, message: str, context: dict = None, params: dict = None, include_stack: bool = False):
-        parts = [message]
-
-        if params:
-            param_str = ' | '.join(f"{k}={v}" for k, v in params.items())
-            parts.append(f"[{param_str}]")
-
-        if context:
-            context_str = ' | '.join(f"{k}={v}" for k, v in context.items())
-            parts.append(f"Context: {context_str}")
-
-        if include_stack:
-            stack = ''.join(traceback.format_stack()[-5:-1])
-            parts.append(f"\nStack:\n{stack}")
-
-        return ' | '.join(parts)
+    def _capture_stack(self):
+        # Inside an except block this is the traceback of the exception being
+        # handled; otherwise only the frames above the logger's own calls are
+        # kept. Either way they are formatted on the listener thread.
+        tb = sys.exc_info()[2]
+        if tb is not None:
+            return traceback.extract_tb(tb)
+        return traceback.extract_stack(sys._getframe(3), limit=4)
+
+    def _log(self, level: int, message: str, context: dict = None, params: dict = None,
+             include_stack: bool = False, category: Optional[str] = None):
+        if not self.logger.isEnabledFor(level):
+            return
+        suppressed = 0
+        if category is not None and level < logging.WARNING:
+            limiter = self.rate_limiters.get(category)
+            if limiter is not None:
+                suppressed = limiter.acquire()
+                if suppressed is None:
+                    return
+        stack = self._capture_stack() if include_stack else None
+        self.logger.log(level, _LazyMessage(message, context, params, stack, suppressed))
 
     def debug(self, message: str, context: dict = None, params: dict = None, include_stack: bool = False):
-        formatted = self._format_message(message, context, params, include_stack)
-        self.logger.debug(formatted)
+        self._log(logging.DEBUG, message, context, params, include_stack)
 
     def info(self, message: str, context: dict = None, params: dict = None):
-        formatted = self._format_message(message, context, params)
-        self.logger.info(formatted)
+        self._log(logging.INFO, message, context, params)
 
     def warning(self, message: str, context: dict = None, params: dict = None):
-        formatted = self._format_message(message, context, params)
-        self.logger.warning(formatted)
+        self._log(logging.WARNING, message, context, params)
 
     def error(self, message: str, context: dict = None, params: dict = None, include_stack: bool = True):
-        formatted = self._format_message(message, context, params, include_stack)
-        self.logger.error(formatted)
+        self._log(logging.ERROR, message, context, params, include_stack)
 
     def critical(self, message: str, context: dict = None, params: dict = None, include_stack: bool = True):
-        formatted = self._format_message(message, context, params, include_stack)
-        self.logger.critical(formatted)
+        self._log(logging.CRITICAL, message, context, params, include_stack)
 
     def api_request(self, method: str, endpoint: str, params: dict = None, context: dict = None):
-        self.info(
+        self._log(
+            logging.INFO,
             f"API Request: {method} {endpoint}",
             context=context,
-            params=params
+            params=params,
+            category='api'
         )
 
     def api_response(self, method: str, endpoint: str, status_code: int, context: dict = None):
-        self.info(
+        self._log(
+            logging.INFO,
             f"API Response: {method} {endpoint} -> {status_code}",
-            context=context
+            context=context,
+            category='api'
         )
 
     def topology_change(self, change_type: str, details: dict = None, context: dict = None):
@@ -166,17 +270,21 @@ class NetworkLogger:
         )
 
     def lacp_event(self, link_id: str, event: str, context: dict = None):
-        self.debug(
+        self._log(
+            logging.DEBUG,
             f"LACP Event: {event}",
             context=context,
-            params={'link_id': link_id}
+            params={'link_id': link_id},
+            category='lacp'
         )
 
     def bpdu_event(self, node_id: str, event: str, context: dict = None):
-        self.debug(
+        self._log(
+            logging.DEBUG,
             f"BPDU Event: {event}",
             context=context,
-            params={'node_id': node_id}
+            params={'node_id': node_id},
+            category='bpdu'
         )
 
     def scenario_execution(self, scenario_name: str, result: str, context: dict = None):
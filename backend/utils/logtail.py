@@ -0,0 +1,146 @@
+import os
+import time
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+
+LEVELS = {'DEBUG': 10, 'INFO': 20, 'WARNING': 30, 'ERROR': 40, 'CRITICAL': 50}
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+BLOCK_SIZE = 8192
+
+
+class LogFilter:
+    """
+    Filters log entries written by NetworkLogger's file handler
+    (`timestamp | LEVEL | name | message`). `level` is a minimum severity,
+    `since` an epoch timestamp and `contains` a case-sensitive substring.
+    """
+
+    def __init__(self, level: Optional[str] = None, since: Optional[float] = None, contains: Optional[str] = None):
+        if level is not None and level.upper() not in LEVELS:
+            raise ValueError(f'Unknown level: {level}')
+        self.min_level = LEVELS[level.upper()] if level else None
+        self.since = since
+        self.contains = contains
+
+    @staticmethod
+    def parse_header(line: str):
+        """Return (timestamp, level) for an entry header line, or None for a continuation line."""
+        parts = line.split(' | ', 2)
+        if len(parts) < 3:
+            return None
+        try:
+            timestamp = datetime.strptime(parts[0], TIMESTAMP_FORMAT).timestamp()
+        except ValueError:
+            return None
+        return timestamp, parts[1].strip()
+
+    def older_than_since(self, header) -> bool:
+        return self.since is not None and header is not None and header[0] < self.since
+
+    def matches(self, entry: str, header) -> bool:
+        if self.min_level is not None:
+            if header is None or LEVELS.get(header[1], 0) < self.min_level:
+                return False
+        if self.since is not None and (header is None or header[0] < self.since):
+            return False
+        if self.contains and self.contains not in entry:
+            return False
+        return True
+
+
+def parse_since(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.strptime(value, TIMESTAMP_FORMAT).timestamp()
+
+
+def iter_lines_reverse(path: str, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """Yield the lines of `path` from last to first, reading fixed-size blocks
+    backwards from the end so memory stays bounded by one block plus one line."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b''
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            f.seek(position)
+            block = f.read(read_size) + remainder
+            lines = block.split(b'\n')
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                if line:
+                    yield line.decode('utf-8', errors='replace').rstrip('\r')
+        if remainder:
+            yield remainder.decode('utf-8', errors='replace').rstrip('\r')
+
+
+def tail(path: str, lines: int = 100, log_filter: Optional[LogFilter] = None, max_scan_bytes: Optional[int] = None) -> List[str]:
+    """
+    Return up to `lines` matching entries in chronological order. Continuation
+    lines (stack traces) stay attached to their entry. Scanning stops at the
+    first entry older than `since`, after `max_scan_bytes`, or once enough
+    entries matched.
+    """
+    log_filter = log_filter or LogFilter()
+    entries: List[str] = []
+    continuation: List[str] = []
+    scanned = 0
+
+    for line in iter_lines_reverse(path):
+        scanned += len(line) + 1
+        header = LogFilter.parse_header(line)
+        if header is None:
+            continuation.append(line)
+        else:
+            if log_filter.older_than_since(header):
+                break
+            entry = '\n'.join([line] + list(reversed(continuation)))
+            continuation = []
+            if log_filter.matches(entry, header):
+                entries.append(entry)
+                if len(entries) >= lines:
+                    break
+        if max_scan_bytes is not None and scanned >= max_scan_bytes:
+            break
+
+    entries.reverse()
+    return entries
+
+
+def follow(path: str, log_filter: Optional[LogFilter] = None, timeout: float = 30.0, poll_interval: float = 0.5) -> Iterator[str]:
+    """Yield matching lines appended to `path` until `timeout` seconds pass.
+    Reopens the file from the start if it is rotated or truncated."""
+    log_filter = log_filter or LogFilter()
+    deadline = time.monotonic() + timeout
+    f = open(path, 'r', encoding='utf-8', errors='replace')
+    try:
+        f.seek(0, os.SEEK_END)
+        inode = os.fstat(f.fileno()).st_ino
+        pending = ''
+        while time.monotonic() < deadline:
+            chunk = f.readline()
+            if chunk:
+                pending += chunk
+                if not pending.endswith('\n'):
+                    continue
+                line, pending = pending.rstrip('\r\n'), ''
+                if log_filter.matches(line, LogFilter.parse_header(line)):
+                    yield line
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                stat = None
+            if stat and (stat.st_ino != inode or stat.st_size < f.tell()):
+                f.close()
+                f = open(path, 'r', encoding='utf-8', errors='replace')
+                inode = os.fstat(f.fileno()).st_ino
+                continue
+            time.sleep(poll_interval)
+    finally:
+        f.close()
@@ -0,0 +1,184 @@
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _label_string(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+    return ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+class _Metric:
+    type_name = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values):
+        """Return the child for these label values, creating it once. Bind the
+        result ahead of time on hot paths to skip even the dict lookup."""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child(_label_string(self.labelnames, values))
+                    self._children[values] = child
+        return child
+
+    def _new_child(self, label_string: str):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.type_name}']
+        for child in list(self._children.values()):
+            lines.extend(child.render(self.name))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self, label_string: str):
+        self.label_string = label_string
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def set_total(self, value: float):
+        """Mirror a running total kept by another component."""
+        self.value = value
+
+    def render(self, name: str) -> List[str]:
+        labels = f'{{{self.label_string}}}' if self.label_string else ''
+        return [f'{name}{labels} {self.value}']
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def _new_child(self, label_string: str):
+        return _CounterChild(label_string)
+
+    def inc(self, amount: float = 1.0):
+        self._default.inc(amount)
+
+    def set_total(self, value: float):
+        self._default.set_total(value)
+
+
+class _GaugeChild(_CounterChild):
+    def set(self, value: float):
+        self.value = value
+
+
+class Gauge(_Metric):
+    type_name = 'gauge'
+
+    def _new_child(self, label_string: str):
+        return _GaugeChild(label_string)
+
+    def set(self, value: float):
+        self._default.set(value)
+
+
+class _HistogramChild:
+    def __init__(self, label_string: str, buckets: Sequence[float]):
+        self.label_string = label_string
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+        prefix = f'{label_string},' if label_string else ''
+        self._bucket_labels = [f'{{{prefix}le="{b}"}}' for b in buckets] + [f'{{{prefix}le="+Inf"}}']
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def render(self, name: str) -> List[str]:
+        with self._lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+        lines = []
+        cumulative = 0
+        for bucket_label, bucket_count in zip(self._bucket_labels, counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{bucket_label} {cumulative}')
+        labels = f'{{{self.label_string}}}' if self.label_string else ''
+        lines.append(f'{name}_sum{labels} {total}')
+        lines.append(f'{name}_count{labels} {count}')
+        return lines
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames)
+
+    def _new_child(self, label_string: str):
+        return _HistogramChild(label_string, self.buckets)
+
+    def observe(self, value: float):
+        self._default.observe(value)
+
+
+class MetricsRegistry:
+    """
+    Holds metrics and renders them in the Prometheus text exposition format.
+
+    Values owned by other components (BPDU counters, topology sizes) are read
+    by collector callbacks at scrape time instead of being pushed on every event.
+    """
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def __init__(self, prefix: str = 'tinyrstp'):
+        self.prefix = prefix
+        self.metrics: List[_Metric] = []
+        self.collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(f'{self.prefix}_{name}', help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(f'{self.prefix}_{name}', help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Optional[Sequence[float]] = None) -> Histogram:
+        return self._register(Histogram(f'{self.prefix}_{name}', help_text, labelnames, buckets or DEFAULT_BUCKETS))
+
+    def register_collector(self, collector: Callable[[], None]):
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self.collectors:
+            collector()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
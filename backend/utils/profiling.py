@@ -0,0 +1,134 @@
+import contextlib
+import contextvars
+import cProfile
+import io
+import itertools
+import pstats
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from backend.utils.stats import percentiles
+
+
+_active_trace: contextvars.ContextVar = contextvars.ContextVar('profile_trace', default=None)
+
+
+class _Trace:
+    __slots__ = ('phases',)
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+class _Span:
+    __slots__ = ('trace', 'name', 'started')
+
+    def __init__(self, trace: _Trace, name: str):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.trace.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str):
+    """
+    Time the enclosed block as phase `name` of the trace being recorded in
+    this context. Outside a trace this is one context-variable lookup and
+    returns a shared no-op context manager.
+    """
+    trace = _active_trace.get()
+    if trace is None:
+        return _NULL_SPAN
+    return _Span(trace, name)
+
+
+class Profiler:
+    """
+    Per-phase breakdowns of the last `capacity` traces, plus the last
+    `window` durations of every phase for rolling percentiles. Phases are
+    the span() names hit while a trace is open; nested spans overlap.
+    """
+
+    def __init__(self, capacity: int = 100, window: int = 1000, enabled: bool = True):
+        self.capacity = capacity
+        self.window = window
+        self.enabled = enabled
+        self._recent = deque(maxlen=capacity)
+        self._samples: Dict[str, deque] = {}
+        self._seq = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def trace(self, kind: str, **fields):
+        if not self.enabled:
+            yield None
+            return
+        trace = _Trace()
+        token = _active_trace.set(trace)
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            total = time.perf_counter() - started
+            _active_trace.reset(token)
+            self._record(kind, started_at, total, trace.phases, fields)
+
+    def _record(self, kind: str, started_at: float, total: float, phases: Dict[str, float], fields: dict):
+        phases_ms = {name: round(seconds * 1000, 3) for name, seconds in phases.items()}
+        with self._lock:
+            self._recent.append(dict(
+                fields,
+                seq=next(self._seq),
+                kind=kind,
+                started_at=started_at,
+                total_ms=round(total * 1000, 3),
+                phases=phases_ms
+            ))
+            for name, ms in itertools.chain(phases_ms.items(), (('total', total * 1000),)):
+                samples = self._samples.get(name)
+                if samples is None:
+                    samples = self._samples[name] = deque(maxlen=self.window)
+                samples.append(ms)
+
+    def recent(self, limit: Optional[int] = None) -> List[dict]:
+        with self._lock:
+            traces = list(self._recent)
+        return traces[-limit:] if limit else traces
+
+    def percentiles(self) -> Dict[str, dict]:
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+        return {name: percentiles(values) for name, values in samples.items()}
+
+
+def profile_call(func, *args, sort: str = 'cumulative', limit: int = 50):
+    """Run `func` under cProfile; returns (result, pstats text of the top `limit` entries)."""
+    profile = cProfile.Profile()
+    result = profile.runcall(func, *args)
+    output = io.StringIO()
+    pstats.Stats(profile, stream=output).sort_stats(sort).print_stats(limit)
+    return result, output.getvalue()
@@ -0,0 +1,19 @@
+"""
+Summary statistics shared by the profiler, the convergence tracker and the
+chaos campaigns.
+"""
+import math
+from typing import Iterable
+
+
+def percentiles(values: Iterable[float], points=(50, 90, 99), digits: int = 3) -> dict:
+    """Nearest-rank percentiles of `values` plus count, max and mean; empty when there are no values."""
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+    n = len(ordered)
+    result = {'count': n}
+    result.update((f'p{p}', round(ordered[max(0, math.ceil(n * p / 100) - 1)], digits)) for p in points)
+    result['max'] = round(ordered[-1], digits)
+    result['mean'] = round(sum(ordered) / n, digits)
+    return result
@@ -16,6 +16,7 @@ const colors = {
     stLink: '#44ff44',
     backupLink: '#cccccc',
     failedLink: '#888888',
+    hotLink: '#ff8800',
     selected: '#ffff00',
     reachable: '#44ff44',
     unreachable: '#ff4444',
@@ -181,6 +182,7 @@ function drawLinks() {
     if (!topologyData.links) return;
     
     const stLinks = new Set(topologyData.spanning_tree || []);
+    const hotLinks = new Set((topologyData.link_utilization || {}).oversubscribed || []);
     
     for (const [linkId, linkData] of Object.entries(topologyData.links)) {
         const nodes = linkData.nodes;
@@ -199,6 +201,8 @@ function drawLinks() {
             color = colors.selected;
         } else if (isDown) {
             color = colors.failedLink;
+        } else if (hotLinks.has(linkId)) {
+            color = colors.hotLink;
         } else if (isST) {
             color = colors.stLink;
         } else {
@@ -404,6 +408,7 @@ function updateInfoPanel() {
             const n1Data = topologyData.nodes[linkData.nodes[0]] || {};
             const n2Data = topologyData.nodes[linkData.nodes[1]] || {};
             const isST = (topologyData.spanning_tree || []).includes(selectedLink);
+            const utilization = ((topologyData.link_utilization || {}).links || {})[selectedLink];
             
             html += `
                 <div class="info-section">
@@ -424,6 +429,7 @@ function updateInfoPanel() {
                         <span class="info-label">Spanning Tree:</span>
                         <span class="info-value">${isST ? 'Yes' : 'No'}</span>
                     </div>
+                    ${utilization !== undefined ? `<div class="info-row"><span class="info-label">Utilization:</span><span class="info-value">${utilization === null ? 'n/a' : (utilization * 100).toFixed(1) + '%'}</span></div>` : ''}
                 </div>
             `;
         }
@@ -450,31 +456,6 @@ async function apiCall(method, endpoint) {
     }
 }
 
-function findLinkByNodes(node1Name, node2Name) {
-    for (const [linkId, linkData] of Object.entries(topologyData.links || {})) {
-        const nodes = linkData.nodes;
-        if (nodes.length < 2) continue;
-        const n1 = topologyData.nodes[nodes[0]];
-        const n2 = topologyData.nodes[nodes[1]];
-        if (n1 && n2) {
-            if ((n1.node_name === node1Name && n2.node_name === node2Name) ||
-                (n1.node_name === node2Name && n2.node_name === node1Name)) {
-                return linkId;
-            }
-        }
-    }
-    return null;
-}
-
-function findNodeByName(nodeName) {
-    for (const [nodeId, nodeData] of Object.entries(topologyData.nodes || {})) {
-        if (nodeData.node_name === nodeName) {
-            return nodeId;
-        }
-    }
-    return null;
-}
-
 // Link Control Buttons
 document.getElementById('btnLinkDown').addEventListener('click', () => {
     if (selectedLink) apiCall('POST', `/api/links/${selectedLink}/down`);
@@ -507,7 +488,16 @@ document.getElementById('btnReset').addEventListener('click', () => {
     apiCall('POST', '/api/topology/reset');
 });
 
-// Demo Button - Composite Failure Scenario
+// Demo Button - Composite Failure Scenario, timed and executed server-side
+function describeScenarioEvent(event) {
+    if (event.assert) {
+        const checks = Object.entries(event.assert).map(([k, v]) => `${k}=${Array.isArray(v) ? v.join(',') : v}`);
+        return { title: `t=${event.at}s: Check`, desc: checks.join('; ') };
+    }
+    const target = event.node || (Array.isArray(event.link) ? event.link.join('-') : event.link);
+    return { title: `t=${event.at}s: ${event.op}`, desc: target };
+}
+
 document.getElementById('btnDemo').addEventListener('click', async () => {
     if (demoRunning) return;
     
@@ -521,108 +511,75 @@ document.getElementById('btnDemo').addEventListener('click', async () => {
     const progressText = document.getElementById('progressText');
     
     demoProgressEl.style.display = 'block';
-    
-    const steps = [
-        {
-            title: 'Step 1: Initial State',
-            desc: 'All nodes and links are operational. Network is stable.',
-            action: async () => {
-                await apiCall('POST', '/api/topology/reset');
-            },
-            expected: '4 active nodes, 6 UP links, spanning tree formed'
-        },
-        {
-            title: 'Step 2: Link Failure (Node1-Node2)',
-            desc: 'Injecting failure on the link between Node1 and Node2.',
-            action: async () => {
-                const linkId = findLinkByNodes('Node1', 'Node2');
-                if (linkId) await apiCall('POST', `/api/links/${linkId}/down`);
-            },
-            expected: 'Link goes DOWN, spanning tree recalculates'
-        },
-        {
-            title: 'Step 3: Node Failure (Node3)',
-            desc: 'Injecting failure on Node3. This affects multiple links.',
-            action: async () => {
-                const nodeId = findNodeByName('Node3');
-                if (nodeId) await apiCall('POST', `/api/nodes/${nodeId}/fail`);
-            },
-            expected: 'Node3 becomes FAILED, 3 links affected'
-        },
-        {
-            title: 'Step 4: Observe Network State',
-            desc: 'Network has adapted to failures. Remaining nodes stay connected.',
-            action: async () => {
-                await fetchTopology();
-            },
-            expected: '3 active nodes, spanning tree maintains connectivity'
-        },
-        {
-            title: 'Step 5: Recover Node3',
-            desc: 'Restoring Node3 to active state.',
-            action: async () => {
-                const nodeId = findNodeByName('Node3');
-                if (nodeId) await apiCall('POST', `/api/nodes/${nodeId}/recover`);
-            },
-            expected: 'Node3 recovers, links restored'
-        },
-        {
-            title: 'Step 6: Recover Link (Node1-Node2)',
-            desc: 'Restoring the link between Node1 and Node2.',
-            action: async () => {
-                const linkId = findLinkByNodes('Node1', 'Node2');
-                if (linkId) await apiCall('POST', `/api/links/${linkId}/up`);
-            },
-            expected: 'Link goes UP, spanning tree optimizes'
-        },
-        {
-            title: 'Step 7: Final State',
-            desc: 'All failures recovered. Network returns to optimal state.',
-            action: async () => {
-                await fetchTopology();
-            },
-            expected: '4 active nodes, 6 UP links, optimal spanning tree'
-        }
-    ];
-    
+
+    const finish = (text) => {
+        progressText.textContent = text;
+        setStatus(text, 'demo');
+        setTimeout(() => {
+            demoRunning = false;
+            setButtonsDisabled(false);
+            setStatus('Ready');
+        }, 2000);
+    };
+
+    await apiCall('POST', '/api/topology/reset');
+    let scenario, run;
+    try {
+        scenario = await (await fetch(`${API_BASE}/api/scenarios/composite_failure`)).json();
+        const response = await fetch(`${API_BASE}/api/scenarios/composite_failure/run`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ live: true, clock: 'wall' })
+        });
+        run = await response.json();
+    } catch (error) {
+        console.error('API Error:', error);
+        finish('Demo Failed');
+        return;
+    }
+
+    const steps = scenario.events.map(describeScenarioEvent);
     let html = '';
     for (let i = 0; i < steps.length; i++) {
         html += `
             <div class="demo-step" id="demo-step-${i}">
                 <div class="step-title">${steps[i].title}</div>
                 <div class="step-desc">${steps[i].desc}</div>
-                <div class="step-result" id="step-result-${i}">Expected: ${steps[i].expected}</div>
+                <div class="step-result" id="step-result-${i}"></div>
             </div>
         `;
     }
     demoStatusEl.innerHTML = html;
-    
-    for (let i = 0; i < steps.length; i++) {
-        const stepEl = document.getElementById(`demo-step-${i}`);
-        stepEl.classList.add('active');
-        
-        progressFill.style.width = `${((i + 1) / steps.length) * 100}%`;
-        progressText.textContent = `Step ${i + 1}/${steps.length}`;
-        
-        await steps[i].action();
-        await new Promise(resolve => setTimeout(resolve, 1500));
-        
-        const resultEl = document.getElementById(`step-result-${i}`);
-        resultEl.textContent = 'Completed: ' + steps[i].expected;
-        
-        stepEl.classList.remove('active');
-        stepEl.classList.add('completed');
+
+    while (run.status === 'queued' || run.status === 'running') {
+        await new Promise(resolve => setTimeout(resolve, 500));
+        run = await (await fetch(`${API_BASE}/api/scenarios/runs/${run.run_id}`)).json();
+        await fetchTopology();
+
+        for (let i = 0; i < steps.length; i++) {
+            const stepEl = document.getElementById(`demo-step-${i}`);
+            stepEl.classList.toggle('completed', i < run.progress);
+            stepEl.classList.toggle('active', i === run.progress);
+        }
+        progressFill.style.width = `${(run.progress / run.total) * 100}%`;
+        progressText.textContent = `Step ${Math.min(run.progress + 1, run.total)}/${run.total}`;
     }
-    
+
+    if (run.status !== 'completed') {
+        finish('Demo Failed');
+        return;
+    }
+    // Results are listed in the same time order as the scenario's events.
+    run.result.events.forEach((event, i) => {
+        const resultEl = document.getElementById(`step-result-${i}`);
+        if (event.assert) {
+            resultEl.textContent = event.passed ? 'Passed' : 'Failed: ' + JSON.stringify(event.failures);
+        } else if (event.convergence_seconds !== null) {
+            resultEl.textContent = `Converged in ${(event.convergence_seconds * 1000).toFixed(0)} ms`;
+        }
+    });
     progressFill.style.width = '100%';
-    progressText.textContent = 'Demo Complete!';
-    setStatus('Demo Complete', 'demo');
-    
-    setTimeout(() => {
-        demoRunning = false;
-        setButtonsDisabled(false);
-        setStatus('Ready');
-    }, 2000);
+    finish(run.result.passed ? 'Demo Complete!' : 'Demo Complete (checks failed)');
 });
 
 function setButtonsDisabled(disabled) {